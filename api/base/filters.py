@@ -279,6 +279,15 @@ class ODMFilterMixin(FilterMixin):
         """
         raise NotImplementedError('Must define get_default_odm_query')
 
+    def get_cursor_queryset(self, seek_query):
+        """Return the queryset for this request restricted by `seek_query` (which may be None).
+        Used by `page[cursor]` pagination on views that define `cursor_ordering`.
+        """
+        query = self.get_query_from_request()
+        if seek_query is not None:
+            query = query & seek_query
+        return self.model_class.find(query)
+
     def get_query_from_request(self):
         if self.request.parser_context['kwargs'].get('is_embedded'):
             param_query = None
@@ -318,17 +327,34 @@ class ListFilterMixin(FilterMixin):
 
     Subclasses must define `get_default_queryset()`.
 
+    All filters in a request are compiled into a single predicate that is evaluated in one pass over
+    the default queryset. Subclasses whose default queryset is backed by a single MODM query may
+    additionally define `get_default_odm_query()` and `get_odm_queryset()`; filters on the fields listed
+    in `odm_filterable_fields` are then pushed down into the database and only the remaining filters are
+    evaluated in Python.
+
     Serializers that want to restrict which fields are used for filtering need to have a variable called
     filterable_fields which is a frozenset of strings representing the field names as they appear in the serialization.
     """
     FILTERS = {
         'eq': operator.eq,
+        'ne': operator.ne,
         'lt': operator.lt,
         'lte': operator.le,
         'gt': operator.gt,
-        'gte': operator.ge
+        'gte': operator.ge,
+        'in': lambda a, b: a in b,
     }
 
+    MATCH_FILTERS = {
+        'contains': lambda a, b: b in a,
+        'icontains': lambda a, b: b.lower() in a.lower(),
+    }
+
+    # Model field names (i.e. after `convert_key`) that are stored on the documents returned by
+    # `get_odm_queryset`. Filters on these fields are compiled into the MODM query.
+    odm_filterable_fields = frozenset()
+
     def __init__(self, *args, **kwargs):
         super(FilterMixin, self).__init__(*args, **kwargs)
         if not self.serializer_class:
@@ -337,46 +363,108 @@ class ListFilterMixin(FilterMixin):
     def get_default_queryset(self):
         raise NotImplementedError('Must define get_default_queryset')
 
+    def get_default_odm_query(self):
+        """Return the MODM query equivalent to `get_default_queryset()`, or None if the default
+        queryset cannot be expressed as a single query. Returning None disables filter push down.
+        """
+        return None
+
+    def get_odm_queryset(self, query):
+        """Return the objects matching `query`, as produced by `get_default_odm_query()`
+        intersected with the compiled request filters.
+        """
+        raise NotImplementedError('Must define get_odm_queryset to use get_default_odm_query')
+
     def get_queryset_from_request(self):
-        default_queryset = self.get_default_queryset()
         if not self.kwargs.get('is_embedded') and self.request.QUERY_PARAMS:
-            param_queryset = self.param_queryset(self.request.QUERY_PARAMS, default_queryset)
-            return param_queryset
+            filters = self.parse_query_params(self.request.QUERY_PARAMS)
+            if filters:
+                return self.filter_queryset_from_filters(filters)
+        return self.get_default_queryset()
+
+    def filter_queryset_from_filters(self, filters):
+        """Apply parsed `filters`, pushing down whatever the database can answer.
+
+        The default queryset is only materialised when no MODM query backs it.
+        """
+        odm_filters = dict(
+            (field_name, params) for field_name, params in filters.iteritems()
+            if field_name in self.odm_filterable_fields
+        )
+        default_query = self.get_default_odm_query() if odm_filters else None
+
+        if default_query is None:
+            queryset = self.get_default_queryset()
+            remaining = filters
         else:
-            return default_queryset
+            query = functools.reduce(operator.and_, [default_query] + self.compile_odm_query_parts(odm_filters))
+            queryset = self.get_odm_queryset(query)
+            remaining = dict(
+                (field_name, params) for field_name, params in filters.iteritems()
+                if field_name not in odm_filters
+            )
+
+        if not remaining:
+            return list(queryset)
+        predicate = self.compile_predicate(remaining)
+        return [item for item in queryset if predicate(item)]
 
     def param_queryset(self, query_params, default_queryset):
         """filters default queryset based on query parameters"""
         filters = self.parse_query_params(query_params)
-        queryset = set(default_queryset)
-        if filters:
-            for field_name, params in filters.iteritems():
-                for group in params:
-                    queryset = queryset.intersection(set(self.get_filtered_queryset(field_name, group, default_queryset)))
-        return list(queryset)
-
-    def get_filtered_queryset(self, field_name, params, default_queryset):
-        """filters default queryset based on the serializer field type"""
-        field = self.serializer_class._declared_fields[field_name]
-        field_name = self.convert_key(field_name, field)
+        if not filters:
+            return list(default_queryset)
+        predicate = self.compile_predicate(filters)
+        return [item for item in default_queryset if predicate(item)]
+
+    def compile_odm_query_parts(self, filters):
+        """Convert parsed filters on stored fields into a list of MODM Q objects"""
+        return [
+            Q(field_name, group['op'], group['value'])
+            for field_name, params in filters.iteritems()
+            for group in params
+        ]
+
+    def compile_predicate(self, filters):
+        """Compile parsed filters into a single callable that returns True for items matching all of them"""
+        checks = [
+            self.get_filter_check(field_name, group)
+            for field_name, params in filters.iteritems()
+            for group in params
+        ]
+
+        def predicate(item):
+            return all(check(item) for check in checks)
+        return predicate
+
+    def get_filter_check(self, field_name, params):
+        """Return a callable testing one filter clause against an item, based on the serializer field type"""
+        # `parse_query_params` keys filters on the converted (source) name of the field
+        field = next(
+            (
+                each for name, each in self.serializer_class._declared_fields.items()
+                if self.convert_key(name, each) == field_name
+            ),
+            None
+        ) or self.serializer_class._declared_fields[field_name]
+        value = params['value']
 
         if isinstance(field, ser.SerializerMethodField):
-            return_val = [
-                item for item in default_queryset
-                if self.FILTERS[params['op']](self.get_serializer_method(field_name)(item), params['value'])
-            ]
-        elif isinstance(field, ser.CharField):
-            return_val = [
-                item for item in default_queryset
-                if params['value'] in getattr(item, field_name, {}).lower()
-            ]
+            get_value = self.get_serializer_method(field_name)
         else:
-            return_val = [
-                item for item in default_queryset
-                if self.FILTERS[params['op']](getattr(item, field_name, None), params['value'])
-            ]
+            get_value = lambda item: getattr(item, field_name, None)
+
+        if isinstance(field, ser.CharField) and params['op'] in self.MATCH_FILTERS:
+            compare = self.MATCH_FILTERS[params['op']]
+            return lambda item: compare(get_value(item) or '', value)
 
-        return return_val
+        compare = self.FILTERS[params['op']]
+        return lambda item: compare(get_value(item), value)
+
+    def get_filtered_queryset(self, field_name, params, default_queryset):
+        """filters default queryset based on the serializer field type"""
+        check = self.get_filter_check(field_name, params)
+        return [item for item in default_queryset if check(item)]
 
     def get_serializer_method(self, field_name):
         """
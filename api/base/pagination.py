@@ -1,5 +1,11 @@
-from django.utils import six
+import json
+import base64
+import datetime
 from collections import OrderedDict
+
+from dateutil import parser as date_parser
+from django.utils import six
+from modularodm import Q
 from django.core.urlresolvers import reverse
 from django.core.paginator import InvalidPage, Paginator as DjangoPaginator
 
@@ -9,8 +15,50 @@ from rest_framework.response import Response
 from rest_framework.utils.urls import (
     replace_query_param, remove_query_param
 )
+from api.base.exceptions import InvalidQueryStringError
 from api.base.serializers import is_anonymized
 
+
+def encode_cursor(value, _id, reverse=False):
+    """Encode the sort key value and primary key of a boundary item into an opaque cursor"""
+    if isinstance(value, datetime.datetime):
+        value = {'$date': value.isoformat()}
+    payload = json.dumps({'v': value, 'i': _id, 'r': reverse}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload).rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Inverse of `encode_cursor`; returns a `(value, _id, reverse)` tuple.
+
+    :raises InvalidQueryStringError: If the cursor was not produced by `encode_cursor`
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(str(cursor) + '=' * (-len(cursor) % 4)))
+        value = payload['v']
+        if isinstance(value, dict):
+            value = date_parser.parse(value['$date'])
+        return value, payload['i'], bool(payload['r'])
+    except (TypeError, ValueError, KeyError):
+        raise InvalidQueryStringError(detail='Invalid page cursor.', parameter='page[cursor]')
+
+
+class CursorPage(object):
+    """A page of results fetched by seeking from a cursor rather than by offset"""
+
+    def __init__(self, items, has_next, has_previous, count=None, estimated=False):
+        self.items = items
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.count = count
+        self.estimated = estimated
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
 class JSONAPIPagination(pagination.PageNumberPagination):
     """
     Custom paginator that formats responses in a JSON-API compatible format.
@@ -21,6 +69,23 @@ class JSONAPIPagination(pagination.PageNumberPagination):
 
     page_size_query_param = 'page[size]'
 
+    # Keyset pagination: `page[cursor]` seeks on the view's `cursor_ordering` key instead of using
+    # an offset, so every page costs the same regardless of depth. An empty cursor starts at the
+    # beginning. The total is skipped unless `page[count]` asks for it.
+    cursor_query_param = 'page[cursor]'
+    count_query_param = 'page[count]'
+    count_modes = ('none', 'estimate', 'exact')
+    # `page[count]=estimate` counts at most this many matching documents
+    count_estimate_limit = 1000
+
+    cursor_page = None
+
+    def is_cursor_request(self, request):
+        return (
+            self.cursor_query_param in request.query_params and
+            not request.parser_context['kwargs'].get('is_embedded')
+        )
+
     def page_number_query(self, url, page_number):
         """
         Builds uri and adds page param.
@@ -56,6 +121,24 @@ class JSONAPIPagination(pagination.PageNumberPagination):
         page_number = self.page.next_page_number()
         return self.page_number_query(url, page_number)
 
+    def cursor_query(self, url, cursor):
+        url = self.request.build_absolute_uri(url)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_cursor_links(self, url):
+        page = self.cursor_page
+        first, last = (page.items[0], page.items[-1]) if page.items else (None, None)
+        return OrderedDict([
+            ('first', self.cursor_query(url, '') if page.has_previous else None),
+            ('last', None),
+            ('prev', self.cursor_query(url, self.get_item_cursor(first, reverse=True)) if page.has_previous and first else None),
+            ('next', self.cursor_query(url, self.get_item_cursor(last)) if page.has_next and last else None),
+            ('meta', OrderedDict([
+                ('total', page.count),
+                ('per_page', self.get_page_size(self.request)),
+            ] + ([('estimated', True)] if page.estimated else []))),
+        ])
+
     def get_paginated_response(self, data):
         """
         Formats paginated response in accordance with JSON API.
@@ -63,6 +146,15 @@ class JSONAPIPagination(pagination.PageNumberPagination):
         Creates pagination links from the view_name if embedded resource,
         rather than the location used in the request.
         """
+        if self.cursor_page is not None:
+            response_dict = OrderedDict([
+                ('data', data),
+                ('links', self.get_cursor_links(None)),
+            ])
+            if is_anonymized(self.request):
+                response_dict['meta'] = {'anonymous': True}
+            return Response(response_dict)
+
         kwargs = self.request.parser_context['kwargs'].copy()
         embedded = kwargs.pop('is_embedded', None)
         view_name = self.request.parser_context['view'].view_fqn
@@ -114,5 +206,93 @@ class JSONAPIPagination(pagination.PageNumberPagination):
             self.request = request
             return list(self.page)
 
+        elif self.is_cursor_request(request):
+            return self.paginate_cursor(queryset, request, view)
+
         else:
             return super(JSONAPIPagination, self).paginate_queryset(queryset, request, view=None)
+
+    def get_cursor_ordering(self, view):
+        """Return the `(field, descending)` seek key of `view`, always tie-broken on `_id`"""
+        ordering = getattr(view, 'cursor_ordering', None)
+        if not ordering or not hasattr(view, 'get_cursor_queryset'):
+            raise InvalidQueryStringError(
+                detail='Cursor pagination is not supported for this endpoint.',
+                parameter=self.cursor_query_param
+            )
+        return ordering.lstrip('-'), ordering.startswith('-')
+
+    def get_item_cursor(self, item, reverse=False):
+        field, _ = self.cursor_ordering
+        return encode_cursor(getattr(item, field), item._id, reverse=reverse)
+
+    def get_seek_query(self, value, _id, descending):
+        field, _ = self.cursor_ordering
+        op = 'lt' if descending else 'gt'
+        if field == '_id':
+            return Q('_id', op, _id)
+        return Q(field, op, value) | (Q(field, 'eq', value) & Q('_id', op, _id))
+
+    def get_cursor_count(self, queryset, request):
+        mode = request.query_params.get(self.count_query_param, 'none')
+        if mode not in self.count_modes:
+            raise InvalidQueryStringError(
+                detail='{} must be one of {}.'.format(self.count_query_param, ', '.join(self.count_modes)),
+                parameter=self.count_query_param
+            )
+        if mode == 'exact':
+            return self.count_items(queryset), False
+        if mode == 'estimate':
+            count = self.count_items(queryset, limit=self.count_estimate_limit)
+            return count, count >= self.count_estimate_limit
+        return None, False
+
+    def count_items(self, queryset, limit=None):
+        """Count a queryset or list, counting at most `limit` items if given"""
+        if isinstance(queryset, list):
+            return len(queryset[:limit] if limit else queryset)
+        if limit:
+            # A limited QuerySet counts only up to its limit
+            queryset = queryset.limit(limit)
+        return queryset.count()
+
+    def paginate_cursor(self, queryset, request, view):
+        """Fetch one page by seeking past the cursor on an indexed sort key.
+
+        Asks the view for `page_size + 1` items so the presence of a next page is known without a count.
+        Views may define `filter_cursor_results` to drop items they cannot express in the query; the
+        page is then topped up from further seeks.
+        """
+        self.request = request
+        self.cursor_ordering = field, descending = self.get_cursor_ordering(view)
+        page_size = self.get_page_size(request)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        value, _id, reverse = decode_cursor(cursor) if cursor else (None, None, False)
+        # Walking backwards from a `prev` cursor flips the direction of the seek and the sort
+        seek_descending = descending != reverse
+        sort_prefix = '-' if seek_descending else ''
+        sort = [sort_prefix + field] + ([sort_prefix + '_id'] if field != '_id' else [])
+        filter_results = getattr(view, 'filter_cursor_results', lambda items: items)
+
+        items = []
+        exhausted = False
+        seek_query = self.get_seek_query(value, _id, seek_descending) if cursor else None
+        while len(items) <= page_size and not exhausted:
+            batch = list(view.get_cursor_queryset(seek_query).sort(*sort).limit(page_size + 1))
+            exhausted = len(batch) <= page_size
+            if batch:
+                seek_query = self.get_seek_query(getattr(batch[-1], field), batch[-1]._id, seek_descending)
+            items.extend(filter_results(batch))
+
+        has_more = len(items) > page_size
+        items = items[:page_size]
+        if reverse:
+            items.reverse()
+            has_next, has_previous = bool(cursor), has_more
+        else:
+            has_next, has_previous = has_more, bool(cursor)
+
+        count, estimated = self.get_cursor_count(queryset, request)
+        self.cursor_page = CursorPage(items, has_next, has_previous, count=count, estimated=estimated)
+        return items
@@ -624,6 +624,16 @@ class JSONAPIListSerializer(ser.ListSerializer):
             errors = data.get('errors', None)
             data = data.get('data', None)
 
+        # Let the child serializer and embed resolvers batch their lookups for the whole page
+        data = list(data) if data is not None else []
+        child_prefetch = getattr(self.child, 'prefetch', None)
+        if child_prefetch:
+            child_prefetch(data)
+        for resolver in self.context.get('embed', {}).values():
+            prefetch = getattr(resolver, 'prefetch', None)
+            if prefetch:
+                prefetch(data)
+
         ret = [
             self.child.to_representation(item, envelope=None) for item in data
         ]
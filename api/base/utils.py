@@ -8,6 +8,7 @@ import furl
 from website import util as website_util  # noqa
 from website import settings as website_settings
 from framework.auth import Auth, User
+from framework.mongo import StoredObject
 from api.base.exceptions import Gone
 
 # These values are copied from rest_framework.fields.BooleanField
@@ -55,13 +56,16 @@ def absolute_reverse(view_name, query_kwargs=None, args=None, kwargs=None):
 def get_object_or_error(model_cls, query_or_pk, display_name=None):
     display_name = display_name or None
 
-    if isinstance(query_or_pk, basestring):
-        query = Q('_id', 'eq', query_or_pk)
-    else:
-        query = query_or_pk
-
     try:
-        obj = model_cls.find_one(query)
+        if isinstance(query_or_pk, basestring) and issubclass(model_cls, StoredObject):
+            # Loading by primary key goes through the request-scoped object cache,
+            # which may already hold the object (e.g. prefetched for embeds)
+            obj = model_cls.load(query_or_pk)
+            if obj is None:
+                raise NoResultsFound
+        else:
+            query = Q('_id', 'eq', query_or_pk) if isinstance(query_or_pk, basestring) else query_or_pk
+            obj = model_cls.find_one(query)
         if getattr(obj, 'is_deleted', False) is True:
             if display_name is None:
                 raise Gone
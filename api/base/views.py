@@ -1,4 +1,7 @@
+import collections
+
 from django.http import JsonResponse
+from django.core.urlresolvers import NoReverseMatch
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import generics
@@ -10,6 +13,56 @@ from .utils import absolute_reverse
 from .requests import EmbeddedRequest
 
 
+class EmbedResolver(object):
+    """Fetches the values of one embedded field for the items of a response.
+
+    Calling the resolver with an item dispatches the related view, exactly as a client
+    following the relationship link would. Two things keep this cheap for a page of items:
+
+    * `prefetch` resolves the relationship of every item on the page up front and lets each
+      related view class bulk-load what it needs through an optional `prefetch_embeds(kwargs_list)`
+      classmethod, so the per-item dispatches are served from the request's object cache.
+    * Items that share a related resource (e.g. the same parent) share a single dispatch.
+    """
+
+    def __init__(self, request, field):
+        self.request = request
+        self.field = getattr(field, 'field', None) or field
+        self.results = {}
+
+    def resolve(self, item):
+        # resolve must be implemented on the field
+        view, view_args, view_kwargs = self.field.resolve(item)
+        if issubclass(view.cls, ListModelMixin) and self.field.always_embed:
+            raise Exception("Cannot auto-embed a list view.")
+        return view, view_args, view_kwargs
+
+    def prefetch(self, items):
+        kwargs_by_view = collections.OrderedDict()
+        for item in items:
+            try:
+                view, _, view_kwargs = self.resolve(item)
+            except (NoReverseMatch, AttributeError):
+                # Relationship not set on this item; nothing to embed
+                continue
+            kwargs_by_view.setdefault(view.cls, []).append(view_kwargs)
+        for view_cls, kwargs_list in kwargs_by_view.items():
+            prefetch_embeds = getattr(view_cls, 'prefetch_embeds', None)
+            if prefetch_embeds:
+                prefetch_embeds(kwargs_list)
+
+    def __call__(self, item):
+        view, view_args, view_kwargs = self.resolve(item)
+        key = (view.cls, tuple(view_args), tuple(sorted(view_kwargs.items())))
+        if key not in self.results:
+            view_kwargs.update({
+                'request': EmbeddedRequest(self.request),
+                'is_embedded': True
+            })
+            self.results[key] = view(*view_args, **view_kwargs).data
+        return self.results[key]
+
+
 class JSONAPIBaseView(generics.GenericAPIView):
 
     def __init__(self, **kwargs):
@@ -19,28 +72,14 @@ class JSONAPIBaseView(generics.GenericAPIView):
         super(JSONAPIBaseView, self).__init__(**kwargs)
 
     def _get_embed_partial(self, field_name, field):
-        """Create a partial function to fetch the values of an embedded field. A basic
+        """Create a resolver to fetch the values of an embedded field. A basic
         example is to include a Node's children in a single response.
 
         :param str field_name: Name of field of the view's serializer_class to load
         results for
-        :return function object -> dict:
+        :return EmbedResolver: callable object -> dict
         """
-        if getattr(field, 'field', None):
-                field = field.field
-        def partial(item):
-            # resolve must be implemented on the field
-            view, view_args, view_kwargs = field.resolve(item)
-            if issubclass(view.cls, ListModelMixin) and field.always_embed:
-                raise Exception("Cannot auto-embed a list view.")
-            request = EmbeddedRequest(self.request)
-            view_kwargs.update({
-                'request': request,
-                'is_embedded': True
-            })
-            response = view(*view_args, **view_kwargs)
-            return response.data
-        return partial
+        return EmbedResolver(self.request, field)
 
     def get_serializer_context(self):
         """Inject request into the serializer context. Additionally, inject partial functions
@@ -8,6 +8,7 @@ from django.core.urlresolvers import resolve, reverse
 from website import settings
 from framework.auth.core import User
 from website.files.models import FileNode
+from website.files.utils import prefetch_versions
 from api.base.utils import absolute_reverse
 from api.base.serializers import NodeFileHyperLinkField, WaterbutlerLink, format_relationship_links
 from api.base.serializers import Link, JSONAPISerializer, LinksField, IDField, TypeField
@@ -125,6 +126,10 @@ class FileSerializer(JSONAPISerializer):
     class Meta:
         type_ = 'files'
 
+    def prefetch(self, files):
+        # size, dates and hashes all come from the first or latest version
+        prefetch_versions(files)
+
     def get_size(self, obj):
         if obj.versions:
             return obj.versions[-1].size
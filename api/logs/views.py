@@ -87,7 +87,7 @@ class LogNodeList(JSONAPIBaseView, generics.ListAPIView, ODMFilterMixin):
         else:
             auth_user = get_user_auth(self.request)
             return [
-                node for node in log.node__logged
+                node for node in log.logged_nodes
                 if node.can_view(auth_user)
             ]
 
@@ -56,6 +56,12 @@ class NodeMixin(object):
     serializer_class = NodeSerializer
     node_lookup_url_kwarg = 'node_id'
 
+    @classmethod
+    def prefetch_embeds(cls, kwargs_list):
+        """Load every node about to be embedded with one query; `get_node` then hits the object cache."""
+        node_ids = list(set(kwargs[cls.node_lookup_url_kwarg] for kwargs in kwargs_list))
+        return list(Node.find(Q('_id', 'in', node_ids)))
+
     def get_node(self, check_object_permissions=True):
         node = get_object_or_error(
             Node,
@@ -205,6 +211,10 @@ class NodeList(JSONAPIBaseView, bulk_views.BulkUpdateJSONAPIView, bulk_views.Bul
 
     + `page=<Int>` -- page number of results to view, default 1
 
+    + `page[cursor]=<Str>` -- opt in to cursor pagination.  Pass an empty value for the first page, then follow the
+    opaque `next` and `prev` links.  Pages are ordered by `-date_modified` and cost the same however deep they are.  The
+    total is omitted unless `page[count]=exact` or `page[count]=estimate` is also given.
+
     + `filter[<fieldname>]=<Str>` -- fields and values to filter the search results on.
 
     + `view_only=<Str>` -- Allow users with limited access keys to access this node. Note that some keys are anonymous, so using the view_only key will cause user-related information to no longer serialize. This includes blank ids for users and contributors and missing serializer fields and relationships.
@@ -231,6 +241,7 @@ class NodeList(JSONAPIBaseView, bulk_views.BulkUpdateJSONAPIView, bulk_views.Bul
     view_name = 'node-list'
 
     ordering = ('-date_modified', )  # default ordering
+    cursor_ordering = '-date_modified'
 
     # overrides ODMFilterMixin
     def get_default_odm_query(self):
@@ -570,6 +581,13 @@ class NodeContributorsList(JSONAPIBaseView, bulk_views.BulkUpdateJSONAPIView, bu
     view_category = 'nodes'
     view_name = 'node-contributors'
 
+    # overrides NodeMixin
+    @classmethod
+    def prefetch_embeds(cls, kwargs_list):
+        nodes = super(NodeContributorsList, cls).prefetch_embeds(kwargs_list)
+        user_ids = list(set(user_id for node in nodes for user_id in node.contributors._to_primary_keys()))
+        return list(User.find(Q('_id', 'in', user_ids)))
+
     def get_default_queryset(self):
         node = self.get_node()
         visible_contributors = node.visible_contributor_ids
@@ -1357,6 +1375,30 @@ class NodeFilesList(JSONAPIBaseView, generics.ListAPIView, WaterButlerMixin, Lis
     view_category = 'nodes'
     view_name = 'node-files'
 
+    # Fields stored on StoredFileNode; filters on these are answered by the database for osfstorage.
+    # `path` and `materialized_path` are computed for osfstorage and stored empty, so they are not here
+    odm_filterable_fields = frozenset([
+        '_id',
+        'name',
+        'provider',
+        'last_touched',
+    ])
+
+    # overrides ListFilterMixin
+    def get_default_odm_query(self):
+        if self.kwargs[self.provider_lookup_url_kwarg] != 'osfstorage':
+            return None
+
+        folder = self.fetch_from_waterbutler()
+        if getattr(folder, 'is_file', False):
+            raise NotFound
+
+        return Q('parent', 'eq', folder._id)
+
+    # overrides ListFilterMixin
+    def get_odm_queryset(self, query):
+        return FileNode.find(query)
+
     def get_default_queryset(self):
         # Don't bother going to waterbutler for osfstorage
         files_list = self.fetch_from_waterbutler()
@@ -1741,6 +1783,10 @@ class NodeLogList(JSONAPIBaseView, generics.ListAPIView, NodeMixin, ODMFilterMix
 
     ##Query Params
 
+    + `page[cursor]=<Str>` -- opt in to cursor pagination.  Pass an empty value for the first page, then follow the
+    opaque `next` and `prev` links.  Pages are ordered by `-date` and cost the same however deep they are.  The
+    total is omitted unless `page[count]=exact` or `page[count]=estimate` is also given.
+
     <!--- Copied Query Params from LogList -->
 
     Logs may be filtered by their `action` and `date`.
@@ -1757,8 +1803,10 @@ class NodeLogList(JSONAPIBaseView, generics.ListAPIView, NodeMixin, ODMFilterMix
     required_write_scopes = [CoreScopes.NULL]
 
     log_lookup_url_kwarg = 'node_id'
+    model_class = NodeLog
 
     ordering = ('-date', )
+    cursor_ordering = '-date'
 
     permission_classes = (
         drf_permissions.IsAuthenticatedOrReadOnly,
@@ -29,6 +29,12 @@ class UserMixin(object):
     serializer_class = UserSerializer
     user_lookup_url_kwarg = 'user_id'
 
+    @classmethod
+    def prefetch_embeds(cls, kwargs_list):
+        """Load every user about to be embedded with one query; `get_user` then hits the object cache."""
+        user_ids = list(set(kwargs[cls.user_lookup_url_kwarg] for kwargs in kwargs_list) - {'me'})
+        return list(User.find(Q('_id', 'in', user_ids)))
+
     def get_user(self, check_permissions=True):
         key = self.kwargs[self.user_lookup_url_kwarg]
         current_user = self.request.user
@@ -265,6 +271,10 @@ class UserNodes(JSONAPIBaseView, generics.ListAPIView, UserMixin, ODMFilterMixin
 
     + `page=<Int>` -- page number of results to view, default 1
 
+    + `page[cursor]=<Str>` -- opt in to cursor pagination.  Pass an empty value for the first page, then follow the
+    opaque `next` and `prev` links.  Pages are ordered by `-date_modified` and cost the same however deep they are.  The
+    total is omitted unless `page[count]=exact` or `page[count]=estimate` is also given.
+
     + `filter[<fieldname>]=<Str>` -- fields and values to filter the search results on.
 
     <!--- Copied Query Params from NodeList -->
@@ -288,6 +298,9 @@ class UserNodes(JSONAPIBaseView, generics.ListAPIView, UserMixin, ODMFilterMixin
     serializer_class = NodeSerializer
     view_category = 'users'
     view_name = 'user-nodes'
+    model_class = Node
+
+    cursor_ordering = '-date_modified'
 
     # overrides ODMFilterMixin
     def get_default_odm_query(self):
@@ -298,17 +311,35 @@ class UserNodes(JSONAPIBaseView, generics.ListAPIView, UserMixin, ODMFilterMixin
             Q('is_deleted', 'ne', True)
         )
 
-    # overrides ListAPIView
-    def get_queryset(self):
+    def get_auth(self):
         current_user = self.request.user
         if current_user.is_anonymous():
-            auth = Auth(None)
-        else:
-            auth = Auth(current_user)
+            return Auth(None)
+        return Auth(current_user)
+
+    # overrides ListAPIView
+    def get_queryset(self):
         query = self.get_query_from_request()
-        raw_nodes = Node.find(self.get_default_odm_query() & query)
-        nodes = [each for each in raw_nodes if each.is_public or each.can_view(auth)]
-        return nodes
+        if self.paginator.is_cursor_request(self.request):
+            # Pages are checked by filter_cursor_results; this queryset is only used to count
+            # them for `page[count]`, so it must leave out nodes the requester cannot see
+            return Node.find(self.get_default_odm_query() & query & self.get_visibility_odm_query())
+        return self.filter_cursor_results(Node.find(self.get_default_odm_query() & query))
+
+    def get_visibility_odm_query(self):
+        """Nodes the requester can see: public ones and those they contribute to or administer
+        through a parent.
+        """
+        query = Q('is_public', 'eq', True)
+        user = self.request.user
+        if not user.is_anonymous():
+            query = query | Q('contributors', 'eq', user) | Q('inherited_admin_ids', 'eq', user._id)
+        return query
+
+    # used by JSONAPIPagination for `page[cursor]` requests
+    def filter_cursor_results(self, nodes):
+        auth = self.get_auth()
+        return [each for each in nodes if each.is_public or each.can_view(auth)]
 
 
 class UserRegistrations(UserNodes):
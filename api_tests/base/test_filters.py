@@ -5,11 +5,12 @@ from dateutil import parser
 
 from nose.tools import *  # flake8: noqa
 
+from modularodm import Q
 from rest_framework import serializers as ser
 
 from tests.base import ApiTestCase
 
-from api.base.filters import FilterMixin
+from api.base.filters import FilterMixin, ListFilterMixin
 
 from api.base.exceptions import (
     InvalidFilterError,
@@ -34,6 +35,15 @@ class FakeView(FilterMixin):
 
     serializer_class = FakeSerializer
 
+class FakeRecord(object):
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+class FakeListView(ListFilterMixin):
+
+    serializer_class = FakeSerializer
+
 class TestFilterMixin(ApiTestCase):
 
     def setUp(self):
@@ -222,3 +232,71 @@ class TestFilterMixin(ApiTestCase):
         field = FakeSerializer._declared_fields['float_field']
         value = self.view.convert_value(value, field)
         assert_equal(value, 42.0)
+
+
+class TestListFilterMixin(ApiTestCase):
+
+    def setUp(self):
+        super(TestListFilterMixin, self).setUp()
+        self.view = FakeListView()
+        self.records = [
+            FakeRecord(string_field='Foo Bar', int_field=1, foobar=True),
+            FakeRecord(string_field='baz', int_field=2, foobar=False),
+            FakeRecord(string_field='foo', int_field=3, foobar=True),
+        ]
+
+    def test_param_queryset_applies_all_filters(self):
+        query_params = {
+            'filter[string_field]': 'foo',
+            'filter[bool_field]': 'true',
+            'filter[int_field][gt]': '1',
+        }
+        results = self.view.param_queryset(query_params, self.records)
+        assert_equal(results, [self.records[2]])
+
+    def test_param_queryset_preserves_order(self):
+        query_params = {
+            'filter[bool_field]': 'true',
+        }
+        results = self.view.param_queryset(query_params, self.records)
+        assert_equal(results, [self.records[0], self.records[2]])
+
+    def test_param_queryset_iterates_default_queryset_once(self):
+        iterations = []
+
+        def default_queryset():
+            iterations.append(1)
+            for record in self.records:
+                yield record
+
+        query_params = {
+            'filter[string_field]': 'foo',
+            'filter[int_field][lte]': '2',
+        }
+        results = self.view.param_queryset(query_params, default_queryset())
+        assert_equal(results, [self.records[0]])
+        assert_equal(len(iterations), 1)
+
+    def test_param_queryset_ne(self):
+        query_params = {
+            'filter[int_field][ne]': '2',
+        }
+        results = self.view.param_queryset(query_params, self.records)
+        assert_equal(results, [self.records[0], self.records[2]])
+
+    def test_filters_on_stored_fields_are_pushed_down(self):
+        queries = []
+        view = FakeListView()
+        view.odm_filterable_fields = frozenset(['int_field'])
+        view.get_default_odm_query = lambda: Q('parent', 'eq', 'abcde')
+        view.get_odm_queryset = lambda query: queries.append(query) or self.records[1:]
+        view.get_default_queryset = lambda: self.fail('default queryset should not be loaded')
+
+        results = view.filter_queryset_from_filters(
+            view.parse_query_params({
+                'filter[int_field][gte]': '2',
+                'filter[bool_field]': 'true',
+            })
+        )
+        assert_equal(len(queries), 1)
+        assert_equal(results, [self.records[2]])
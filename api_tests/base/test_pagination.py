@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+import datetime
+
+import mock
+from nose.tools import *  # flake8: noqa
+
+from website.models import Node
+
+from api.base.exceptions import InvalidQueryStringError
+from api.base.pagination import JSONAPIPagination, encode_cursor, decode_cursor
+from api.base.settings.defaults import API_BASE
+
+from tests.base import ApiTestCase
+from tests.factories import ProjectFactory
+
+
+class TestCursorEncoding(ApiTestCase):
+
+    def test_round_trips_datetimes(self):
+        now = datetime.datetime(2015, 12, 1, 10, 30, 15, 1234)
+        cursor = encode_cursor(now, 'abcde')
+        assert_equal(decode_cursor(cursor), (now, 'abcde', False))
+
+    def test_round_trips_reverse_flag(self):
+        cursor = encode_cursor('abcde', 'abcde', reverse=True)
+        assert_equal(decode_cursor(cursor), ('abcde', 'abcde', True))
+
+    def test_invalid_cursor_raises(self):
+        with assert_raises(InvalidQueryStringError):
+            decode_cursor('not-a-cursor')
+
+
+class TestCursorPagination(ApiTestCase):
+
+    def setUp(self):
+        super(TestCursorPagination, self).setUp()
+        self.projects = [ProjectFactory(is_public=True) for _ in range(5)]
+        self.expected = [
+            each._id for each in
+            sorted(self.projects, key=lambda node: (node.date_modified, node._id), reverse=True)
+        ]
+        self.url = '/{}nodes/?page[cursor]=&page[size]=2'.format(API_BASE)
+
+    def tearDown(self):
+        super(TestCursorPagination, self).tearDown()
+        Node.remove()
+
+    def test_walks_all_pages_in_order(self):
+        seen = []
+        url = self.url
+        while url:
+            res = self.app.get(url)
+            seen.extend(each['id'] for each in res.json['data'])
+            url = res.json['links']['next']
+        assert_equal(seen, self.expected)
+
+    def test_first_page_has_no_prev_and_skips_total(self):
+        res = self.app.get(self.url)
+        links = res.json['links']
+        assert_is_none(links['prev'])
+        assert_is_none(links['meta']['total'])
+        assert_equal(links['meta']['per_page'], 2)
+
+    def test_exact_count(self):
+        res = self.app.get(self.url + '&page[count]=exact')
+        assert_equal(res.json['links']['meta']['total'], 5)
+
+    def test_estimated_count(self):
+        res = self.app.get(self.url + '&page[count]=estimate')
+        assert_equal(res.json['links']['meta']['total'], 5)
+        assert_not_in('estimated', res.json['links']['meta'])
+
+    def test_estimated_count_stops_at_limit(self):
+        with mock.patch.object(JSONAPIPagination, 'count_estimate_limit', 3):
+            res = self.app.get(self.url + '&page[count]=estimate')
+        assert_equal(res.json['links']['meta']['total'], 3)
+        assert_true(res.json['links']['meta']['estimated'])
+
+    def test_prev_link_returns_previous_page(self):
+        first = self.app.get(self.url)
+        second = self.app.get(first.json['links']['next'])
+        back = self.app.get(second.json['links']['prev'])
+        assert_equal(
+            [each['id'] for each in back.json['data']],
+            [each['id'] for each in first.json['data']]
+        )
+
+    def test_invalid_cursor_is_bad_request(self):
+        res = self.app.get('/{}nodes/?page[cursor]=garbage'.format(API_BASE), expect_errors=True)
+        assert_equal(res.status_code, 400)
+
+    def test_unsupported_endpoint_is_bad_request(self):
+        project = self.projects[0]
+        url = '/{}nodes/{}/contributors/?page[cursor]='.format(API_BASE, project._id)
+        res = self.app.get(url, expect_errors=True)
+        assert_equal(res.status_code, 400)
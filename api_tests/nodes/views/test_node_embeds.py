@@ -1,9 +1,12 @@
 from nose.tools import *  # flake8: noqa
 import functools
 
+import mock
+
 from framework.auth.core import Auth
 
 from api.base.settings.defaults import API_BASE
+from api.base.requests import EmbeddedRequest
 from tests.base import ApiTestCase
 from tests.factories import (
     ProjectFactory,
@@ -79,3 +82,20 @@ class TestNodeEmbeds(ApiTestCase):
         assert_equal(res.status_code, 400)
         assert_equal(res.json['errors'][0]['detail'], "The following fields are not embeddable: title")
 
+    def test_embed_shared_parent_is_dispatched_once(self):
+        url = '/{0}nodes/{1}/children/?embed=parent'.format(API_BASE, self.root_node._id)
+
+        with mock.patch('api.base.views.EmbeddedRequest', wraps=EmbeddedRequest) as mock_request:
+            res = self.app.get(url, auth=self.user.auth)
+        assert_equal(mock_request.call_count, 1)
+        parents = [each['embeds']['parent']['data']['id'] for each in res.json['data']]
+        assert_equal(parents, [self.root_node._id, self.root_node._id])
+
+    def test_embed_on_list_matches_detail_embed(self):
+        list_url = '/{0}nodes/{1}/children/?embed=contributors'.format(API_BASE, self.root_node._id)
+        detail_url = '/{0}nodes/{1}/?embed=contributors'.format(API_BASE, self.child1._id)
+
+        list_res = self.app.get(list_url, auth=self.user.auth)
+        detail_res = self.app.get(detail_url, auth=self.user.auth)
+        from_list = next(each for each in list_res.json['data'] if each['id'] == self.child1._id)
+        assert_equal(from_list['embeds'], detail_res.json['data']['embeds'])
@@ -307,6 +307,26 @@ class TestNodeFilesListFiltering(ApiTestCase):
         assert_equal(len(res.json['data']), 1)  # filters out 'xyz'
         assert_equal(res.json['data'][0]['attributes']['name'], 'abc')
 
+    def test_osfstorage_files_are_filterable_by_path(self):
+        root = self.project.get_addon('osfstorage').get_root()
+        fobj = root.append_file('xyz')
+        root.append_folder('abc')
+        url = '/{}nodes/{}/files/osfstorage/?filter[path]={}'.format(API_BASE, self.project._id, fobj._id)
+        res = self.app.get(url, auth=self.user.auth)
+        assert_equal(res.status_code, 200)
+        assert_equal(len(res.json['data']), 1)
+        assert_equal(res.json['data'][0]['attributes']['name'], 'xyz')
+
+    def test_osfstorage_files_are_filterable_by_materialized_path(self):
+        root = self.project.get_addon('osfstorage').get_root()
+        root.append_file('xyz')
+        root.append_folder('abc')
+        url = '/{}nodes/{}/files/osfstorage/?filter[materialized_path]=/abc/'.format(API_BASE, self.project._id)
+        res = self.app.get(url, auth=self.user.auth)
+        assert_equal(res.status_code, 200)
+        assert_equal(len(res.json['data']), 1)
+        assert_equal(res.json['data'][0]['attributes']['name'], 'abc')
+
 
 class TestNodeFilesListPagination(ApiTestCase):
     def setUp(self):
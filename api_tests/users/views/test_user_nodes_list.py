@@ -48,6 +48,15 @@ class TestUserNodes(ApiTestCase):
         assert_equal(res.status_code, 200)
         assert_equal(res.content_type, 'application/vnd.api+json')
 
+    def test_cursor_count_leaves_out_hidden_nodes(self):
+        url = "/{}users/{}/nodes/?page[cursor]=&page[count]=exact".format(API_BASE, self.user_one._id)
+        res = self.app.get(url, auth=self.user_two.auth)
+        assert_equal(res.json['links']['meta']['total'], 1)
+        res = self.app.get(url + '&page[count]=estimate')
+        assert_equal(res.json['links']['meta']['total'], 1)
+        res = self.app.get(url, auth=self.user_one.auth)
+        assert_equal(res.json['links']['meta']['total'], 2)
+
     def test_anonymous_gets_200(self):
         url = "/{}users/{}/nodes/".format(API_BASE, self.user_one._id)
         res = self.app.get(url)
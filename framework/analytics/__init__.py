@@ -154,3 +154,22 @@ def get_basic_counters(page, db=None):
         return unique, total
     else:
         return None, None
+
+
+def get_basic_counters_many(pages, db=None):
+    """Like `get_basic_counters` for many pages at once, with a single query.
+
+    :return dict: Maps each page to its ``(unique, total)`` pair; ``(None, None)``
+        for pages that have never been counted
+    """
+    db = db or database
+    pages = list(pages)
+    cleaned = dict((clean_page(page), page) for page in pages)
+    counters = dict((page, (None, None)) for page in pages)
+    results = db['pagecounters'].find(
+        {'_id': {'$in': list(cleaned)}},
+        {'total': 1, 'unique': 1}
+    )
+    for result in results:
+        counters[cleaned[result['_id']]] = (result.get('unique', 0), result.get('total', 0))
+    return counters
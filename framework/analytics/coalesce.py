@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""Pending Piwik updates, kept in the ``piwikpending`` collection until they
+are flushed, one document per node or user. Repeated updates of one object
+within ``settings.PIWIK_UPDATE_WINDOW`` merge into one update, and their
+updated fields are combined.
+"""
+import datetime
+
+from framework.mongo import database
+
+PENDING_COLLECTION = 'piwikpending'
+
+NODE = 'node'
+USER = 'user'
+
+
+def _pending_id(kind, object_id):
+    return '{0}:{1}'.format(kind, object_id)
+
+
+def add_update(kind, object_id, updated_fields=None, requests=1):
+    """Record that an object needs updating in Piwik.
+
+    :param str kind: ``NODE`` or ``USER``
+    :param updated_fields: Names of the fields that changed, or None if all
+        should be synced
+    :param int requests: Number of updates this one stands for
+    :return: True if no update of the object was pending yet
+    """
+    update = {
+        '$inc': {'requests': requests},
+        '$setOnInsert': {
+            'kind': kind,
+            'object_id': object_id,
+            'queued': datetime.datetime.utcnow(),
+        },
+    }
+    if updated_fields is None:
+        update['$set'] = {'all_fields': True}
+    else:
+        update['$addToSet'] = {'fields': {'$each': list(updated_fields)}}
+    result = database[PENDING_COLLECTION].update(
+        {'_id': _pending_id(kind, object_id)}, update, upsert=True
+    )
+    return not result.get('updatedExisting')
+
+
+def updated_fields(pending):
+    """Fields to sync for a pending update; None means all of them."""
+    if pending.get('all_fields'):
+        return None
+    return pending.get('fields', [])
+
+
+def take_updates():
+    """Remove and return every pending update, oldest first. Each one is removed
+    atomically, so updates recorded meanwhile are either taken or left for the
+    next flush.
+    """
+    taken = []
+    while True:
+        pending = database[PENDING_COLLECTION].find_and_modify(
+            query={}, sort=[('queued', 1)], remove=True
+        )
+        if pending is None:
+            return taken
+        taken.append(pending)
+
+
+def restore_updates(taken):
+    """Put back updates that could not be flushed, merging them with any
+    recorded since.
+    """
+    for pending in taken:
+        add_update(
+            pending['kind'],
+            pending['object_id'],
+            updated_fields(pending),
+            requests=pending['requests'],
+        )
@@ -2,13 +2,22 @@
 
 import json
 import uuid
+import logging
 from hashlib import md5
 from urllib import urlencode
 
 import requests
 
+from framework.transactions.context import TokuTransaction
+
 from website import settings
 
+logger = logging.getLogger(__name__)
+
+
+# Most API calls sent in one API.getBulkRequest
+BULK_REQUEST_SIZE = 100
+
 
 class PiwikException(Exception):
     pass
@@ -184,14 +193,165 @@ def _provision_node(node):
         )
 
 
+def _bulk_request(calls):
+    """Send API calls to Piwik as ``API.getBulkRequest`` requests of at most
+    ``BULK_REQUEST_SIZE`` calls each. A request that fails leaves ``None`` as the
+    result of each of its calls, so that the other requests' results can be used.
+
+    :param list calls: Dicts of each call's parameters
+    :return: 2-tuple of (results, in the order of ``calls``; number of requests made)
+    """
+    results = []
+    requests_made = 0
+    for index in range(0, len(calls), BULK_REQUEST_SIZE):
+        chunk = calls[index:index + BULK_REQUEST_SIZE]
+        requests_made += 1
+        try:
+            response = requests.post(
+                url=settings.PIWIK_HOST,
+                data=dict(
+                    module='API',
+                    method='API.getBulkRequest',
+                    format='json',
+                    token_auth=settings.PIWIK_ADMIN_TOKEN,
+                    **{
+                        'urls[{}]'.format(idx): urlencode(call)
+                        for idx, call in enumerate(chunk)
+                    }
+                )
+            )
+            rv = json.loads(response.content)
+        except (requests.exceptions.RequestException, ValueError) as error:
+            logger.error('Piwik bulk request failed: {!r}'.format(error))
+            rv = None
+        if not isinstance(rv, list) or len(rv) != len(chunk):
+            rv = [None] * len(chunk)
+        results.extend(rv)
+    return results, requests_made
+
+
+def _is_error(result):
+    return result is None or (isinstance(result, dict) and result.get('result') == 'error')
+
+
+def _create_users(users):
+    """Create Piwik users for many OSF users with bulk requests; see `_create_user`.
+    Users that were created get their token even if others failed.
+
+    :return: 2-tuple of (number of requests made; IDs of the users that failed)
+    """
+    logins = [('osf.' + user._id, str(uuid.uuid4())[:8]) for user in users]
+    results, requests_made = _bulk_request([
+        {
+            'method': 'UsersManager.addUser',
+            'userLogin': login,
+            'password': pw,
+            'email': user._id + '@osf.io',
+            'alias': 'OSF User: {}'.format(user._id),
+        }
+        for user, (login, pw) in zip(users, logins)
+    ])
+
+    failed = set()
+    for user, (login, pw), result in zip(users, logins, results):
+        if _is_error(result):
+            failed.add(user._id)
+            continue
+        user.piwik_token = md5(login + md5(pw).hexdigest()).hexdigest()
+        user.save()
+    return requests_made, failed
+
+
+def _update_node_objects(updates):
+    """Sync many nodes with Piwik; see `_update_node_object`. Sites are provisioned
+    one at a time, each in its own transaction, but the view access of every node
+    whose contributors changed is read with bulk requests, and all access changes
+    are sent with others. A node that fails does not stop the others.
+
+    :param updates: List of ``(node, updated_fields)`` pairs
+    :return: 3-tuple of (requests made; requests `_update_node_object` would
+        have made for each node on its own; IDs of the nodes that failed)
+    """
+    requests_made = unbatched = 0
+    failed = set()
+    provisioned = []
+    for node, updated_fields in updates:
+        if node.piwik_site_id:
+            provisioned.append((node, updated_fields))
+            continue
+        calls = 2 if node.contributors else 1
+        requests_made += calls
+        unbatched += calls
+        try:
+            # Commit each new site on its own, so that it is kept whatever
+            # happens to the other nodes
+            with TokuTransaction():
+                _provision_node(node)
+        except Exception:
+            logger.exception('Piwik site creation failed for {}'.format(node._id))
+            failed.add(node._id)
+
+    checked = [
+        node for node, updated_fields in provisioned
+        if updated_fields is None or 'contributors' in updated_fields
+    ]
+    results, calls = _bulk_request([
+        {
+            'method': 'UsersManager.getUsersWithSiteAccess',
+            'idSite': node.piwik_site_id,
+            'access': 'view',
+        }
+        for node in checked
+    ])
+    requests_made += calls
+    unbatched += len(checked)
+
+    changes = []
+    for node, result in zip(checked, results):
+        if not isinstance(result, list):
+            logger.error('Failed to retrieve users for {}'.format(node._id))
+            failed.add(node._id)
+            continue
+        users = set((x.get('login') for x in result if x.get('login') != 'anonymous'))
+        contributors = set(('osf.' + x._id for x in node.contributors if x))
+        for logins, access in ((users - contributors, 'noaccess'), (contributors - users, 'view')):
+            if logins:
+                changes.extend((login, node, access) for login in logins)
+                unbatched += 1
+
+    for node, updated_fields in provisioned:
+        if updated_fields is None or 'is_public' in updated_fields:
+            changes.append(('anonymous', node, 'view' if node.is_public else 'noaccess'))
+            unbatched += 1
+
+    results, calls = _bulk_request([
+        {
+            'method': 'UsersManager.setUserAccess',
+            'userLogin': login,
+            'access': access,
+            'idSites': node.piwik_site_id,
+        }
+        for login, node, access in changes
+    ])
+    requests_made += calls
+    for (login, node, access), result in zip(changes, results):
+        if _is_error(result):
+            logger.error('Failed to update Piwik user permissions for {}'.format(node._id))
+            failed.add(node._id)
+
+    return requests_made, unbatched, failed
+
+
 class PiwikClient(object):
     def __init__(self, url,
-                 auth_token=None, site_id=None, period=None, date=None):
+                 auth_token=None, site_id=None, period=None, date=None,
+                 timeout=None):
         self.url = url
         self.auth_token = auth_token
         self.site_id = site_id
         self.period = period
         self.date = date
+        self.timeout = timeout
 
     @property
     def custom_variables(self):
@@ -226,7 +386,7 @@ class PiwikClient(object):
         }
         params.update(kwargs)
 
-        return requests.get(self.url, params=params).json()
+        return requests.get(self.url, params=params, timeout=self.timeout).json()
 
 
 class CustomVariableField(object):
@@ -1,10 +1,16 @@
 # -*- coding: utf-8 -*-
+import logging
 
 from framework.tasks import app
-from framework.tasks.handlers import queued_task
-from framework.transactions.context import transaction
+from framework.tasks.handlers import queued_task, enqueue_task
+from framework.transactions.context import transaction, TokuTransaction
+
+from website import settings
 
 from . import piwik
+from . import coalesce
+
+logger = logging.getLogger(__name__)
 
 
 @queued_task
@@ -30,3 +36,113 @@ def update_node(self, node_id, updated_fields=None):
         piwik._update_node_object(node, updated_fields)
     except Exception as error:
         raise self.retry(exc=error)
+
+
+def queue_user_update(user_id):
+    """Create the user in Piwik. With ``settings.PIWIK_UPDATE_WINDOW``, the update
+    is coalesced with others and sent by `flush_updates`; otherwise it is sent by
+    its own `update_user` task.
+    """
+    if not settings.PIWIK_UPDATE_WINDOW:
+        return update_user(user_id)
+    _queue_update(coalesce.USER, user_id)
+
+
+def queue_node_update(node_id, updated_fields=None):
+    """Sync the node with Piwik. With ``settings.PIWIK_UPDATE_WINDOW``, updates of
+    a node within the window are merged, and sent together with others by
+    `flush_updates`; otherwise each is sent by its own `update_node` task.
+    """
+    if not settings.PIWIK_UPDATE_WINDOW:
+        return update_node(node_id, updated_fields)
+    _queue_update(coalesce.NODE, node_id, updated_fields)
+
+
+def _queue_update(kind, object_id, updated_fields=None):
+    # Only the first update pending schedules a flush; later ones join it
+    if coalesce.add_update(kind, object_id, updated_fields):
+        enqueue_task(flush_updates.si().set(countdown=settings.PIWIK_UPDATE_WINDOW))
+
+
+@app.task(bind=True, name='analytics.flush_updates', max_retries=5, default_retry_delay=60)
+def flush_updates(self):
+    """Send every pending Piwik update. Updates are taken in their own
+    transaction, so that updates recorded while Piwik is called are not blocked.
+    Each object is synced on its own: updates that failed are put back and
+    retried, without undoing or repeating the others.
+
+    :return: dict of metrics, or None if nothing was pending
+    """
+    with TokuTransaction():
+        taken = coalesce.take_updates()
+    if not taken:
+        return None
+    try:
+        metrics, failed = sync_updates(taken)
+    except Exception as error:
+        with TokuTransaction():
+            coalesce.restore_updates(taken)
+        raise self.retry(exc=error)
+
+    logger.info(
+        'Flushed {updates} Piwik updates of {nodes} nodes and {users} users with '
+        '{api_calls} API calls; {merged} updates were merged and {calls_saved} calls '
+        'saved by batching; {failed} failed'.format(**metrics)
+    )
+    if failed:
+        with TokuTransaction():
+            coalesce.restore_updates(failed)
+        raise self.retry(exc=piwik.PiwikException(
+            'Piwik updates failed: {}'.format(', '.join(pending['_id'] for pending in failed))
+        ))
+    return metrics
+
+
+def sync_updates(taken):
+    """Send updates taken from the pending queue to Piwik.
+
+    :return: 2-tuple of (dict of metrics: updates recorded, updates merged into
+        others, nodes and users synced, API calls made, calls saved by batching
+        them, compared to syncing each object on its own, and updates that
+        failed; list of the updates that failed)
+    """
+    # Avoid circular imports
+    from website import models
+
+    nodes = [pending for pending in taken if pending['kind'] == coalesce.NODE]
+    user_ids = [pending['object_id'] for pending in taken if pending['kind'] == coalesce.USER]
+    metrics = {
+        'updates': sum(pending['requests'] for pending in taken),
+        'merged': sum(pending['requests'] - 1 for pending in taken),
+        'nodes': len(nodes),
+        'users': len(user_ids),
+        'api_calls': 0,
+        'calls_saved': 0,
+    }
+
+    failed_users, failed_nodes = set(), set()
+    users = [
+        user for user in models.User.load_many(user_ids)
+        if user is not None and not user.piwik_token
+    ]
+    if users:
+        calls, failed_users = piwik._create_users(users)
+        metrics['api_calls'] += calls
+        metrics['calls_saved'] += len(users) - calls
+
+    updates = [
+        (node, coalesce.updated_fields(pending))
+        for pending, node in zip(nodes, models.Node.load_many([pending['object_id'] for pending in nodes]))
+        if node is not None
+    ]
+    if updates:
+        calls, unbatched, failed_nodes = piwik._update_node_objects(updates)
+        metrics['api_calls'] += calls
+        metrics['calls_saved'] += unbatched - calls
+
+    failed = [
+        pending for pending in taken
+        if pending['object_id'] in (failed_nodes if pending['kind'] == coalesce.NODE else failed_users)
+    ]
+    metrics['failed'] = len(failed)
+    return metrics, failed
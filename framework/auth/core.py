@@ -1066,7 +1066,7 @@ class User(GuidStoredObject, AddonModelMixin):
             self.update_search()
             self.update_search_nodes_contributors()
         if settings.PIWIK_HOST and not self.piwik_token:
-            piwik_tasks.update_user(self._id)
+            piwik_tasks.queue_user_update(self._id)
         return ret
 
     def update_search(self):
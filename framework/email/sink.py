@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""A local SMTP server that accepts and counts every message without delivering
+it, for testing mail delivery and benchmarking its throughput.
+
+    python -m framework.email.sink [port] [connect delay in seconds]
+
+The connect delay stands in for the TLS handshake and login of a real mail
+server, which the sink does not support; send to it with ``ttls=False`` and
+``login=False``.
+"""
+import sys
+import time
+import smtpd
+import asyncore
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class SMTPSink(smtpd.SMTPServer):
+
+    def __init__(self, host='localhost', port=1025, connect_delay=0, keep=100):
+        smtpd.SMTPServer.__init__(self, (host, port), None)
+        self.port = self.socket.getsockname()[1]
+        self.connect_delay = connect_delay
+        self.keep = keep
+        self.connections = 0
+        self.received = 0
+        self.messages = []
+
+    def handle_accept(self):
+        self.connections += 1
+        if self.connect_delay:
+            time.sleep(self.connect_delay)
+        smtpd.SMTPServer.handle_accept(self)
+
+    def process_message(self, peer, mailfrom, rcpttos, data):
+        self.received += 1
+        self.messages.append((mailfrom, rcpttos, data))
+        del self.messages[:-self.keep]
+
+    def start(self):
+        """Serve from a daemon thread; see `stop`."""
+        self._thread = threading.Thread(target=asyncore.loop, kwargs={'timeout': 0.05})
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        asyncore.close_all()
+        self._thread.join()
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 1025
+    connect_delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0
+    sink = SMTPSink(port=port, connect_delay=connect_delay)
+    print('SMTP sink listening on localhost:{0}'.format(sink.port))
+    start = time.time()
+    try:
+        asyncore.loop(timeout=1)
+    except KeyboardInterrupt:
+        elapsed = time.time() - start
+        print('Received {0} messages over {1} connections in {2:.1f}s'.format(
+            sink.received, sink.connections, elapsed
+        ))
+
+
+if __name__ == '__main__':
+    main()
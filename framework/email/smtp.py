@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""Pooled SMTP delivery. Each worker process keeps a few authenticated
+connections per mail server and account. Batches of messages are sent over one
+connection, so a digest run does not open a connection, negotiate TLS and log in
+once per email.
+"""
+import time
+import socket
+import smtplib
+import logging
+import threading
+
+from website import settings
+
+logger = logging.getLogger(__name__)
+
+# Errors after which a connection cannot be used any more
+DISCONNECT_ERRORS = (smtplib.SMTPServerDisconnected, socket.error)
+
+
+class SMTPConnectionPool(object):
+    """Idle, authenticated connections to one mail server.
+
+    :param int size: Most idle connections kept open
+    :param int max_age: Seconds a connection is reused before it is replaced,
+        so that connections the server has timed out are rarely picked
+    """
+
+    def __init__(self, mail_server, username=None, password=None, ttls=True, login=True,
+                 size=None, max_age=None):
+        self.mail_server = mail_server
+        self.username = username
+        self.password = password
+        self.ttls = ttls
+        self.login = login
+        self.size = size or settings.MAIL_POOL_SIZE
+        self.max_age = max_age or settings.MAIL_POOL_MAX_AGE
+        self._idle = []
+        self._lock = threading.Lock()
+        self.stats = {'opened': 0, 'reused': 0, 'closed': 0}
+
+    def _connect(self):
+        connection = smtplib.SMTP(self.mail_server)
+        connection.ehlo()
+        if self.ttls:
+            connection.starttls()
+            connection.ehlo()
+        if self.login:
+            connection.login(self.username, self.password)
+        self.stats['opened'] += 1
+        return connection, time.time()
+
+    def _close(self, connection):
+        try:
+            connection.quit()
+        except DISCONNECT_ERRORS + (smtplib.SMTPException, ):
+            connection.close()
+        self.stats['closed'] += 1
+
+    def acquire(self):
+        """Return an idle connection, or a new one, as a ``(connection, opened)`` pair."""
+        expired = []
+        entry = None
+        with self._lock:
+            while self._idle:
+                connection, opened = self._idle.pop()
+                if time.time() - opened < self.max_age:
+                    self.stats['reused'] += 1
+                    entry = (connection, opened)
+                    break
+                expired.append(connection)
+        for connection in expired:
+            self._close(connection)
+        return entry or self._connect()
+
+    def release(self, entry):
+        """Return a connection to the pool, or close it if the pool is full."""
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(entry)
+                return
+        self._close(entry[0])
+
+    def discard(self, entry):
+        """Close a connection that failed, without returning it to the pool."""
+        entry[0].close()
+        self.stats['closed'] += 1
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            self._close(connection)
+
+    def send_batch(self, messages, retries=1):
+        """Send messages over one pooled connection. If the connection drops, a
+        new one is opened and the message retried up to ``retries`` times.
+        Messages the server refuses are counted as failed and skipped.
+
+        :param messages: Iterable of ``(from_addr, to_addrs, message string)``
+        :return: dict of metrics: total, sent, failed, reconnects and elapsed seconds
+        """
+        metrics = {'total': 0, 'sent': 0, 'failed': 0, 'reconnects': 0}
+        start = time.time()
+        entry = None
+        try:
+            for from_addr, to_addrs, message in messages:
+                metrics['total'] += 1
+                for attempt in range(1 + retries):
+                    if entry is None:
+                        if attempt:
+                            metrics['reconnects'] += 1
+                            entry = self._connect()
+                        else:
+                            entry = self.acquire()
+                    try:
+                        entry[0].sendmail(from_addr, to_addrs, message)
+                    except DISCONNECT_ERRORS as error:
+                        logger.warning('SMTP connection to {0} lost: {1!r}'.format(self.mail_server, error))
+                        self.discard(entry)
+                        entry = None
+                    except smtplib.SMTPException as error:
+                        logger.error('Could not send email to {0}: {1!r}'.format(to_addrs, error))
+                        metrics['failed'] += 1
+                        break
+                    else:
+                        metrics['sent'] += 1
+                        break
+                else:
+                    metrics['failed'] += 1
+        finally:
+            if entry is not None:
+                self.release(entry)
+            metrics['elapsed'] = time.time() - start
+        return metrics
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(mail_server, username=None, password=None, ttls=True, login=True):
+    """Return this process's pool of connections to ``mail_server`` as ``username``."""
+    key = (mail_server, username, password, ttls, login)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = SMTPConnectionPool(mail_server, username, password, ttls=ttls, login=login)
+        return _pools[key]
+
+
+def close_pools():
+    with _pools_lock:
+        pools = _pools.values()
+        _pools.clear()
+    for pool in pools:
+        pool.close()
@@ -3,17 +3,28 @@ import logging
 from email.mime.text import MIMEText
 
 from framework.tasks import app
+from framework.email import smtp
 from website import settings
 
 logger = logging.getLogger(__name__)
 
 
+def build_message(from_addr, to_addr, subject, message, mimetype='html'):
+    """Return the email as a string, ready to be sent."""
+    msg = MIMEText(message, mimetype, _charset='utf-8')
+    msg['Subject'] = subject
+    msg['From'] = from_addr
+    msg['To'] = to_addr
+    return msg.as_string()
+
+
 @app.task
 def send_email(from_addr, to_addr, subject, message, mimetype='html', ttls=True, login=True,
                 username=None, password=None, mail_server=None):
     """Send email to specified destination.
     Email is sent from the email specified in FROM_EMAIL settings in the
-    settings module.
+    settings module. With ``settings.USE_MAIL_POOL``, it is sent over one of
+    the worker's pooled connections instead of a new one.
 
     :param from_addr: A string, the sender email
     :param to_addr: A string, the recipient
@@ -32,10 +43,12 @@ def send_email(from_addr, to_addr, subject, message, mimetype='html', ttls=True,
         logger.error('Mail username and password not set; skipping send.')
         return
 
-    msg = MIMEText(message, mimetype, _charset='utf-8')
-    msg['Subject'] = subject
-    msg['From'] = from_addr
-    msg['To'] = to_addr
+    msg = build_message(from_addr, to_addr, subject, message, mimetype)
+
+    if settings.USE_MAIL_POOL:
+        pool = smtp.get_pool(mail_server, username, password, ttls=ttls, login=login)
+        metrics = pool.send_batch([(from_addr, [to_addr], msg)])
+        return metrics['sent'] == 1
 
     s = smtplib.SMTP(mail_server)
     s.ehlo()
@@ -47,7 +60,37 @@ def send_email(from_addr, to_addr, subject, message, mimetype='html', ttls=True,
     s.sendmail(
         from_addr=from_addr,
         to_addrs=[to_addr],
-        msg=msg.as_string()
+        msg=msg
     )
     s.quit()
     return True
+
+
+@app.task
+def send_emails(messages, ttls=True, login=True, username=None, password=None, mail_server=None):
+    """Send a batch of emails over one of the worker's pooled connections.
+
+    :param list messages: dicts of the ``from_addr``, ``to_addr``, ``subject``,
+        ``message`` and ``mimetype`` arguments of `send_email`
+    :return: dict of metrics, as returned by `SMTPConnectionPool.send_batch`
+    """
+    username = username or settings.MAIL_USERNAME
+    password = password or settings.MAIL_PASSWORD
+    mail_server = mail_server or settings.MAIL_SERVER
+
+    if not settings.USE_EMAIL:
+        return
+    if login and (username is None or password is None):
+        logger.error('Mail username and password not set; skipping send.')
+        return
+
+    pool = smtp.get_pool(mail_server, username, password, ttls=ttls, login=login)
+    metrics = pool.send_batch(
+        (each['from_addr'], [each['to_addr']], build_message(**each))
+        for each in messages
+    )
+    logger.info(
+        'Sent {sent} of {total} emails in {elapsed:.2f}s '
+        '({failed} failed, {reconnects} reconnects)'.format(**metrics)
+    )
+    return metrics
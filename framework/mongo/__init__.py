@@ -1,6 +1,10 @@
 # -*- coding: utf-8 -*-
 
+import weakref
+import collections
+
 from flask import request
+from modularodm import Q
 from modularodm.storedobject import StoredObject as GenericStoredObject
 from modularodm.ext.concurrency import with_proxies, proxied_members
 
@@ -31,13 +35,72 @@ def get_cache_key():
             return dummy_request
 
 
+# Identity map counters, scoped like the object cache: one set per request / task
+_load_stats = weakref.WeakKeyDictionary()
+
+LOAD_STAT_KEYS = (
+    'hits',  # keys passed to load_many that were already in the object cache
+    'loaded',  # objects fetched from the database by load_many
+    'queries',  # database round trips issued by load_many
+    'round_trips_saved',  # single-object loads avoided (hits + loaded - queries)
+)
+
+
+def get_load_stats():
+    """Return the identity map counters of the current request or task."""
+    stats = dict.fromkeys(LOAD_STAT_KEYS, 0)
+    stats.update(_load_stats.get(get_cache_key(), {}))
+    return stats
+
+
+def reset_load_stats():
+    _load_stats.pop(get_cache_key(), None)
+
+
+def _record_load_stats(hits, loaded, queries):
+    stats = _load_stats.setdefault(get_cache_key(), collections.Counter())
+    stats['hits'] += hits
+    stats['loaded'] += loaded
+    stats['queries'] += queries
+    stats['round_trips_saved'] += hits + loaded - queries
+
+
 @with_proxies(proxied_members, get_cache_key)
 class StoredObject(GenericStoredObject):
-    pass
+
+    @classmethod
+    def load_many(cls, keys):
+        """Load the objects with primary keys ``keys`` with at most one query.
+
+        Objects already in the request-scoped object cache are not fetched again, and
+        everything fetched is added to it, so later ``load`` calls in the same request
+        or task are free.
+
+        :param keys: Iterable of primary keys; duplicates are allowed
+        :return list: The loaded objects in the order of ``keys``, None for missing keys
+        """
+        keys = list(keys)
+        objects = {}
+        missing = []
+        for key in set(keys):
+            cached = cls._load_from_cache(key) if key is not None else None
+            if cached is None:
+                missing.append(key)
+            else:
+                objects[key] = cached
+        hits = len(objects)
+        if missing:
+            # Loading through find also adds each object to the object cache
+            for obj in cls.find(Q(cls._primary_name, 'in', missing)):
+                objects[obj._primary_key] = obj
+        _record_load_stats(hits=hits, loaded=len(objects) - hits, queries=int(bool(missing)))
+        return [objects.get(key) for key in keys]
 
 
 __all__ = [
     'StoredObject',
+    'get_load_stats',
+    'reset_load_stats',
     'ObjectId',
     'client',
     'database',
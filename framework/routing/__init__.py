@@ -1,12 +1,17 @@
 # -*- coding: utf-8 -*-
 import os
+import re
+import errno
+import time
 import logging
 import copy
 import json
 import functools
+import threading
 import httplib as http
+from collections import OrderedDict
+from HTMLParser import HTMLParser
 
-import lxml.html
 import werkzeug.wrappers
 from werkzeug.exceptions import NotFound
 from mako.template import Template
@@ -29,7 +34,7 @@ _TPL_LOOKUP = TemplateLookup(
         TEMPLATE_DIR,
         os.path.join(settings.BASE_PATH, 'addons/'),
     ],
-    module_directory='/tmp/mako_modules'
+    module_directory=os.path.join(settings.MAKO_MODULE_DIRECTORY, 'trusted'),
 )
 
 _TPL_LOOKUP_SAFE = TemplateLookup(
@@ -43,7 +48,7 @@ _TPL_LOOKUP_SAFE = TemplateLookup(
         TEMPLATE_DIR,
         os.path.join(settings.BASE_PATH, 'addons/'),
     ],
-    module_directory='/tmp/mako_modules',
+    module_directory=os.path.join(settings.MAKO_MODULE_DIRECTORY, 'safe'),
 )
 
 REDIRECT_CODES = [
@@ -51,6 +56,21 @@ REDIRECT_CODES = [
     http.FOUND,
 ]
 
+# A ``mod-meta`` attribute and its value, in any of the HTML quoting styles
+MOD_META_PATTERN = re.compile(
+    r'''\smod-meta\s*=\s*(?:"(?P<double>[^"]*)"|'(?P<single>[^']*)'|(?P<bare>[^\s"'>]+))'''
+)
+# A complete start tag
+START_TAG_PATTERN = re.compile(
+    r'''<(?P<name>[a-zA-Z][\w:-]*)(?:\s+[^\s=/>]+(?:\s*=\s*(?:"[^"]*"|'[^']*'|[^\s"'>]+))?)*\s*(?P<closed>/?)>'''
+)
+VOID_ELEMENTS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'keygen', 'link', 'meta', 'param', 'source', 'track', 'wbr',
+])
+_tag_patterns = {}
+_html_parser = HTMLParser()
+
 class Rule(object):
     """ Container for routing and rendering rules."""
 
@@ -201,7 +221,111 @@ def render_mustache_string(tpl_string, data):
 def render_jinja_string(tpl, data):
     pass
 
-mako_cache = {}
+def compile_mako_template(tpldir, tplname, trust=True):
+    """Compile a mako template, reusing the module compiled by an earlier
+    process if the template has not changed since.
+
+    :param tpldir: Template directory
+    :param tplname: Path of the template, relative to ``tpldir``
+    :param trust: Optional. If ``False``, markup-safe escaping will be enabled
+    :raises: IOError if the template does not exist
+    """
+    lookup_obj = _TPL_LOOKUP_SAFE if trust is False else _TPL_LOOKUP
+    path = os.path.abspath(os.path.join(tpldir, tplname))
+    if not os.path.isfile(path):
+        raise IOError(errno.ENOENT, 'Template not found', path)
+    return Template(
+        filename=path,
+        # A URI without slashes resolves includes against the lookup
+        # directories rather than the template's own directory
+        uri=path.strip(os.sep).replace(os.sep, '.'),
+        module_directory=lookup_obj.template_args['module_directory'],
+        format_exceptions=settings.DEBUG_MODE,  # thanks to abought
+        lookup=lookup_obj,
+        input_encoding='utf-8',
+        output_encoding='utf-8',
+        default_filters=lookup_obj.template_args['default_filters'],
+        imports=lookup_obj.template_args['imports']  # FIXME: Temporary workaround for data stored in wrong format in DB. Unescape it before it gets re-escaped by Markupsafe.
+    )
+
+
+class MakoTemplateCache(object):
+    """Thread-safe LRU cache of compiled mako templates, keyed by
+    ``(tpldir, tplname, trust)``.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._templates = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._templates)
+
+    def get(self, key):
+        with self._lock:
+            template = self._templates.pop(key, None)
+            if template is not None:
+                self._templates[key] = template
+            return template
+
+    def set(self, key, template):
+        with self._lock:
+            self._templates.pop(key, None)
+            self._templates[key] = template
+            while len(self._templates) > self.size:
+                self._templates.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+
+    def get_template(self, tpldir, tplname, trust=True):
+        key = (tpldir, tplname, trust is not False)
+        template = self.get(key)
+        if template is None:
+            # Compiled outside the lock; a template compiled twice by
+            # concurrent requests is harmless
+            template = compile_mako_template(tpldir, tplname, trust)
+            self.set(key, template)
+        return template
+
+    def precompile(self, tpldir, directories, trust_values=(True, False)):
+        """Compile every ``.mako`` template under ``directories``, so that
+        the first request in a worker does not pay for it.
+
+        :param tpldir: Template directory that template names are relative to
+        :param directories: Directories to search for templates
+        :param trust_values: Trust settings to compile each template with
+        :return: Dictionary with the number of templates compiled and failed,
+            and the time taken in milliseconds
+        """
+        started = time.time()
+        compiled = failed = 0
+        for directory in directories:
+            for root, _, filenames in os.walk(directory):
+                for filename in sorted(filenames):
+                    if not filename.endswith('.mako'):
+                        continue
+                    tplname = os.path.relpath(os.path.join(root, filename), tpldir)
+                    for trust in trust_values:
+                        try:
+                            self.get_template(tpldir, tplname, trust)
+                        except Exception as error:
+                            logger.debug('Could not compile {0}: {1!r}'.format(tplname, error))
+                            failed += 1
+                        else:
+                            compiled += 1
+        return {
+            'compiled': compiled,
+            'failed': failed,
+            'elapsed': (time.time() - started) * 1000,
+        }
+
+
+mako_cache = MakoTemplateCache(settings.MAKO_CACHE_SIZE)
+
+
 def render_mako_string(tpldir, tplname, data, trust=True):
     """Render a mako template to a string.
 
@@ -210,29 +334,14 @@ def render_mako_string(tpldir, tplname, data, trust=True):
     :param data:
     :param trust: Optional. If ``False``, markup-save escaping will be enabled
     """
-
-    show_errors = settings.DEBUG_MODE  # thanks to abought
     # TODO: The "trust" flag is expected to be temporary, and should be removed
     #       once all templates manually set it to False.
 
-    lookup_obj = _TPL_LOOKUP_SAFE if trust is False else _TPL_LOOKUP
-
-    tpl = mako_cache.get(tplname)
-    if tpl is None:
-        with open(os.path.join(tpldir, tplname)) as f:
-            tpl_text = f.read()
-        tpl = Template(
-            tpl_text,
-            format_exceptions=show_errors,
-            lookup=lookup_obj,
-            input_encoding='utf-8',
-            output_encoding='utf-8',
-            default_filters=lookup_obj.template_args['default_filters'],
-            imports=lookup_obj.template_args['imports']  # FIXME: Temporary workaround for data stored in wrong format in DB. Unescape it before it gets re-escaped by Markupsafe.
-        )
     # Don't cache in debug mode
-    if not app.debug:
-        mako_cache[tplname] = tpl
+    if app.debug:
+        tpl = compile_mako_template(tpldir, tplname, trust)
+    else:
+        tpl = mako_cache.get_template(tpldir, tplname, trust)
     return tpl.render(**data)
 
 
@@ -296,6 +405,76 @@ def call_url(url, view_kwargs=None):
 
     return rv
 
+
+def _tag_pattern(name):
+    """Return a pattern matching start and end tags named ``name``."""
+    pattern = _tag_patterns.get(name)
+    if pattern is None:
+        pattern = re.compile(
+            r'<(/?){0}(?=[\s/>])[^>]*>'.format(re.escape(name)),
+            re.IGNORECASE,
+        )
+        _tag_patterns[name] = pattern
+    return pattern
+
+
+def element_end(html, start_tag):
+    """Find where the element opened by ``start_tag`` ends.
+
+    :param html: HTML string
+    :param start_tag: Match of ``START_TAG_PATTERN`` against ``html``
+    :return: Index just past the element's end tag; the end of the start tag
+        if the element is void or never closed
+    """
+    name = start_tag.group('name').lower()
+    if start_tag.group('closed') or name in VOID_ELEMENTS:
+        return start_tag.end()
+    depth = 1
+    for tag in _tag_pattern(name).finditer(html, start_tag.end()):
+        if tag.group(1):
+            depth -= 1
+            if depth == 0:
+                return tag.end()
+        elif not tag.group(0).endswith('/>'):
+            depth += 1
+    return start_tag.end()
+
+
+class RenderProfile(object):
+    """Timings of the nested templates rendered for a single page."""
+
+    def __init__(self, template_name):
+        self.template_name = template_name
+        self.elapsed = None
+        self.entries = []
+        self.depth = 0
+
+    def start(self, template_name, uri):
+        """Add an entry for a nested template, in the order templates appear
+        on the page.
+        """
+        entry = {
+            'template': template_name,
+            'uri': uri,
+            'depth': self.depth,
+            'view': 0.0,
+            'render': 0.0,
+        }
+        self.entries.append(entry)
+        return entry
+
+    def report(self):
+        lines = ['Rendered {0} in {1:.1f} ms'.format(self.template_name, self.elapsed or 0)]
+        for entry in self.entries:
+            lines.append('{0}{1}: view {2:.1f} ms, render {3:.1f} ms{4}'.format(
+                '  ' * (entry['depth'] + 1),
+                entry['template'],
+                entry['view'],
+                entry['render'],
+                ' ({0})'.format(entry['uri']) if entry['uri'] else '',
+            ))
+        return '\n'.join(lines)
+
 ### Renderers ###
 
 class Renderer(object):
@@ -462,16 +641,26 @@ class WebRenderer(Renderer):
             template_name=self.error_template
         ), error.code
 
-    def render_element(self, element, data):
+    def render_element(self, element, data, profile=None):
         """Render an embedded template.
 
         :param element: The template embed (HtmlElement).
              Ex: <div mod-meta='{"tpl": "name.html", "replace": true}'></div>
         :param data: Dictionary to be passed to the template as context
+        :param profile: Optional RenderProfile to record timings in
         :return: 2-tuple: (<result>, <flag: replace div>)
         """
-        attributes_string = element.get("mod-meta")
+        return self.render_meta(element.get('mod-meta'), data, profile=profile)
+
+    def render_meta(self, attributes_string, data, profile=None):
+        """Render the template described by the value of a ``mod-meta``
+        attribute.
 
+        :param attributes_string: JSON value of the ``mod-meta`` attribute
+        :param data: Dictionary to be passed to the template as context
+        :param profile: Optional RenderProfile to record timings in
+        :return: 2-tuple: (<result>, <flag: replace div>)
+        """
         # Return debug <div> if JSON cannot be parsed
         try:
             element_meta = json.loads(attributes_string)
@@ -486,6 +675,8 @@ class WebRenderer(Renderer):
         view_kwargs = element_meta.get('view_kwargs', {})
         error_msg = element_meta.get('error', None)
 
+        entry = profile.start(element_meta.get('tpl'), uri) if profile else None
+
         # TODO: Is copy enough? Discuss.
         render_data = copy.copy(data)
         render_data.update(kwargs)
@@ -493,6 +684,7 @@ class WebRenderer(Renderer):
         if uri:
             # Catch errors and return appropriate debug divs
             # todo: add debug parameter
+            started = time.time()
             try:
                 uri_data = call_url(uri, view_kwargs=view_kwargs)
                 render_data.update(uri_data)
@@ -506,11 +698,18 @@ class WebRenderer(Renderer):
                     uri,
                     repr(error)
                 ), is_replace
+            finally:
+                if entry:
+                    entry['view'] = (time.time() - started) * 1000
 
+        started = time.time()
+        if profile:
+            profile.depth += 1
         try:
             template_rendered = self._render(
                 render_data,
                 element_meta['tpl'],
+                profile=profile,
             )
         except Exception as error:
             logger.exception(error)
@@ -518,14 +717,72 @@ class WebRenderer(Renderer):
                 element_meta['tpl'],
                 repr(error)
             ), is_replace
+        finally:
+            if profile:
+                profile.depth -= 1
+                entry['render'] = (time.time() - started) * 1000
 
         return template_rendered, is_replace
 
-    def _render(self, data, template_name=None):
+    def render_nested(self, rendered, data, profile=None):
+        """Render the templates embedded in a rendered page.
+
+        The page is scanned once for elements with a ``mod-meta`` attribute.
+        An element is replaced by its template if the embed sets ``replace``;
+        otherwise the template is inserted at the start of the element's
+        content. Templates are rendered in the order they appear on the page.
+
+        :param rendered: Rendered HTML
+        :param data: Dictionary to be passed to nested templates as context
+        :param profile: Optional RenderProfile to record timings in
+        :return: Rendered HTML, including nested templates
+        """
+        if 'mod-meta' not in rendered:
+            return rendered
+
+        parts = []
+        position = 0
+        while True:
+            meta = MOD_META_PATTERN.search(rendered, position)
+            if meta is None:
+                break
+            start = rendered.rfind('<', position, meta.start())
+            start_tag = START_TAG_PATTERN.match(rendered, start) if start != -1 else None
+            # Not an attribute of a start tag, e.g. text mentioning mod-meta
+            if start_tag is None or start_tag.end() <= meta.start():
+                parts.append(rendered[position:meta.end()])
+                position = meta.end()
+                continue
+
+            attributes_string = next(
+                value for value in meta.group('double', 'single', 'bare')
+                if value is not None
+            )
+            template_rendered, is_replace = self.render_meta(
+                _html_parser.unescape(attributes_string),
+                data,
+                profile=profile,
+            )
+
+            if is_replace:
+                parts.append(rendered[position:start])
+                parts.append(template_rendered)
+                position = element_end(rendered, start_tag)
+            else:
+                # Content of the element is scanned for further embeds
+                parts.append(rendered[position:start_tag.end()])
+                parts.append(template_rendered)
+                position = start_tag.end()
+
+        parts.append(rendered[position:])
+        return ''.join(parts)
+
+    def _render(self, data, template_name=None, profile=None):
         """Render output of view function to HTML.
 
         :param data: Data dictionary from view function
         :param template_name: Name of template file
+        :param profile: Optional RenderProfile to record timings in
         :return: Rendered HTML
         """
 
@@ -548,49 +805,7 @@ class WebRenderer(Renderer):
         except IOError:
             return '<div>Template {} not found.</div>'.format(template_name)
 
-        html = lxml.html.fragment_fromstring(rendered, create_parent='remove')
-
-        for element in html.findall('.//*[@mod-meta]'):
-
-            # Render nested template
-            template_rendered, is_replace = self.render_element(element, data)
-
-            original = lxml.html.tostring(element)
-            if is_replace:
-                replacement = template_rendered
-            else:
-                replacement = original
-                replacement = replacement.replace('><', '>' + template_rendered + '<')
-
-            rendered = rendered.replace(original, replacement)
-
-        ## Parse HTML using html5lib; lxml is too strict and e.g. throws
-        ## errors if missing parent container; htmlparser mangles whitespace
-        ## and breaks replacement
-        #parsed = BeautifulSoup(rendered, 'html5lib')
-        #subtemplates = parsed.find_all(
-        #    lambda tag: tag.has_attr('mod-meta')
-        #)
-        #
-        #for element in subtemplates:
-        #
-        #    # Extract HTML of original element
-        #    element_html = str(element)
-        #
-        #    # Render nested template
-        #    template_rendered, is_replace = self.render_element(element, data)
-        #
-        #    # Build replacement
-        #    if is_replace:
-        #        replacement = template_rendered
-        #    else:
-        #        element.string = template_rendered
-        #        replacement = str(element)
-        #
-        #    # Replace
-        #    rendered = rendered.replace(element_html, replacement)
-
-        return rendered
+        return self.render_nested(rendered, data, profile=profile)
 
     def render(self, data, redirect_url, *args, **kwargs):
         """Render output of view function to HTML, following redirects
@@ -611,4 +826,12 @@ class WebRenderer(Renderer):
         extra_data = self.data if isinstance(self.data, dict) else self.data()
         data.update({key: val for key, val in extra_data.iteritems() if key not in data})
 
-        return self._render(data, template_name)
+        if not settings.PROFILE_TEMPLATES:
+            return self._render(data, template_name)
+
+        profile = RenderProfile(template_name or self.template_name)
+        started = time.time()
+        rendered = self._render(data, template_name, profile=profile)
+        profile.elapsed = (time.time() - started) * 1000
+        logger.info(profile.report())
+        return rendered
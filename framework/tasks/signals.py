@@ -3,12 +3,18 @@
 imported by Celery and is not used elsewhere in the application.
 """
 
+import logging
+
 from celery import signals
 from modularodm import storage
 
-from framework.mongo import set_up_storage, StoredObject
+from framework.mongo import set_up_storage, StoredObject, get_load_stats, reset_load_stats
 
 from website import models
+from website.search import search
+
+
+logger = logging.getLogger(__name__)
 
 
 @signals.task_prerun.connect
@@ -19,6 +25,30 @@ def clear_caches(*args, **kwargs):
     StoredObject._clear_caches()
 
 
+@signals.task_postrun.connect
+def log_load_stats(task_id=None, task=None, *args, **kwargs):
+    """Report how many database round trips bulk loading saved during the task.
+    """
+    stats = get_load_stats()
+    if stats['queries']:
+        logger.debug('Task {0} ({1}) load_many stats: {2}'.format(getattr(task, 'name', None), task_id, stats))
+    reset_load_stats()
+
+
+@signals.task_prerun.connect
+def begin_search_indexing(*args, **kwargs):
+    """Buffer search index writes made by the task.
+    """
+    search.begin_bulk_indexing()
+
+
+@signals.task_postrun.connect
+def end_search_indexing(state=None, *args, **kwargs):
+    """Send the task's search index writes in bulk, or drop them if it did not succeed.
+    """
+    search.end_bulk_indexing(discard=state != 'SUCCESS')
+
+
 @signals.worker_process_init.connect
 def attach_models(*args, **kwargs):
     """Attach models to database collections on worker initialization.
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""Time sending a batch of emails to a local SMTP sink, opening a connection for
+each email as ``send_email`` did, against sending them over pooled connections
+with ``send_emails``. The sink waits ``CONNECT_DELAY`` on each new connection,
+standing in for the TLS handshake and login of a real mail server.
+
+    python -m scripts.benchmarks.email_delivery
+"""
+
+import time
+
+from framework.email import smtp
+from framework.email import tasks
+from framework.email.sink import SMTPSink
+
+from website import settings
+
+from scripts.benchmarks.utils import report
+
+EMAILS = (10, 100, 500)
+CONNECT_DELAY = 0.02
+
+
+def build_messages(count):
+    return [
+        dict(
+            from_addr=settings.FROM_EMAIL,
+            to_addr='user{0}@example.com'.format(index),
+            subject='Recent activity',
+            message='<p>Digest {0}</p>'.format(index) * 50,
+            mimetype='html',
+        )
+        for index in range(count)
+    ]
+
+
+def send_each(messages, mail_server):
+    for each in messages:
+        tasks.send_email(ttls=False, login=False, mail_server=mail_server, **each)
+
+
+def send_pooled(messages, mail_server):
+    for index in range(0, len(messages), settings.MAIL_BATCH_SIZE):
+        tasks.send_emails(
+            messages[index:index + settings.MAIL_BATCH_SIZE],
+            ttls=False, login=False, mail_server=mail_server,
+        )
+
+
+def run(sink, func, messages, mail_server):
+    connections = sink.connections
+    start = time.time()
+    func(messages, mail_server)
+    elapsed = time.time() - start
+    return elapsed * 1000, sink.connections - connections, len(messages) / elapsed
+
+
+def main():
+    settings.USE_EMAIL = True
+    sink = SMTPSink(port=0, connect_delay=CONNECT_DELAY).start()
+    mail_server = 'localhost:{0}'.format(sink.port)
+    try:
+        rows = []
+        for count in EMAILS:
+            messages = build_messages(count)
+            settings.USE_MAIL_POOL = False
+            each = run(sink, send_each, messages, mail_server)
+            settings.USE_MAIL_POOL = True
+            smtp.close_pools()
+            pooled = run(sink, send_pooled, messages, mail_server)
+            rows.append([count, each[0], each[1], each[2], pooled[0], pooled[1], pooled[2]])
+        report(
+            'Email delivery ({0:.0f} ms per new connection)'.format(CONNECT_DELAY * 1000),
+            rows,
+            ['emails', 'per email (ms)', 'connections', 'emails/s',
+             'pooled (ms)', 'connections', 'emails/s'],
+        )
+    finally:
+        smtp.close_pools()
+        sink.stop()
+
+
+if __name__ == '__main__':
+    main()
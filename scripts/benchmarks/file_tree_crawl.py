@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""Compare crawling an addon file tree one folder at a time, as the archiver used
+to, against the concurrent crawler at a few pool sizes.
+
+Runs against the local fake WaterButler with a fixed latency per listing, so the
+numbers show how much of that latency the pool hides. The rate limit is set high
+enough not to be the bottleneck.
+
+    python -m scripts.benchmarks.file_tree_crawl
+"""
+
+import time
+
+import requests
+
+from website.addons.base import crawler
+from website.addons.base.testing.waterbutler import FakeWaterButler, make_tree, count_folders
+
+from scripts.benchmarks.utils import report
+
+# (depth, subfolders per folder, files per folder)
+TREES = ((2, 4, 10), (3, 4, 10))
+WORKERS = (1, 4, 8, 16)
+# Seconds the fake takes to answer each listing
+LATENCY = 0.02
+# The old crawler slept this long after every listing
+OLD_THROTTLE = 1.0 / 5.0
+
+
+def make_fetch(url):
+    def fetch(folder, first=False):
+        return requests.get('{}/data'.format(url), params={'path': folder['path']}).json()['data']
+    return fetch
+
+
+def crawl_sequentially(fetch, filenode):
+    if not crawler.is_folder_to_crawl(filenode):
+        return filenode
+    filenode['children'] = [crawl_sequentially(fetch, child) for child in fetch(filenode)]
+    time.sleep(OLD_THROTTLE)
+    return filenode
+
+
+def main():
+    rows = []
+    for depth, folders, files in TREES:
+        fake = FakeWaterButler(make_tree(depth, folders, files), latency=LATENCY).start()
+        fetch = make_fetch(fake.url)
+        size = count_folders(make_tree(depth, folders, 0))
+        try:
+            start = time.time()
+            crawl_sequentially(fetch, {'path': '/', 'kind': 'folder'})
+            rows.append([size, 'sequential, throttled', time.time() - start, 1])
+            for workers in WORKERS:
+                fake.max_in_flight = 0
+                start = time.time()
+                crawler.FileTreeCrawler(fetch, crawler.TokenBucket(10000), workers=workers).crawl(
+                    {'path': '/', 'kind': 'folder'}
+                )
+                rows.append([size, '{} workers'.format(workers), time.time() - start, fake.max_in_flight])
+        finally:
+            fake.stop()
+    report('File tree crawl', rows, ['folders', 'strategy', 'seconds', 'max concurrent'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""Time filtered GETs against the node contributors and osfstorage files lists
+as the size of the list grows.
+
+Filters on stored file fields are answered by the database, so the cost of
+`filter[name]=...` on a folder should stay flat no matter how many siblings
+the matching file has.
+
+    python -m scripts.benchmarks.list_filters
+"""
+
+from api.base.settings.defaults import API_BASE
+from framework.auth import Auth
+
+from tests.base import TestAppJSONAPI
+from tests.factories import AuthUserFactory, ProjectFactory, UserFactory
+
+from scripts.benchmarks.utils import scratch_database, timed, report
+
+SIZES = (10, 100, 1000)
+
+
+def build_project(size):
+    user = AuthUserFactory()
+    project = ProjectFactory(creator=user)
+    auth = Auth(user)
+    root = project.get_addon('osfstorage').get_root()
+    for index in range(size):
+        root.append_file('file-{}'.format(index))
+        project.add_contributor(UserFactory(), auth=auth, save=False, visible=bool(index % 2))
+    project.save()
+    return user, project
+
+
+def main():
+    from api.base.wsgi import application
+
+    app = TestAppJSONAPI(application)
+    rows = []
+    with scratch_database():
+        for size in SIZES:
+            user, project = build_project(size)
+            files_url = '/{}nodes/{}/files/osfstorage/?filter[name]=file-0'.format(API_BASE, project._id)
+            contributors_url = '/{}nodes/{}/contributors/?filter[bibliographic]=true&filter[permission]=write'.format(
+                API_BASE, project._id
+            )
+            rows.append([
+                size,
+                timed(lambda: app.get(files_url, auth=user.auth)),
+                timed(lambda: app.get(contributors_url, auth=user.auth)),
+            ])
+    report('Filtered list requests', rows, ['list size', 'files (ms)', 'contributors (ms)'])
+
+
+if __name__ == '__main__':
+    main()
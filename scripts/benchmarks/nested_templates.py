@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""Time WebRenderer's handling of embedded ``mod-meta`` templates on pages with
+increasing numbers of embeds. It compares the single-pass scan with the former
+approach, which parsed the page with lxml and replaced each re-serialized
+element across the whole page string.
+
+    python -m scripts.benchmarks.nested_templates
+"""
+
+import os
+import shutil
+import tempfile
+
+import lxml.html
+
+from framework.routing import WebRenderer, RenderProfile, render_mako_string
+
+from scripts.benchmarks.utils import timed, report
+
+EMBEDS = (10, 50, 200)
+FILLER = '<p>Some page content between the widgets.</p>\n' * 20
+CHILD = '<ul>\n' + '<li>${title}</li>\n' * 10 + '</ul>\n'
+
+
+def build_page(embeds):
+    parts = []
+    for index in range(embeds):
+        parts.append(FILLER)
+        parts.append(
+            '<div class="widget" mod-meta=\'{{"tpl": "child.mako", '
+            '"kwargs": {{"title": "Widget {0}"}}, "replace": {1}}}\'></div>\n'.format(
+                index, 'true' if index % 2 else 'false'
+            )
+        )
+    return ''.join(parts)
+
+
+def legacy_render_nested(renderer, rendered, data):
+    html = lxml.html.fragment_fromstring(rendered, create_parent='remove')
+    for element in html.findall('.//*[@mod-meta]'):
+        template_rendered, is_replace = renderer.render_element(element, data)
+        original = lxml.html.tostring(element)
+        if is_replace:
+            replacement = template_rendered
+        else:
+            replacement = original.replace('><', '>' + template_rendered + '<')
+        rendered = rendered.replace(original, replacement)
+    return rendered
+
+
+def main():
+    template_dir = tempfile.mkdtemp()
+    try:
+        with open(os.path.join(template_dir, 'child.mako'), 'w') as fp:
+            fp.write(CHILD)
+        renderer = WebRenderer('child.mako', render_mako_string, template_dir=template_dir)
+        rows = []
+        for embeds in EMBEDS:
+            page = build_page(embeds)
+            rows.append([
+                embeds,
+                len(page) / 1024.0,
+                timed(lambda: legacy_render_nested(renderer, page, {})),
+                timed(lambda: renderer.render_nested(page, {})),
+                timed(lambda: renderer.render_nested(page, {}, profile=RenderProfile('page'))),
+            ])
+        report(
+            'Nested template rendering',
+            rows,
+            ['embeds', 'page (KB)', 'lxml + replace (ms)', 'single pass (ms)', 'single pass, profiled (ms)'],
+        )
+        # Show what the profiler logs for a page when PROFILE_TEMPLATES is on
+        profile = RenderProfile('page with 3 embeds')
+        renderer.render_nested(build_page(3), {}, profile=profile)
+        profile.elapsed = sum(entry['render'] for entry in profile.entries)
+        print(profile.report())
+    finally:
+        shutil.rmtree(template_dir)
+
+
+if __name__ == '__main__':
+    main()
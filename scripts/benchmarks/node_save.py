@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""Time adding a log to a node, and reading its latest page of logs, as the number
+of logs the node already has grows.
+
+Logs live in their own stream, so `add_log` writes one log and a small update to
+the node whatever its history. For comparison, the `embedded list` column times the
+write the node used to make on every save: the whole list of log ids set again.
+
+    python -m scripts.benchmarks.node_save
+"""
+
+import datetime
+
+from framework.auth import Auth
+from framework.mongo import ObjectId
+
+from tests.factories import ProjectFactory, UserFactory
+
+from scripts.benchmarks.utils import scratch_database, timed, report
+
+SIZES = (100, 1000, 10000, 50000)
+
+
+def build_project(database, size):
+    user = UserFactory()
+    project = ProjectFactory(creator=user)
+    log_ids = [str(ObjectId()) for _ in range(size)]
+    now = datetime.datetime.utcnow()
+    for start in range(0, size, 1000):
+        database['nodelog'].insert([
+            {
+                '_id': log_id,
+                'node_id': project._id,
+                'action': 'tag_added',
+                'date': now,
+                'params': {'node': project._id, 'tag': 'benchmark'},
+                'user': user._id,
+            }
+            for log_id in log_ids[start:start + 1000]
+        ])
+    return Auth(user), project, log_ids
+
+
+def main():
+    rows = []
+    with scratch_database() as database:
+        for size in SIZES:
+            auth, project, log_ids = build_project(database, size)
+            rows.append([
+                size,
+                timed(lambda: project.add_log('tag_added', {'node': project._id, 'tag': 'b'}, auth=auth)),
+                timed(lambda: project.get_recent_logs(10)),
+                timed(lambda: database['node'].update({'_id': project._id}, {'$set': {'logs': log_ids}})),
+            ])
+            database['node'].update({'_id': project._id}, {'$unset': {'logs': True}})
+    report(
+        'Node.add_log + save',
+        rows,
+        ['existing logs', 'log stream (ms)', 'recent logs (ms)', 'embedded list (ms)'],
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""Compare search indexing throughput with one refreshing request per document
+against buffered writes flushed through the bulk API.
+
+Runs against a small in-process stand-in for elasticsearch that answers the
+endpoints the indexer uses and charges a fixed cost for every refresh, so the
+numbers show request and refresh overhead rather than the speed of a real cluster.
+
+    python -m scripts.benchmarks.search_indexing
+"""
+
+import json
+import time
+import threading
+import BaseHTTPServer
+
+from elasticsearch import Elasticsearch
+
+from website.search import elastic_search
+
+from scripts.benchmarks.utils import report
+
+SIZES = (100, 1000, 5000)
+# Seconds a refresh takes on the stand-in
+REFRESH_COST = 0.005
+INDEX = 'benchmark'
+
+
+class StandInHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Accept index, delete, bulk and refresh requests and count them."""
+
+    protocol_version = 'HTTP/1.1'
+    counts = {'requests': 0, 'refreshes': 0}
+
+    def _respond(self, body, status=200):
+        payload = json.dumps(body)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _handle(self):
+        length = int(self.headers.getheader('Content-Length') or 0)
+        body = self.rfile.read(length) if length else ''
+        self.counts['requests'] += 1
+        if 'refresh=true' in self.path or '_refresh' in self.path:
+            self.counts['refreshes'] += 1
+            time.sleep(REFRESH_COST)
+        if self.path.startswith('/_bulk'):
+            lines = iter(line for line in body.splitlines() if line.strip())
+            items = []
+            for line in lines:
+                op_type = json.loads(line).keys()[0]
+                if op_type in ('index', 'create', 'update'):
+                    next(lines)  # skip the document source
+                items.append({op_type: {'status': 200}})
+            return self._respond({'took': 1, 'errors': False, 'items': items})
+        return self._respond({'acknowledged': True, 'created': True})
+
+    do_GET = do_PUT = do_POST = do_DELETE = do_HEAD = _handle
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stand_in():
+    server = BaseHTTPServer.HTTPServer(('localhost', 0), StandInHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+def make_docs(size):
+    return [
+        ('user', 'user{}'.format(number), {'id': 'user{}'.format(number), 'user': 'User {}'.format(number)})
+        for number in range(size)
+    ]
+
+
+def index_one_by_one(docs, refresh):
+    for doc_type, doc_id, body in docs:
+        elastic_search.es.index(index=INDEX, doc_type=doc_type, id=doc_id, body=body, refresh=refresh)
+
+
+def index_buffered(docs):
+    with elastic_search.bulk_indexing(refresh=True):
+        for doc_type, doc_id, body in docs:
+            elastic_search.index_doc(INDEX, doc_type, doc_id, body)
+
+
+def throughput(size, func):
+    StandInHandler.counts.update(requests=0, refreshes=0)
+    start = time.time()
+    func()
+    elapsed = time.time() - start
+    return size / elapsed, StandInHandler.counts['requests'], StandInHandler.counts['refreshes']
+
+
+def main():
+    server = start_stand_in()
+    original_es = elastic_search.es
+    elastic_search.es = Elasticsearch('localhost:{}'.format(server.server_port))
+    rows = []
+    try:
+        for size in SIZES:
+            docs = make_docs(size)
+            for label, func in (
+                ('per document, refresh', lambda: index_one_by_one(docs, refresh=True)),
+                ('per document, no refresh', lambda: index_one_by_one(docs, refresh=False)),
+                ('bulk, one refresh', lambda: index_buffered(docs)),
+            ):
+                rows.append([size, label] + list(throughput(size, func)))
+    finally:
+        elastic_search.es = original_es
+        server.shutdown()
+    report('Search indexing throughput', rows, ['documents', 'strategy', 'docs/sec', 'requests', 'refreshes'])
+
+
+if __name__ == '__main__':
+    main()
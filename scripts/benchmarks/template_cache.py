@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""Time precompiling the core and addon templates at startup. The first
+run starts from an empty module directory, as on a fresh deploy. The
+second run reuses the compiled modules, as a worker started later would.
+Also times getting a page template that was not precompiled, which
+means loading its compiled module, against getting one that was. The
+first request in a worker pays that difference.
+
+Removes ``MAKO_MODULE_DIRECTORY`` before running.
+
+    python -m scripts.benchmarks.template_cache
+"""
+
+import os
+import shutil
+
+from framework.routing import MakoTemplateCache, compile_mako_template
+
+from website import settings
+from website.app import init_app
+
+from scripts.benchmarks.utils import timed, report
+
+PAGE = 'project/project.mako'
+
+
+def precompile():
+    directories = [settings.TEMPLATES_PATH] + [
+        os.path.join(settings.ADDON_PATH, addon, 'templates')
+        for addon in settings.ADDONS_REQUESTED
+    ]
+    return MakoTemplateCache(settings.MAKO_CACHE_SIZE).precompile(settings.TEMPLATES_PATH, directories)
+
+
+def main():
+    init_app(set_backends=False, routes=False)
+    shutil.rmtree(settings.MAKO_MODULE_DIRECTORY, ignore_errors=True)
+
+    rows = []
+    for label in ('empty module directory', 'compiled modules on disk'):
+        stats = precompile()
+        rows.append([label, stats['compiled'], stats['failed'], stats['elapsed']])
+    report('Template precompilation', rows, ['start', 'compiled', 'failed', 'time (ms)'])
+
+    cache = MakoTemplateCache(settings.MAKO_CACHE_SIZE)
+    cache.get_template(settings.TEMPLATES_PATH, PAGE)
+    report(
+        'First use of {0}'.format(PAGE),
+        [
+            ['load compiled module', timed(lambda: compile_mako_template(settings.TEMPLATES_PATH, PAGE))],
+            ['precompiled', timed(lambda: cache.get_template(settings.TEMPLATES_PATH, PAGE))],
+        ],
+        ['template', 'time (ms)'],
+    )
+
+
+if __name__ == '__main__':
+    main()
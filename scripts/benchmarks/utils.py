@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""Helpers shared by the benchmark scripts in this package.
+
+Benchmarks run against a scratch database (``settings.TEST_DB_NAME``) that is
+dropped before and after the run, so they never touch real data.
+"""
+
+import time
+import contextlib
+
+import tabulate
+from modularodm import storage
+
+import website.models
+from website import settings
+from website.app import init_app
+from framework.mongo import set_up_storage
+from framework.mongo import database as database_proxy
+
+from tests.base import teardown_database
+
+
+@contextlib.contextmanager
+def scratch_database():
+    """Point the models at an empty scratch database for the duration of the block."""
+    original_db_name = settings.DB_NAME
+    original_piwik_host = settings.PIWIK_HOST
+    settings.DB_NAME = getattr(settings, 'TEST_DB_NAME', 'osf_test')
+    settings.PIWIK_HOST = None
+    init_app(set_backends=False, routes=False)
+    teardown_database(database=database_proxy._get_current_object())
+    set_up_storage(website.models.MODELS, storage.MongoStorage, addons=settings.ADDONS_AVAILABLE)
+    try:
+        yield database_proxy
+    finally:
+        teardown_database(database=database_proxy._get_current_object())
+        settings.DB_NAME = original_db_name
+        settings.PIWIK_HOST = original_piwik_host
+
+
+def timed(func, repeat=5):
+    """Call ``func`` ``repeat`` times and return the best wall-clock time in milliseconds."""
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        func()
+        elapsed = (time.time() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def report(title, rows, headers):
+    print(title)
+    print(tabulate.tabulate(rows, headers=headers, floatfmt='.2f'))
+    print('')
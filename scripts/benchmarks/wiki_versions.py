@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""Compare storing every wiki version in full against storing older versions as
+deltas: the size of the stored versions, and the time to read the current page, an
+old version with a cold cache, and the same version again.
+
+Each edit changes a few lines of a long page, as most wiki edits do.
+
+    python -m scripts.benchmarks.wiki_versions
+"""
+
+import random
+
+import mock
+
+from framework.auth import Auth
+
+from website.addons.wiki import settings as wiki_settings
+from website.addons.wiki.model import NodeWikiPage
+from website.addons.wiki.utils import version_content_cache
+
+from tests.factories import ProjectFactory
+
+from scripts.benchmarks.utils import scratch_database, timed, report
+
+VERSIONS = (10, 50, 200)
+LINES = 400
+
+
+def build_page(versions):
+    project = ProjectFactory()
+    auth = Auth(project.creator)
+    rng = random.Random(versions)
+    lines = ['Line {0} of the page, with some text to make it a realistic length.\n'.format(index)
+             for index in range(LINES)]
+    for version in range(versions):
+        for _ in range(3):
+            lines[rng.randrange(LINES)] = 'Edited in version {0}.\n'.format(version)
+        project.update_node_wiki('home', ''.join(lines), auth)
+    return project
+
+
+def stored_size(database, project):
+    page_ids = project.wiki_pages_versions['home']
+    return sum(
+        len(document.get('content') or '') + len(document.get('delta') or '')
+        for document in database['nodewikipage'].find({'_id': {'$in': page_ids}})
+    ) / 1024.0
+
+
+def read(project, version):
+    NodeWikiPage._clear_caches()
+    return project.get_wiki_page('home', version).get_content()
+
+
+def cold_read(project, version):
+    version_content_cache.clear()
+    return read(project, version)
+
+
+def main():
+    rows = []
+    with scratch_database() as database:
+        for versions in VERSIONS:
+            for deltas in (False, True):
+                with mock.patch.object(wiki_settings, 'WIKI_VERSION_DELTAS', deltas):
+                    project = build_page(versions)
+                rows.append([
+                    versions,
+                    'deltas' if deltas else 'full',
+                    stored_size(database, project),
+                    timed(lambda: read(project, versions)),
+                    timed(lambda: cold_read(project, 1)),
+                    timed(lambda: read(project, 1)),
+                ])
+    report(
+        'Wiki version history',
+        rows,
+        ['versions', 'storage', 'stored (KB)', 'current (ms)', 'oldest, cold (ms)', 'oldest, cached (ms)'],
+    )
+
+
+if __name__ == '__main__':
+    main()
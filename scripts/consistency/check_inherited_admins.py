@@ -0,0 +1,89 @@
+"""Check that the precomputed `inherited_admin_ids` of every node matches the admins found by
+walking up the primary parent chain, and optionally fix the nodes that drifted. Also serves as
+the backfill for nodes created before the field existed.
+
+To do a dry run (report only): ::
+
+    python -m scripts.consistency.check_inherited_admins dry
+
+To fix inconsistent nodes: ::
+
+    python -m scripts.consistency.check_inherited_admins
+"""
+import sys
+import logging
+
+from framework.mongo import database as db
+from framework.transactions.context import TokuTransaction
+
+from website.app import init_app
+
+from scripts import utils as script_utils
+from scripts.migration.migrate_ancestor_ids import get_parent_map
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+def get_admin_map(_db=None):
+    """Map each node id to the ids of the users with admin permission on that node."""
+    _db = _db or db
+    return {
+        document['_id']: set(
+            user_id for user_id, perms in (document.get('permissions') or {}).iteritems()
+            if 'admin' in perms
+        )
+        for document in _db['node'].find({}, {'permissions': True})
+    }
+
+
+def get_inherited_admin_ids(node_id, parents, admins, memo):
+    if node_id not in memo:
+        parent_id = parents.get(node_id)
+        if parent_id is None:
+            memo[node_id] = []
+        else:
+            inherited = get_inherited_admin_ids(parent_id, parents, admins, memo)
+            memo[node_id] = sorted(admins.get(parent_id, set()).union(inherited))
+    return memo[node_id]
+
+
+def find_inconsistent_nodes(_db=None):
+    """Yield `(node_id, stored, expected)` for each node whose stored inherited admins are stale."""
+    _db = _db or db
+    parents = get_parent_map(_db)
+    admins = get_admin_map(_db)
+    memo = {}
+    for document in _db['node'].find({}, {'inherited_admin_ids': True}):
+        expected = get_inherited_admin_ids(document['_id'], parents, admins, memo)
+        stored = document.get('inherited_admin_ids')
+        if stored != expected:
+            yield document['_id'], stored, expected
+
+
+def check_inherited_admins(fix=False, _db=None):
+    _db = _db or db
+    inconsistent = 0
+    for node_id, stored, expected in find_inconsistent_nodes(_db):
+        inconsistent += 1
+        logger.info('Node {0} has inherited admins {1}, expected {2}'.format(node_id, stored, expected))
+        if fix:
+            _db['node'].update(
+                {'_id': node_id},
+                {'$set': {'inherited_admin_ids': expected}}
+            )
+    logger.info('Found {0} nodes with inconsistent inherited admins.'.format(inconsistent))
+    return inconsistent
+
+
+def main(dry=True):
+    init_app(set_backends=True, routes=False)
+    with TokuTransaction():
+        check_inherited_admins(fix=not dry)
+
+
+if __name__ == '__main__':
+    dry = 'dry' in sys.argv
+    if not dry:
+        script_utils.add_file_logger(logger, __file__)
+    main(dry=dry)
@@ -72,6 +72,10 @@ def main(dry_run=True):
     usage_audit.hour.on(0)
     usage_audit.minute.on(0)  # Daily 12 a.m.
 
+    conference_submissions = ensure_item(cron, 'bash {}'.format(app_prefix('scripts/reconcile_conference_submissions.sh')))
+    conference_submissions.hour.on(3)
+    conference_submissions.minute.on(0)  # Daily 3:00 a.m.
+
     logger.info('Updating crontab file:')
     logger.info(cron.render())
 
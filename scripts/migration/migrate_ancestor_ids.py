@@ -0,0 +1,71 @@
+"""
+Backfill `ancestor_ids` on every node: the primary keys of its primary ancestors,
+nearest first. Node.save maintains the field from then on.
+
+The tree is rebuilt in memory from the raw `nodes` lists, so this makes one pass over
+the node collection plus one update per node whose ancestry is out of date.
+"""
+import sys
+import logging
+
+from framework.mongo import database as db
+from framework.transactions.context import TokuTransaction
+
+from website.app import init_app
+
+from scripts import utils as script_utils
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+def get_parent_map(_db=None):
+    """Map each node id to the id of its non-deleted primary parent."""
+    _db = _db or db
+    parents = {}
+    for document in _db['node'].find({'is_deleted': {'$ne': True}}, {'nodes': True}):
+        for child_id, collection in document.get('nodes') or []:
+            if collection == 'node':
+                parents[child_id] = document['_id']
+    return parents
+
+
+def get_ancestor_ids(node_id, parents, memo):
+    if node_id not in memo:
+        parent_id = parents.get(node_id)
+        memo[node_id] = [] if parent_id is None else [parent_id] + get_ancestor_ids(parent_id, parents, memo)
+    return memo[node_id]
+
+
+def do_migration(_db=None):
+    _db = _db or db
+    parents = get_parent_map(_db)
+    memo = {}
+    updated = 0
+    for document in _db['node'].find({}, {'ancestor_ids': True}):
+        ancestor_ids = get_ancestor_ids(document['_id'], parents, memo)
+        if document.get('ancestor_ids') == ancestor_ids:
+            continue
+        _db['node'].update(
+            {'_id': document['_id']},
+            {'$set': {'ancestor_ids': ancestor_ids}}
+        )
+        updated += 1
+        logger.info('Set ancestor_ids of node {0} to {1}'.format(document['_id'], ancestor_ids))
+    logger.info('Updated {0} nodes.'.format(updated))
+    return updated
+
+
+def main(dry=True):
+    init_app(set_backends=True, routes=False)
+    with TokuTransaction():
+        do_migration()
+        if dry:
+            raise RuntimeError('Dry run, rolling back transaction.')
+
+
+if __name__ == '__main__':
+    dry = 'dry' in sys.argv
+    if not dry:
+        script_utils.add_file_logger(logger, __file__)
+    main(dry=dry)
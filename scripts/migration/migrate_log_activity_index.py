@@ -0,0 +1,57 @@
+"""
+Backfill the activity index on node logs: `tree_ids`, the node the log was added to
+followed by its primary ancestors, and `visibility`, whether that node is public.
+Node.save keeps both up to date from then on.
+
+Run after scripts/migration/migrate_ancestor_ids.py and
+scripts/migration/migrate_logs_to_stream.py. Makes one update per node; logs that
+are already indexed are left alone, so the migration can be resumed.
+"""
+import sys
+import logging
+
+from framework.mongo import database as db
+from framework.transactions.context import TokuTransaction
+
+from website.app import init_app
+from website.models import NodeLog
+
+from scripts import utils as script_utils
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+def do_migration(_db=None):
+    _db = _db or db
+    updated = 0
+    for document in _db['node'].find({}, {'ancestor_ids': True, 'is_public': True}):
+        result = _db['nodelog'].update(
+            {'node_id': document['_id'], 'tree_ids': {'$exists': False}},
+            {'$set': {
+                'tree_ids': [document['_id']] + list(document.get('ancestor_ids') or []),
+                'visibility': NodeLog.VISIBILITY_PUBLIC if document.get('is_public') else NodeLog.VISIBILITY_PRIVATE,
+            }},
+            multi=True,
+        )
+        count = result.get('n', 0) if result else 0
+        if count:
+            logger.info('Indexed {0} logs of node {1}'.format(count, document['_id']))
+        updated += count
+    logger.info('Indexed {0} logs.'.format(updated))
+    return updated
+
+
+def main(dry=True):
+    init_app(set_backends=True, routes=False)
+    with TokuTransaction():
+        do_migration()
+        if dry:
+            raise RuntimeError('Dry run, rolling back transaction.')
+
+
+if __name__ == '__main__':
+    dry = 'dry' in sys.argv
+    if not dry:
+        script_utils.add_file_logger(logger, __file__)
+    main(dry=dry)
@@ -0,0 +1,99 @@
+"""
+Move node logs out of the `logs` list on each node and into the log stream: every log
+gets the `node_id` of the node it was added to, and forks and registrations get a
+`log_lineage` that references the logs they inherited instead of a copy of their ids.
+
+A log listed by a node and by the node it was forked or registered from belongs to the
+latter. The `logs` list is removed from each node once its logs have been claimed.
+"""
+import sys
+import logging
+
+from framework.mongo import database as db
+from framework.transactions.context import TokuTransaction
+
+from website.app import init_app
+
+from scripts import utils as script_utils
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+BATCH_SIZE = 1000
+
+
+def get_log_documents(_db=None):
+    """Map the id of each node that still has a `logs` list to its raw document."""
+    _db = _db or db
+    return {
+        document['_id']: document
+        for document in _db['node'].find(
+            {'logs': {'$exists': True}},
+            {'logs': True, 'forked_from': True, 'registered_from': True},
+        )
+    }
+
+
+def get_stream(node_id, documents, memo):
+    """Return (own log ids, log lineage) for a node, computing its source's first."""
+    if node_id not in memo:
+        document = documents[node_id]
+        log_ids = [each for each in document.get('logs') or [] if each is not None]
+        # A registration of a fork keeps the fork's `forked_from`; it inherits from the fork
+        source_id = document.get('registered_from') or document.get('forked_from')
+        if source_id not in documents:
+            memo[node_id] = (log_ids, [])
+        else:
+            source_own, source_lineage = get_stream(source_id, documents, memo)
+            source_logs = set(documents[source_id].get('logs') or [])
+            inherited = [each for each in log_ids if each in source_logs]
+            inherited_own = set(inherited).intersection(source_own)
+            lineage = [{'node': source_id, 'until': max(inherited_own)}] if inherited_own else []
+            if len(inherited_own) < len(inherited):
+                # Also inherited what the source itself inherited
+                lineage.extend(source_lineage)
+            memo[node_id] = ([each for each in log_ids if each not in source_logs], lineage)
+    return memo[node_id]
+
+
+def do_migration(_db=None):
+    _db = _db or db
+    documents = get_log_documents(_db)
+    memo = {}
+    migrated = 0
+    for node_id in documents:
+        own, lineage = get_stream(node_id, documents, memo)
+        for start in range(0, len(own), BATCH_SIZE):
+            batch = own[start:start + BATCH_SIZE]
+            result = _db['nodelog'].update(
+                {'_id': {'$in': batch}, 'node_id': None},
+                {'$set': {'node_id': node_id}},
+                multi=True,
+            )
+            if result and result.get('n', len(batch)) < len(batch):
+                logger.warn('{0} logs of node {1} were already claimed by another node'.format(
+                    len(batch) - result['n'], node_id
+                ))
+        _db['node'].update(
+            {'_id': node_id},
+            {'$set': {'log_lineage': lineage}, '$unset': {'logs': True}},
+        )
+        migrated += 1
+        logger.info('Moved {0} logs of node {1} to the log stream, lineage {2}'.format(len(own), node_id, lineage))
+    logger.info('Migrated {0} nodes.'.format(migrated))
+    return migrated
+
+
+def main(dry=True):
+    init_app(set_backends=True, routes=False)
+    with TokuTransaction():
+        do_migration()
+        if dry:
+            raise RuntimeError('Dry run, rolling back transaction.')
+
+
+if __name__ == '__main__':
+    dry = 'dry' in sys.argv
+    if not dry:
+        script_utils.add_file_logger(logger, __file__)
+    main(dry=dry)
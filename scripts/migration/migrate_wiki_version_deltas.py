@@ -0,0 +1,79 @@
+"""
+Store older wiki versions as deltas from the next version, as update_node_wiki does
+when WIKI_VERSION_DELTAS is on. Every WIKI_VERSION_SNAPSHOT_INTERVAL-th version, and
+any version that is some node's current page, is kept in full.
+
+Pages are updated directly so that no search updates are triggered; versions that
+already hold a delta are skipped, so the migration can be resumed.
+"""
+import sys
+import logging
+
+from framework.mongo import database as db
+from framework.transactions.context import TokuTransaction
+
+from website.app import init_app
+from website.addons.wiki.model import NodeWikiPage
+
+from scripts import utils as script_utils
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+def get_version_lists(_db=None):
+    """Return the id lists of every wiki page's versions, and the ids of all pages
+    that are current on some node.
+    """
+    _db = _db or db
+    version_lists = []
+    current_ids = set()
+    query = {'wiki_pages_versions': {'$nin': [None, {}]}}
+    for document in _db['node'].find(query, {'wiki_pages_versions': True, 'wiki_pages_current': True}):
+        version_lists.extend(document['wiki_pages_versions'].values())
+        current_ids.update((document.get('wiki_pages_current') or {}).values())
+    return version_lists, current_ids
+
+
+def do_migration(_db=None):
+    _db = _db or db
+    version_lists, current_ids = get_version_lists(_db)
+    compressed = saved = 0
+    for version_ids in version_lists:
+        pages = NodeWikiPage.load_many(version_ids)
+        # Oldest first, so the next version is still stored in full when diffed against
+        for page, newer in zip(pages, pages[1:]):
+            if page is None or newer is None or page._id in current_ids:
+                continue
+            size = len(page.content or '')
+            if not page.compress(newer):
+                continue
+            _db['nodewikipage'].update(
+                {'_id': page._id},
+                {'$set': {
+                    'content': None,
+                    'delta': page.delta,
+                    'delta_base': page.delta_base,
+                    'render_cache': [],
+                }},
+            )
+            compressed += 1
+            saved += size - len(page.delta)
+        NodeWikiPage._clear_caches()
+    logger.info('Stored {0} wiki versions as deltas, saving {1} characters.'.format(compressed, saved))
+    return compressed
+
+
+def main(dry=True):
+    init_app(set_backends=True, routes=False)
+    with TokuTransaction():
+        do_migration()
+        if dry:
+            raise RuntimeError('Dry run, rolling back transaction.')
+
+
+if __name__ == '__main__':
+    dry = 'dry' in sys.argv
+    if not dry:
+        script_utils.add_file_logger(logger, __file__)
+    main(dry=dry)
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""Fill the render cache of every current wiki page, so that views and search
+reindexing find the rendered HTML and text already stored on the page.
+
+    python -m scripts.prerender_wikis [dry]
+    invoke prerender_wikis [--dry-run]
+"""
+from __future__ import absolute_import
+
+import sys
+import logging
+import itertools
+
+from framework.mongo import database
+
+from website.app import init_app
+from website.models import Node
+from website.addons.wiki.model import NodeWikiPage
+
+from scripts import utils as script_utils
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+BATCH_SIZE = 100
+
+
+def iter_wiki_nodes():
+    """Yield (node id, ids of the node's current wiki pages)."""
+    query = {'wiki_pages_current': {'$nin': [None, {}]}, 'is_deleted': {'$ne': True}}
+    for document in database['node'].find(query, {'wiki_pages_current': True}):
+        yield document['_id'], document['wiki_pages_current'].values()
+
+
+def prerender_wikis(dry_run=False):
+    """Render the pages whose cache has no entry for their node; return how many
+    pages were rendered and how many were already cached.
+    """
+    rendered = cached = 0
+    nodes = iter_wiki_nodes()
+    while True:
+        batch = list(itertools.islice(nodes, BATCH_SIZE))
+        if not batch:
+            break
+        page_ids = [page_id for _, node_page_ids in batch for page_id in node_page_ids]
+        pages = dict(zip(page_ids, NodeWikiPage.load_many(page_ids)))
+        for node, (node_id, node_page_ids) in zip(Node.load_many(node_id for node_id, _ in batch), batch):
+            for page in (pages[page_id] for page_id in node_page_ids):
+                if node is None or page is None:
+                    continue
+                key = page.render_key(node)
+                if any(entry['key'] == key for entry in page.render_cache):
+                    cached += 1
+                    continue
+                if not dry_run:
+                    page.render(node)
+                rendered += 1
+        Node._clear_caches()
+        NodeWikiPage._clear_caches()
+    logger.info('{0} {1} wiki pages, {2} already cached'.format(
+        'Would render' if dry_run else 'Rendered', rendered, cached
+    ))
+    return rendered, cached
+
+
+def main(dry_run=True):
+    init_app(set_backends=True, routes=False)
+    prerender_wikis(dry_run=dry_run)
+
+
+if __name__ == '__main__':
+    dry_run = 'dry' in sys.argv
+    if not dry_run:
+        script_utils.add_file_logger(logger, __file__)
+    main(dry_run=dry_run)
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""Rebuild the submission index of every conference from its tagged nodes.
+Runs daily to refresh download counts, which are not updated as files are
+downloaded, and to repair rows missed by the save hooks. Run it once to build
+the index for existing conferences.
+
+    python -m scripts.reconcile_conference_submissions [dry]
+"""
+import sys
+import logging
+
+from framework.transactions.context import TokuTransaction
+
+from website.app import init_app
+from website.conferences.model import Conference
+from website.conferences.utils import reconcile_submissions
+
+from scripts import utils as script_utils
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+def reconcile_conferences():
+    """Reconcile each conference; return the total number of submissions."""
+    total = 0
+    for conference in Conference.find():
+        count = reconcile_submissions(conference)
+        logger.info('Indexed {0} submissions to {1}'.format(count, conference.endpoint))
+        total += count
+    return total
+
+
+def main(dry_run=True):
+    init_app(set_backends=True, routes=False)
+    with TokuTransaction():
+        reconcile_conferences()
+        if dry_run:
+            raise RuntimeError('Dry run, rolling back transaction.')
+
+
+if __name__ == '__main__':
+    dry_run = 'dry' in sys.argv
+    if not dry_run:
+        script_utils.add_file_logger(logger, __file__)
+    main(dry_run=dry_run)
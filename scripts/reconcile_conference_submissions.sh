@@ -0,0 +1,6 @@
+#!/bin/bash
+
+export HOME="/home"
+cd /opt/apps/osf
+source /opt/data/envs/osf/bin/activate
+python -m scripts.reconcile_conference_submissions
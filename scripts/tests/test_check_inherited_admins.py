@@ -0,0 +1,39 @@
+from nose.tools import *  # noqa
+
+from framework.mongo import database as db
+
+from website.models import Node
+
+from tests.base import OsfTestCase
+from tests.factories import AuthUserFactory, ProjectFactory, NodeFactory
+
+from scripts.consistency.check_inherited_admins import check_inherited_admins
+
+
+class TestCheckInheritedAdmins(OsfTestCase):
+
+    def setUp(self):
+        super(TestCheckInheritedAdmins, self).setUp()
+        self.user = AuthUserFactory()
+        self.root = ProjectFactory(creator=self.user)
+        self.child = NodeFactory(parent=self.root, creator=AuthUserFactory())
+        self.grandchild = NodeFactory(parent=self.child, creator=AuthUserFactory())
+
+    def test_consistent_tree_reports_nothing(self):
+        assert_equal(check_inherited_admins(), 0)
+
+    def test_reports_without_fixing(self):
+        db['node'].update({}, {'$unset': {'inherited_admin_ids': True}}, multi=True)
+        assert_equal(check_inherited_admins(), 3)
+        assert_equal(check_inherited_admins(), 3)
+
+    def test_fixes_stale_nodes(self):
+        db['node'].update({}, {'$unset': {'inherited_admin_ids': True}}, multi=True)
+        assert_equal(check_inherited_admins(fix=True), 3)
+        assert_equal(check_inherited_admins(), 0)
+        Node._clear_caches()
+        grandchild = Node.load(self.grandchild._id)
+        assert_equal(
+            grandchild.inherited_admin_ids,
+            sorted([self.user._id, self.child.creator._id])
+        )
@@ -0,0 +1,32 @@
+from nose.tools import *  # noqa
+
+from framework.mongo import database as db
+
+from website.models import Node
+
+from tests.base import OsfTestCase
+from tests.factories import ProjectFactory, NodeFactory
+
+from scripts.migration.migrate_ancestor_ids import do_migration
+
+
+class TestMigrateAncestorIds(OsfTestCase):
+
+    def setUp(self):
+        super(TestMigrateAncestorIds, self).setUp()
+        self.root = ProjectFactory()
+        self.child = NodeFactory(parent=self.root)
+        self.grandchild = NodeFactory(parent=self.child)
+        db['node'].update({}, {'$unset': {'ancestor_ids': True}}, multi=True)
+        Node._clear_caches()
+
+    def test_backfills_ancestor_ids(self):
+        do_migration()
+        Node._clear_caches()
+        assert_equal(Node.load(self.root._id).ancestor_ids, [])
+        assert_equal(Node.load(self.child._id).ancestor_ids, [self.root._id])
+        assert_equal(Node.load(self.grandchild._id).ancestor_ids, [self.child._id, self.root._id])
+
+    def test_is_idempotent(self):
+        assert_equal(do_migration(), 3)
+        assert_equal(do_migration(), 0)
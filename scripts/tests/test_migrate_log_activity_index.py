@@ -0,0 +1,34 @@
+from nose.tools import *  # noqa
+
+from framework.auth import Auth
+from framework.mongo import database as db
+
+from website.models import NodeLog
+
+from tests.base import OsfTestCase
+from tests.factories import ProjectFactory, NodeFactory
+
+from scripts.migration.migrate_log_activity_index import do_migration
+
+
+class TestMigrateLogActivityIndex(OsfTestCase):
+
+    def setUp(self):
+        super(TestMigrateLogActivityIndex, self).setUp()
+        self.project = ProjectFactory(is_public=True)
+        self.component = NodeFactory(parent=self.project, creator=self.project.creator)
+        self.component.add_log(NodeLog.TAG_ADDED, {'node': self.component._id}, auth=Auth(self.project.creator))
+        db['nodelog'].update({}, {'$unset': {'tree_ids': True, 'visibility': True}}, multi=True)
+        NodeLog._clear_caches()
+
+    def test_indexes_logs_under_ancestors(self):
+        do_migration()
+        NodeLog._clear_caches()
+        log = NodeLog.load(self.component.logs._to_primary_keys()[-1])
+        assert_equal(log.tree_ids, [self.component._id, self.project._id])
+        assert_equal(log.visibility, NodeLog.VISIBILITY_PRIVATE)
+        assert_equal(self.project.logs[0].visibility, NodeLog.VISIBILITY_PUBLIC)
+
+    def test_is_idempotent(self):
+        assert_true(do_migration())
+        assert_equal(do_migration(), 0)
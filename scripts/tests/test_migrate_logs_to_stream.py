@@ -0,0 +1,79 @@
+from nose.tools import *  # noqa
+
+from framework.auth import Auth
+from framework.mongo import database as db
+
+from website.models import Node, NodeLog
+
+from tests.base import OsfTestCase
+from tests.factories import ProjectFactory, RegistrationFactory, UserFactory
+
+from scripts.migration.migrate_logs_to_stream import do_migration
+
+
+class TestMigrateLogsToStream(OsfTestCase):
+
+    def setUp(self):
+        super(TestMigrateLogsToStream, self).setUp()
+        self.user = UserFactory()
+        self.auth = Auth(self.user)
+        self.project = ProjectFactory(creator=self.user)
+        self.project.add_log('tag_added', {'node': self.project._id}, auth=self.auth)
+        self.fork = self.project.fork_node(self.auth)
+        self.fork_of_fork = self.fork.fork_node(self.auth)
+        self.project.add_log('tag_removed', {'node': self.project._id}, auth=self.auth)
+        self.nodes = [self.project, self.fork, self.fork_of_fork]
+        self.store_logs_on_nodes()
+
+    def store_logs_on_nodes(self):
+        """Put the logs back on the nodes, as they were stored before the log stream."""
+        self.expected = {node._id: node.logs._to_primary_keys() for node in self.nodes}
+        for node in self.nodes:
+            db['node'].update(
+                {'_id': node._id},
+                {'$set': {'logs': self.expected[node._id]}, '$unset': {'log_lineage': True}},
+            )
+        db['nodelog'].update({}, {'$unset': {'node_id': True}}, multi=True)
+        Node._clear_caches()
+        NodeLog._clear_caches()
+
+    def test_moves_logs_to_stream(self):
+        do_migration()
+        Node._clear_caches()
+        NodeLog._clear_caches()
+        for node in self.nodes:
+            assert_equal(Node.load(node._id).logs._to_primary_keys(), self.expected[node._id])
+        assert_equal(db['node'].find({'logs': {'$exists': True}}).count(), 0)
+
+    def test_forks_reference_source_logs(self):
+        do_migration()
+        Node._clear_caches()
+        lineage = Node.load(self.fork_of_fork._id).log_lineage
+        assert_equal([each['node'] for each in lineage], [self.fork._id, self.project._id])
+        first_log = NodeLog.load(self.expected[self.project._id][0])
+        assert_equal(first_log.node_id, self.project._id)
+
+    def test_registration_of_fork_inherits_from_fork(self):
+        # Register the fork once its logs are in the stream, then store them all back
+        do_migration()
+        Node._clear_caches()
+        NodeLog._clear_caches()
+        self.fork = Node.load(self.fork._id)
+        self.fork.add_log('tag_added', {'node': self.fork._id}, auth=self.auth)
+        registration = RegistrationFactory(project=self.fork, creator=self.user)
+        self.nodes = [Node.load(node._id) for node in self.nodes] + [registration]
+        self.store_logs_on_nodes()
+        fork_log = self.expected[self.fork._id][-1]
+
+        do_migration()
+        Node._clear_caches()
+        NodeLog._clear_caches()
+        assert_equal(NodeLog.load(fork_log).node_id, self.fork._id)
+        assert_equal(Node.load(self.fork._id).logs._to_primary_keys(), self.expected[self.fork._id])
+        registration = Node.load(registration._id)
+        assert_equal(registration.logs._to_primary_keys(), self.expected[registration._id])
+        assert_equal(registration.log_lineage[0]['node'], self.fork._id)
+
+    def test_is_idempotent(self):
+        assert_equal(do_migration(), 3)
+        assert_equal(do_migration(), 0)
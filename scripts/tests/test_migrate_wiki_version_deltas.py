@@ -0,0 +1,47 @@
+from nose.tools import *  # noqa
+
+from framework.auth import Auth
+
+from website.addons.wiki.model import NodeWikiPage
+from website.addons.wiki.utils import version_content_cache
+
+from tests.base import OsfTestCase
+from tests.factories import ProjectFactory
+
+from scripts.migration.migrate_wiki_version_deltas import do_migration
+
+
+class TestMigrateWikiVersionDeltas(OsfTestCase):
+
+    def setUp(self):
+        super(TestMigrateWikiVersionDeltas, self).setUp()
+        self.project = ProjectFactory()
+        self.auth = Auth(self.project.creator)
+        self.contents = ['a\nb\nc\n', 'a\nB\nc\n', 'a\nB\nc\nd\n']
+        for content in self.contents:
+            self.project.update_node_wiki('home', content, self.auth)
+        version_content_cache.clear()
+
+    def load(self, version):
+        return NodeWikiPage.load(self.project.get_wiki_page('home', version)._id)
+
+    def test_stores_older_versions_as_deltas(self):
+        assert_equal(do_migration(), 2)
+        NodeWikiPage._clear_caches()
+        for version, content in enumerate(self.contents, 1):
+            assert_equal(self.load(version).get_content(), content)
+        assert_is_none(self.load(1).content)
+        assert_equal(self.load(1).delta_base, self.load(2)._id)
+        assert_is_none(self.load(3).delta)
+
+    def test_keeps_pages_current_on_forks(self):
+        fork = self.project.fork_node(self.auth)
+        fork_current = fork.wiki_pages_current['home']
+        self.project.update_node_wiki('home', 'e\n', self.auth)
+        do_migration()
+        NodeWikiPage._clear_caches()
+        assert_equal(NodeWikiPage.load(fork_current).content, self.contents[-1])
+
+    def test_is_idempotent(self):
+        assert_equal(do_migration(), 2)
+        assert_equal(do_migration(), 0)
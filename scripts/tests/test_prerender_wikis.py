@@ -0,0 +1,33 @@
+from nose.tools import *  # noqa
+
+from framework.auth import Auth
+from framework.mongo import database as db
+
+from website.addons.wiki.model import NodeWikiPage
+
+from tests.base import OsfTestCase
+from tests.factories import ProjectFactory
+
+from scripts.prerender_wikis import prerender_wikis
+
+
+class TestPrerenderWikis(OsfTestCase):
+
+    def setUp(self):
+        super(TestPrerenderWikis, self).setUp()
+        self.project = ProjectFactory()
+        self.project.update_node_wiki('home', 'Hello', Auth(self.project.creator))
+        self.page = self.project.get_wiki_page('home')
+        db['nodewikipage'].update({}, {'$set': {'render_cache': []}}, multi=True)
+        NodeWikiPage._clear_caches()
+
+    def test_dry_run_renders_nothing(self):
+        assert_equal(prerender_wikis(dry_run=True), (1, 0))
+        assert_equal(NodeWikiPage.load(self.page._id).render_cache, [])
+
+    def test_fills_render_cache(self):
+        assert_equal(prerender_wikis(), (1, 0))
+        NodeWikiPage._clear_caches()
+        entry = NodeWikiPage.load(self.page._id).render_cache[0]
+        assert_equal(entry['text'], 'Hello')
+        assert_equal(prerender_wikis(), (0, 1))
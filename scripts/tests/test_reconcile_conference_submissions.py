@@ -0,0 +1,48 @@
+from nose.tools import *  # noqa
+
+from modularodm import Q
+
+from framework.auth import Auth
+
+from website.conferences.model import ConferenceSubmission
+
+from tests.base import OsfTestCase
+from tests.factories import ProjectFactory
+from tests.test_conferences import ConferenceFactory, create_fake_conference_nodes
+
+from scripts.reconcile_conference_submissions import reconcile_conferences
+
+
+class TestReconcileConferenceSubmissions(OsfTestCase):
+
+    def setUp(self):
+        super(TestReconcileConferenceSubmissions, self).setUp()
+        ConferenceSubmission.remove()
+        self.conference = ConferenceFactory()
+        self.nodes = create_fake_conference_nodes(2, self.conference.endpoint)
+
+    def test_rebuilds_missing_rows(self):
+        ConferenceSubmission.remove()
+        assert_equal(reconcile_conferences(), 2)
+        rows = ConferenceSubmission.find(Q('conference', 'eq', self.conference.endpoint))
+        assert_equal(
+            set(row.node for row in rows),
+            set(node._id for node in self.nodes),
+        )
+        self.conference.reload()
+        assert_equal(self.conference.num_submissions, 2)
+
+    def test_removes_stale_rows(self):
+        private = ProjectFactory()
+        private.add_tag(self.conference.endpoint, Auth(private.creator))
+        ConferenceSubmission(conference=self.conference.endpoint, node=private._id).save()
+        reconcile_conferences()
+        assert_equal(ConferenceSubmission.find(Q('node', 'eq', private._id)).count(), 0)
+
+    def test_refreshes_rows(self):
+        row = ConferenceSubmission.find_one(Q('node', 'eq', self.nodes[0]._id))
+        row.title = 'Stale title'
+        row.save()
+        reconcile_conferences()
+        row.reload()
+        assert_equal(row.title, self.nodes[0].title)
@@ -382,6 +382,13 @@ def migrate_search(delete=False, index=settings.ELASTIC_INDEX):
     from website.search_migration.migrate import migrate
     migrate(delete, index=index)
 
+@task
+def reindex_search(index=settings.ELASTIC_INDEX, workers=0, chunk_size=1000, resume=False, delete_old=False):
+    """Rebuild the search index into a new version in parallel, then swap the alias over to it.
+    Pass --resume to pick up a run that did not finish."""
+    from website.search_migration.reindex import main
+    main(alias=index, workers=int(workers) or None, chunk_size=int(chunk_size), resume=resume, delete_old=delete_old)
+
 @task
 def rebuild_search():
     """Delete and recreate the index for elasticsearch"""
@@ -399,6 +406,15 @@ def mailserver(port=1025):
     run(bin_prefix(cmd), pty=True)
 
 
+@task
+def mailsink(port=1025, delay=0):
+    """Run a SMTP server that counts and discards mail, for benchmarking delivery.
+    ``delay`` is added to each new connection, in seconds.
+    """
+    cmd = 'python -m framework.email.sink {port} {delay}'.format(port=port, delay=delay)
+    run(bin_prefix(cmd), pty=True)
+
+
 @task
 def jshint():
     """Run JSHint syntax check"""
@@ -898,6 +914,12 @@ def generate_self_signed(domain):
     ).format(domain)
     run(cmd)
 
+@task
+def prerender_wikis(dry_run=False):
+    """Fill the render cache of every current wiki page."""
+    from scripts import prerender_wikis
+    prerender_wikis.main(dry_run=dry_run)
+
 @task
 def update_citation_styles():
     from scripts import parse_citation_styles
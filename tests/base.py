@@ -131,6 +131,9 @@ class DbTestCase(unittest.TestCase):
 
         cls._original_bcrypt_log_rounds = settings.BCRYPT_LOG_ROUNDS
         settings.BCRYPT_LOG_ROUNDS = 1
+        # Search tests assert on documents right after writing them
+        cls._original_elastic_refresh = settings.ELASTIC_REFRESH
+        settings.ELASTIC_REFRESH = True
 
         teardown_database(database=database_proxy._get_current_object())
         # TODO: With `database` as a `LocalProxy`, we should be able to simply
@@ -154,6 +157,7 @@ class DbTestCase(unittest.TestCase):
         settings.PIWIK_HOST = cls._original_piwik_host
         settings.ENABLE_EMAIL_SUBSCRIPTIONS = cls._original_enable_email_subscriptions
         settings.BCRYPT_LOG_ROUNDS = cls._original_bcrypt_log_rounds
+        settings.ELASTIC_REFRESH = cls._original_elastic_refresh
 
 
 class AppTestCase(unittest.TestCase):
@@ -2,9 +2,12 @@
 import unittest
 import smtplib
 
+import mock
 from nose.tools import *  # PEP8 asserts
 
-from framework.email.tasks import send_email
+from framework.email import smtp
+from framework.email.sink import SMTPSink
+from framework.email.tasks import send_email, send_emails
 from website import settings
 
 # Check if local mail server is running
@@ -27,5 +30,77 @@ class TestEmail(unittest.TestCase):
                                  message="<h1>Greetings!</h1>", ttls=False, login=False))
 
 
+class TestSMTPConnectionPool(unittest.TestCase):
+
+    def setUp(self):
+        self.sink = SMTPSink(port=0).start()
+        self.mail_server = 'localhost:{0}'.format(self.sink.port)
+        self.pool = smtp.SMTPConnectionPool(self.mail_server, ttls=False, login=False)
+        self.messages = [
+            ('foo@bar.com', ['user{0}@quux.com'.format(index)], 'Subject: hi\n\nHello')
+            for index in range(5)
+        ]
+
+    def tearDown(self):
+        self.pool.close()
+        smtp.close_pools()
+        self.sink.stop()
+
+    def test_batch_is_sent_over_one_connection(self):
+        metrics = self.pool.send_batch(self.messages)
+        assert_equal(metrics['sent'], 5)
+        assert_equal(metrics['failed'], 0)
+        assert_equal(self.sink.received, 5)
+        assert_equal(self.sink.connections, 1)
+
+    def test_connection_is_reused(self):
+        self.pool.send_batch(self.messages[:2])
+        self.pool.send_batch(self.messages[2:])
+        assert_equal(self.sink.connections, 1)
+        assert_equal(self.pool.stats['reused'], 1)
+
+    def test_expired_connection_is_replaced(self):
+        self.pool.max_age = -1
+        self.pool.send_batch(self.messages[:2])
+        self.pool.send_batch(self.messages[2:])
+        assert_equal(self.sink.connections, 2)
+        assert_equal(self.pool.stats['closed'], 1)
+
+    def test_reconnects_when_connection_drops(self):
+        self.pool.send_batch(self.messages[:1])
+        self.pool._idle[0][0].sock.close()
+        metrics = self.pool.send_batch(self.messages[1:])
+        assert_equal(metrics['sent'], 4)
+        assert_equal(metrics['reconnects'], 1)
+        assert_equal(self.sink.received, 5)
+
+    def test_refused_message_is_skipped(self):
+        with mock.patch('smtplib.SMTP.sendmail') as mock_sendmail:
+            mock_sendmail.side_effect = [smtplib.SMTPRecipientsRefused({}), {}]
+            metrics = self.pool.send_batch(self.messages[:2])
+        assert_equal(metrics['sent'], 1)
+        assert_equal(metrics['failed'], 1)
+
+    @mock.patch('website.settings.USE_EMAIL', True)
+    def test_send_emails(self):
+        messages = [
+            dict(from_addr='foo@bar.com', to_addr='baz@quux.com', subject='no subject',
+                 message='<h1>Greetings!</h1>', mimetype='html')
+        ] * 3
+        metrics = send_emails(messages, ttls=False, login=False, mail_server=self.mail_server)
+        assert_equal(metrics['sent'], 3)
+        assert_in('Subject: no subject', self.sink.messages[0][2])
+
+    @mock.patch('website.settings.USE_EMAIL', True)
+    @mock.patch('website.settings.USE_MAIL_POOL', True)
+    def test_send_email_uses_pool(self):
+        for _ in range(2):
+            assert_true(send_email('foo@bar.com', 'baz@quux.com', subject='no subject',
+                                   message='<h1>Greetings!</h1>', ttls=False, login=False,
+                                   mail_server=self.mail_server))
+        assert_equal(self.sink.received, 2)
+        assert_equal(self.sink.connections, 1)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -6,15 +6,18 @@ These require a test db because they use Session objects.
 import json
 import unittest
 import os
+import shutil
+import tempfile
 
 import flask
+import mock
 from lxml.html import fragment_fromstring
 import werkzeug.wrappers
 
 from framework.exceptions import HTTPError, http
 from framework.routing import (
-    Renderer, JSONRenderer, WebRenderer,
-    render_mako_string,
+    Renderer, JSONRenderer, WebRenderer, RenderProfile,
+    MakoTemplateCache, render_mako_string,
 )
 
 from tests.base import AppTestCase, OsfTestCase
@@ -318,6 +321,133 @@ class WebRendererTemplateTestCase(OsfTestCase):
             result,
         )
 
+    def _render_nested(self, html, profile=None):
+        r = WebRenderer(
+            'nested_child.html',
+            render_mako_string,
+            template_dir=TEMPLATES_PATH,
+        )
+        return r.render_nested(html, {}, profile=profile)
+
+    def test_render_nested_keeps_surrounding_html(self):
+        html = ''.join((
+            '<ol>\n',
+            "<div mod-meta='{\"tpl\": \"nested_child.html\", \"replace\": true}'></div>\n",
+            '<div class="empty"><div></div></div>',
+            "<div mod-meta='{\"tpl\": \"nested_child.html\", \"replace\": true}'><div>x</div></div>",
+            '</ol>',
+        ))
+        self.assertEqual(
+            self._render_nested(html),
+            ''.join((
+                '<ol>\n',
+                '<p>child template content</p>\n',
+                '<div class="empty"><div></div></div>',
+                '<p>child template content</p>',
+                '</ol>',
+            )),
+        )
+
+    def test_render_nested_inserts_into_element(self):
+        html = ''.join((
+            '<div id="widget" mod-meta="{&quot;tpl&quot;: &quot;nested_child.html&quot;}">',
+            '</div>',
+        ))
+        self.assertEqual(
+            self._render_nested(html),
+            ''.join((
+                '<div id="widget" mod-meta="{&quot;tpl&quot;: &quot;nested_child.html&quot;}">',
+                '<p>child template content</p>',
+                '</div>',
+            )),
+        )
+
+    def test_render_nested_ignores_text(self):
+        html = '<p>The mod-meta="{}" attribute embeds a template.</p>'
+        self.assertEqual(self._render_nested(html), html)
+
+    def test_render_nested_records_profile(self):
+        html = "<div mod-meta='{\"tpl\": \"nested_child.html\", \"replace\": true}'></div>"
+        profile = RenderProfile('page.html')
+        self._render_nested(html, profile=profile)
+        self.assertEqual(len(profile.entries), 1)
+        self.assertEqual(profile.entries[0]['template'], 'nested_child.html')
+        self.assertEqual(profile.entries[0]['depth'], 0)
+        self.assertIn('nested_child.html', profile.report())
+
+    def test_profile_logged_when_enabled(self):
+        self.app.app.preprocess_request()
+        r = WebRenderer(
+            'nested_parent.html',
+            render_mako_string,
+            template_dir=TEMPLATES_PATH,
+        )
+        with mock.patch('framework.routing.settings.PROFILE_TEMPLATES', True):
+            with mock.patch('framework.routing.logger') as mock_logger:
+                resp = r({})
+        self.assertIn('child template content', resp.data)
+        report = mock_logger.info.call_args[0][0]
+        self.assertIn('Rendered nested_parent.html', report)
+        self.assertIn('nested_child.html', report)
+
+
+class MakoTemplateCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tpldir = tempfile.mkdtemp()
+        self.cache = MakoTemplateCache(size=2)
+
+    def tearDown(self):
+        shutil.rmtree(self.tpldir)
+
+    def write(self, tplname, text):
+        path = os.path.join(self.tpldir, tplname)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as fp:
+            fp.write(text)
+
+    def test_same_name_in_different_directories(self):
+        self.write('one/page.mako', 'one')
+        self.write('two/page.mako', 'two')
+        one = self.cache.get_template(os.path.join(self.tpldir, 'one'), 'page.mako')
+        two = self.cache.get_template(os.path.join(self.tpldir, 'two'), 'page.mako')
+        self.assertEqual(one.render(), 'one')
+        self.assertEqual(two.render(), 'two')
+
+    def test_trust_is_part_of_key(self):
+        self.write('page.mako', '${value}')
+        trusted = self.cache.get_template(self.tpldir, 'page.mako', trust=True)
+        safe = self.cache.get_template(self.tpldir, 'page.mako', trust=False)
+        self.assertEqual(trusted.render(value='<b>'), '<b>')
+        self.assertEqual(safe.render(value='<b>'), '&lt;b&gt;')
+
+    def test_evicts_least_recently_used(self):
+        for tplname in ('a.mako', 'b.mako', 'c.mako'):
+            self.write(tplname, tplname)
+        a = self.cache.get_template(self.tpldir, 'a.mako')
+        self.cache.get_template(self.tpldir, 'b.mako')
+        self.cache.get_template(self.tpldir, 'a.mako')
+        self.cache.get_template(self.tpldir, 'c.mako')
+        self.assertEqual(len(self.cache), 2)
+        self.assertIs(self.cache.get((self.tpldir, 'a.mako', True)), a)
+        self.assertIsNone(self.cache.get((self.tpldir, 'b.mako', True)))
+
+    def test_missing_template(self):
+        with self.assertRaises(IOError):
+            self.cache.get_template(self.tpldir, 'missing.mako')
+
+    def test_precompile(self):
+        self.write('page.mako', 'page')
+        self.write('include/part.mako', 'part')
+        self.write('broken.mako', '<%def name="broken()">')
+        self.write('notes.txt', 'not a template')
+        cache = MakoTemplateCache(size=10)
+        stats = cache.precompile(self.tpldir, [self.tpldir])
+        self.assertEqual(stats['compiled'], 4)
+        self.assertEqual(stats['failed'], 2)
+        self.assertIsNotNone(cache.get((self.tpldir, 'include/part.mako', False)))
+
 
 class JSONRendererEncoderTestCase(unittest.TestCase):
 
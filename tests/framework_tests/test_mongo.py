@@ -7,7 +7,11 @@ from nose.tools import *  # flake8: noqa
 
 from modularodm.exceptions import ValidationError, ValidationValueError
 
-from framework.mongo import validators
+from framework.auth import User
+from framework.mongo import validators, get_load_stats, reset_load_stats
+
+from tests.base import OsfTestCase
+from tests.factories import UserFactory
 
 class TestValidators(TestCase):
 
@@ -62,3 +66,42 @@ class TestValidators(TestCase):
 
         with assert_raises(ValidationError):
             new_validator({'k': 'v', 'k2': 'v2'})
+
+
+class TestLoadMany(OsfTestCase):
+
+    def setUp(self):
+        super(TestLoadMany, self).setUp()
+        self.users = [UserFactory() for _ in range(3)]
+        User._clear_caches()
+        reset_load_stats()
+
+    def test_load_many_preserves_order_and_duplicates(self):
+        keys = [self.users[2]._id, self.users[0]._id, self.users[2]._id]
+        loaded = User.load_many(keys)
+        assert_equal([user._id for user in loaded], keys)
+
+    def test_load_many_returns_none_for_missing_keys(self):
+        loaded = User.load_many([self.users[0]._id, 'notauser'])
+        assert_equal(loaded[0]._id, self.users[0]._id)
+        assert_is_none(loaded[1])
+
+    def test_load_many_issues_one_query(self):
+        User.load_many(user._id for user in self.users)
+        stats = get_load_stats()
+        assert_equal(stats['queries'], 1)
+        assert_equal(stats['loaded'], 3)
+        assert_equal(stats['round_trips_saved'], 2)
+
+    def test_load_many_serves_cached_objects(self):
+        User.load(self.users[0]._id)
+        User.load_many(user._id for user in self.users)
+        User.load_many(user._id for user in self.users)
+        stats = get_load_stats()
+        assert_equal(stats['queries'], 1)
+        assert_equal(stats['loaded'], 2)
+        assert_equal(stats['hits'], 4)
+
+    def test_later_loads_hit_the_cache(self):
+        loaded = User.load_many(user._id for user in self.users)
+        assert_is(User.load(self.users[1]._id), loaded[1])
@@ -27,7 +27,8 @@ from website.project.model import MetaSchema, ensure_schemas
 from website.util import api_url_for, rubeus
 from website.project import new_private_link
 from website.project.views.node import _view_project as serialize_node
-from website.addons.base import AddonConfig, AddonNodeSettingsBase, views
+from website.addons.base import AddonConfig, AddonNodeSettingsBase, views, crawler
+from website.addons.base.testing.waterbutler import FakeWaterButler, make_tree, count_folders
 from website.addons.github.model import AddonGitHubOauthSettings
 from tests.base import OsfTestCase
 from tests.factories import AuthUserFactory, ProjectFactory
@@ -925,3 +926,138 @@ class TestLegacyViews(OsfTestCase):
             provider='mycooladdon',
         )
         assert_urls_equal(res.location, expected_url)
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def setUp(self):
+        self.now = [0.0]
+        self.sleeps = []
+
+        def sleep(seconds):
+            self.sleeps.append(seconds)
+            self.now[0] += seconds
+
+        self.bucket = crawler.TokenBucket(2, clock=lambda: self.now[0], sleep=sleep)
+
+    def test_allows_burst_up_to_capacity(self):
+        self.bucket.acquire()
+        self.bucket.acquire()
+        assert_equal(self.sleeps, [])
+
+    def test_waits_for_refill(self):
+        for _ in range(3):
+            self.bucket.acquire()
+        assert_equal(self.sleeps, [0.5])
+
+    def test_refills_over_time(self):
+        self.bucket.acquire()
+        self.bucket.acquire()
+        self.now[0] += 1
+        self.bucket.acquire()
+        self.bucket.acquire()
+        assert_equal(self.sleeps, [])
+
+    def test_rate_limiters_are_shared_per_provider(self):
+        assert_is(crawler.get_rate_limiter('github'), crawler.get_rate_limiter('github'))
+        assert_is_not(crawler.get_rate_limiter('github'), crawler.get_rate_limiter('box'))
+
+
+class TestFileTreeCrawler(unittest.TestCase):
+
+    def setUp(self):
+        self.tree = make_tree(depth=2, folders=3, files=2)
+        self.listings = FakeWaterButler(self.tree).folders
+        self.unlimited = crawler.TokenBucket(10000)
+
+    def fetch(self, folder, first=False):
+        return [dict(child) for child in self.listings[folder['path']]]
+
+    def test_crawls_every_folder_once(self):
+        tree_crawler = crawler.FileTreeCrawler(self.fetch, self.unlimited, workers=4)
+        root = tree_crawler.crawl({'path': '/', 'kind': 'folder', 'name': ''})
+        assert_equal(root, self.tree)
+        assert_equal(tree_crawler.requests_made, count_folders(self.tree))
+
+    def test_files_are_not_crawled(self):
+        fetch = mock.Mock()
+        filenode = {'path': '/file.txt', 'kind': 'file', 'name': 'file.txt'}
+        assert_is(crawler.FileTreeCrawler(fetch, self.unlimited).crawl(filenode), filenode)
+        assert_false(fetch.called)
+
+    def test_only_root_is_first(self):
+        firsts = []
+
+        def fetch(folder, first=False):
+            if first:
+                firsts.append(folder['path'])
+            return self.fetch(folder)
+
+        crawler.FileTreeCrawler(fetch, self.unlimited, workers=4).crawl({'path': '/', 'kind': 'folder'})
+        assert_equal(firsts, ['/'])
+
+    @mock.patch('website.addons.base.crawler.time.sleep')
+    def test_retries_transient_errors(self, mock_sleep):
+        fetch = mock.Mock(side_effect=[HTTPError(503), HTTPError(429), []])
+        tree_crawler = crawler.FileTreeCrawler(fetch, self.unlimited, max_retries=3, backoff=1)
+        assert_equal(tree_crawler.crawl({'path': '/', 'kind': 'folder'})['children'], [])
+        assert_equal(tree_crawler.requests_made, 3)
+        assert_equal(mock_sleep.call_count, 2)
+        # Backoff doubles, give or take the jitter
+        assert_true(0.5 <= mock_sleep.call_args_list[0][0][0] <= 1.5)
+        assert_true(1 <= mock_sleep.call_args_list[1][0][0] <= 3)
+
+    @mock.patch('website.addons.base.crawler.time.sleep')
+    def test_gives_up_after_max_retries(self, mock_sleep):
+        fetch = mock.Mock(side_effect=HTTPError(503))
+        tree_crawler = crawler.FileTreeCrawler(fetch, self.unlimited, max_retries=2)
+        with assert_raises(HTTPError):
+            tree_crawler.crawl({'path': '/', 'kind': 'folder'})
+        assert_equal(tree_crawler.requests_made, 3)
+
+    def test_does_not_retry_client_errors(self):
+        fetch = mock.Mock(side_effect=HTTPError(403))
+        tree_crawler = crawler.FileTreeCrawler(fetch, self.unlimited, max_retries=2)
+        with assert_raises(HTTPError) as cm:
+            tree_crawler.crawl({'path': '/', 'kind': 'folder'})
+        assert_equal(cm.exception.code, 403)
+        assert_equal(tree_crawler.requests_made, 1)
+
+
+class TestGetFileTree(OsfTestCase):
+
+    def setUp(self):
+        super(TestGetFileTree, self).setUp()
+        self.user = AuthUserFactory()
+        self.project = ProjectFactory(creator=self.user)
+        self.node_settings = self.project.get_addon('osfstorage')
+        self.tree = make_tree(depth=2, folders=3, files=2)
+
+    def crawl(self, fake, **kwargs):
+        fake.start()
+        try:
+            with mock.patch('website.settings.WATERBUTLER_URL', fake.url):
+                with mock.patch.dict('website.settings.WATERBUTLER_CRAWL_RATE_LIMITS', {'osfstorage': 10000}):
+                    crawler._rate_limiters.pop('osfstorage', None)
+                    return self.node_settings._get_file_tree(user=self.user, **kwargs)
+        finally:
+            fake.stop()
+            crawler._rate_limiters.pop('osfstorage', None)
+
+    def test_crawls_concurrently(self):
+        fake = FakeWaterButler(self.tree, latency=0.05)
+        assert_equal(self.crawl(fake), self.tree)
+        assert_equal(sorted(fake.requests), sorted(fake.folders))
+        assert_greater(fake.max_in_flight, 1)
+
+    @mock.patch('website.addons.base.crawler.time.sleep')
+    def test_recovers_from_injected_failures(self, mock_sleep):
+        fake = FakeWaterButler(self.tree, failures={'/folder1/': [503, 502]})
+        assert_equal(self.crawl(fake), self.tree)
+        assert_equal(fake.requests.count('/folder1/'), 3)
+
+    def test_raises_on_failure(self):
+        fake = FakeWaterButler(self.tree, failures={'/folder1/': [404]})
+        with assert_raises(HTTPError) as cm:
+            self.crawl(fake)
+        assert_equal(cm.exception.code, 404)
@@ -16,7 +16,7 @@ from framework.auth.core import Auth
 from website import settings
 from website.models import User, Node
 from website.conferences import views
-from website.conferences.model import Conference
+from website.conferences.model import Conference, ConferenceSubmission
 from website.conferences import utils, message
 from website.util import api_url_for, web_url_for
 
@@ -421,6 +421,7 @@ class TestConferenceEmailViews(OsfTestCase):
 
     def test_conference_submissions(self):
         Node.remove()
+        ConferenceSubmission.remove()
         conference1 = ConferenceFactory()
         conference2 = ConferenceFactory()
         # Create conference nodes
@@ -502,6 +503,61 @@ class TestConferenceEmailViews(OsfTestCase):
         assert_equal(res.status_code, 200)
 
 
+    def test_conference_submissions_does_not_save_conferences(self):
+        conference = ConferenceFactory()
+        create_fake_conference_nodes(2, conference.endpoint)
+        with mock.patch.object(Conference, 'save') as mock_save:
+            self.app.get(api_url_for('conference_submissions'))
+        assert_false(mock_save.called)
+
+
+class TestConferenceSubmissionIndex(OsfTestCase):
+
+    def setUp(self):
+        super(TestConferenceSubmissionIndex, self).setUp()
+        self.conference = ConferenceFactory()
+        self.node = create_fake_conference_nodes(1, self.conference.endpoint)[0]
+        self.auth = Auth(self.node.creator)
+
+    def get_rows(self):
+        return list(ConferenceSubmission.find(Q('node', 'eq', self.node._id)))
+
+    def test_tagged_public_node_is_indexed(self):
+        rows = self.get_rows()
+        assert_equal(len(rows), 1)
+        assert_equal(rows[0].conference, self.conference.endpoint)
+        assert_equal(rows[0].title, self.node.title)
+        assert_equal(rows[0].node_url, self.node.url)
+        assert_equal(rows[0].tags, [self.conference.endpoint])
+        assert_equal(rows[0].download_count, 0)
+        self.conference.reload()
+        assert_equal(self.conference.num_submissions, 1)
+
+    def test_title_change_updates_row(self):
+        self.node.set_title('Updated title', auth=self.auth, save=True)
+        assert_equal(self.get_rows()[0].title, 'Updated title')
+
+    def test_made_private_removes_row(self):
+        self.node.set_privacy('private', auth=self.auth)
+        assert_equal(self.get_rows(), [])
+        self.conference.reload()
+        assert_equal(self.conference.num_submissions, 0)
+
+    def test_removed_tag_removes_row(self):
+        self.node.remove_tag(self.conference.endpoint, auth=self.auth)
+        assert_equal(self.get_rows(), [])
+
+    def test_conference_data_serves_index(self):
+        url = api_url_for('conference_data', meeting=self.conference.endpoint)
+        res = self.app.get(url)
+        assert_equal(len(res.json), 1)
+        assert_equal(res.json[0]['title'], self.node.title)
+        assert_equal(res.json[0]['confName'], self.conference.name)
+        ConferenceSubmission.remove(Q('node', 'eq', self.node._id))
+        res = self.app.get(url)
+        assert_equal(res.json, [])
+
+
 class TestConferenceModel(OsfTestCase):
 
     def test_endpoint_and_name_are_required(self):
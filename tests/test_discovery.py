@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import datetime
+
+import mock
+import requests
+from nose.tools import *  # noqa (PEP8 asserts)
+
+from framework.auth import Auth
+from framework.mongo import database
+
+from website import settings
+from website.discovery import utils
+
+from tests.base import OsfTestCase
+from tests.factories import ProjectFactory, RegistrationFactory
+
+
+class TestDiscoverySnapshot(OsfTestCase):
+
+    def setUp(self):
+        super(TestDiscoverySnapshot, self).setUp()
+        database['discoverysnapshot'].remove()
+        self.public = ProjectFactory(is_public=True)
+        self.private = ProjectFactory()
+        self.registration = RegistrationFactory(is_public=True)
+        self.node_hits = [
+            (self.private._id, 10, 5),
+            (self.public._id, 8, 4),
+            ('notanode', 6, 3),
+            (self.registration._id, 4, 2),
+        ]
+
+    def update_snapshot(self, side_effect=None):
+        with mock.patch.object(settings, 'PIWIK_HOST', 'http://piwik.test/'):
+            with mock.patch('website.discovery.utils.get_popular_node_hits') as mock_hits:
+                mock_hits.return_value = self.node_hits
+                mock_hits.side_effect = side_effect
+                return utils.update_snapshot()
+
+    def test_update_snapshot_resolves_popular_nodes(self):
+        snapshot = self.update_snapshot()
+        assert_equal(snapshot['popular_public_projects'], [self.public._id])
+        assert_equal(snapshot['popular_public_registrations'], [self.registration._id])
+        assert_equal(snapshot['hits'][self.public._id], {'hits': 8, 'visits': 4})
+        assert_not_in(self.private._id, snapshot['hits'])
+        assert_in(self.public._id, snapshot['recent_public_projects'])
+        assert_equal(utils.get_snapshot()['popular_public_projects'], [self.public._id])
+
+    def test_piwik_failure_keeps_previous_popular_nodes(self):
+        self.update_snapshot()
+        snapshot = self.update_snapshot(side_effect=requests.exceptions.Timeout())
+        assert_equal(snapshot['popular_public_projects'], [self.public._id])
+        assert_equal(snapshot['hits'][self.public._id], {'hits': 8, 'visits': 4})
+
+    def test_snapshot_of_old_version_is_ignored(self):
+        self.update_snapshot()
+        database['discoverysnapshot'].update({}, {'$set': {'version': utils.SNAPSHOT_VERSION - 1}})
+        assert_is_none(utils.get_snapshot())
+
+    def test_activity_without_snapshot_skips_piwik(self):
+        with mock.patch('website.discovery.utils.get_popular_node_hits') as mock_hits:
+            res = self.app.get('/explore/activity/')
+        assert_equal(res.status_code, 200)
+        assert_false(mock_hits.called)
+        assert_in(self.public.title, res)
+
+    def test_activity_leaves_out_nodes_made_private(self):
+        self.update_snapshot()
+        self.public.set_privacy('private', auth=Auth(self.public.creator))
+        res = self.app.get('/explore/activity/')
+        assert_not_in(self.public.url, res)
+
+    def test_activity_marks_stale_snapshot(self):
+        self.update_snapshot()
+        res = self.app.get('/explore/activity/')
+        assert_not_in('may be out of date', res)
+        database['discoverysnapshot'].update({}, {'$set': {
+            'date': datetime.datetime.utcnow() - settings.DISCOVERY_SNAPSHOT_MAX_AGE * 2,
+        }})
+        res = self.app.get('/explore/activity/')
+        assert_in('may be out of date', res)
@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
+import os
 import time
+import tempfile
 import unittest
 import logging
 import functools
@@ -14,6 +16,7 @@ import website.search.search as search
 from website.search import elastic_search
 from website.search.util import build_query
 from website.search_migration.migrate import migrate
+from website.search_migration import reindex
 from website.models import Retraction, NodeLicense, Tag
 
 from tests.base import OsfTestCase
@@ -897,3 +900,128 @@ class TestSearchFiles(SearchTestCase):
         node.save()
         find = query_file('The Dock of the Bay.mp3')['results']
         assert_equal(len(find), 0)
+
+    def test_copied_folder_files_are_indexed(self):
+        folder = self.root.append_folder('Otis Blue')
+        folder.append_folder('Side A').append_file('Ole Man Trouble.mp3')
+        destination = self.root.append_folder('Copies')
+        folder.copy_under(destination)
+        find = query_file('Ole Man Trouble.mp3')['results']
+        assert_equal(len(find), 2)
+
+
+class TestBulkIndexing(SearchTestCase):
+
+    def setUp(self):
+        super(TestBulkIndexing, self).setUp()
+        self.user = UserFactory(fullname='Sam Cooke')
+
+    def test_writes_are_sent_when_block_exits(self):
+        with search.bulk_indexing() as indexer:
+            self.user.fullname = 'Jackie Wilson'
+            self.user.save()
+            assert_equal(len(indexer), 1)
+            assert_equal(len(query_user('Jackie Wilson')['results']), 0)
+        assert_equal(len(query_user('Jackie Wilson')['results']), 1)
+
+    def test_repeated_writes_to_a_document_are_coalesced(self):
+        with search.bulk_indexing() as indexer:
+            for name in ('Jackie Wilson', 'Solomon Burke'):
+                self.user.fullname = name
+                self.user.save()
+            assert_equal(len(indexer), 1)
+        assert_equal(len(query_user('Jackie Wilson')['results']), 0)
+        assert_equal(len(query_user('Solomon Burke')['results']), 1)
+
+    def test_writes_are_dropped_when_block_raises(self):
+        with assert_raises(ValueError):
+            with search.bulk_indexing():
+                self.user.fullname = 'Jackie Wilson'
+                self.user.save()
+                raise ValueError
+        assert_equal(len(query_user('Jackie Wilson')['results']), 0)
+        assert_is_none(elastic_search.get_bulk_indexer())
+
+    def test_nested_blocks_share_one_buffer(self):
+        with search.bulk_indexing() as outer:
+            with search.bulk_indexing() as inner:
+                assert_is(inner, outer)
+                self.user.fullname = 'Jackie Wilson'
+                self.user.save()
+            assert_equal(len(outer), 1)
+        assert_equal(len(query_user('Jackie Wilson')['results']), 1)
+
+
+class TestUpdateNodeFiles(SearchTestCase):
+
+    def setUp(self):
+        super(TestUpdateNodeFiles, self).setUp()
+        self.node = ProjectFactory(is_public=True, title='Otis Blue')
+        self.root = self.node.get_addon('osfstorage').get_root()
+        self.file_ = self.root.append_file('Respect.mp3')
+
+    @mock.patch('website.search.elastic_search.index_doc')
+    def test_unchanged_files_are_not_reindexed(self, mock_index_doc):
+        elastic_search.update_node_files(self.node)
+        assert_false(mock_index_doc.called)
+
+    @mock.patch('website.search.elastic_search.index_doc')
+    def test_files_reindexed_when_node_title_changes(self, mock_index_doc):
+        self.node.title = 'Otis Redding Sings Soul'
+        elastic_search.update_node_files(self.node)
+        assert_equal(mock_index_doc.call_count, 1)
+        assert_equal(mock_index_doc.call_args[0][2], self.file_._id)
+
+    def test_only_indexed_files_are_removed(self):
+        unindexed = self.root.append_file('Unindexed.mp3')
+        elastic_search.update_file(unindexed, delete=True)
+        self.node.is_public = False
+        with mock.patch('website.search.elastic_search.remove_doc') as mock_remove_doc:
+            elastic_search.update_node_files(self.node)
+        mock_remove_doc.assert_called_once_with(elastic_search.INDEX, 'file', self.file_._id)
+
+
+class TestReindex(SearchTestCase):
+
+    def setUp(self):
+        super(TestReindex, self).setUp()
+        self.es = search.search_engine.es
+        self.alias = '{}_reindex'.format(TEST_INDEX)
+
+    def tearDown(self):
+        super(TestReindex, self).tearDown()
+        self.es.indices.delete(index='{}*'.format(self.alias), ignore=[404])
+
+    def test_plan_chunks_cover_every_key_once(self):
+        users = [UserFactory() for _ in range(5)]
+        chunks = reindex.plan_chunks('user', chunk_size=2)
+        user_ids = sorted(user._id for user in users)
+        assert_equal(len(chunks), 3)
+        assert_equal(chunks[0][1], user_ids[0])
+        assert_equal(chunks[-1][2], user_ids[-1])
+
+    def test_checkpoint_resumes_pending_chunks(self):
+        path = os.path.join(tempfile.mkdtemp(), 'checkpoint.json')
+        checkpoint = reindex.Checkpoint(path, index='website_v2', chunks=[['node', 'a', 'b'], ['user', 'c', 'd']])
+        checkpoint.mark_done('node', 'a', 10)
+        loaded = reindex.Checkpoint.load(path)
+        assert_equal(loaded.index, 'website_v2')
+        assert_equal(loaded.pending, [['user', 'c', 'd']])
+        assert_equal(loaded.counts, {'node': 10})
+        loaded.delete()
+        assert_is_none(reindex.Checkpoint.load(path))
+
+    def test_reindex_chunk_indexes_node_range(self):
+        project = ProjectFactory(title='Kiss Me Baby', is_public=True)
+        index = reindex.create_versioned_index(self.alias)
+        kind, first, last, count, _ = reindex.reindex_chunk(('node', project._id, project._id, index))
+        assert_equal(count, 1)
+        assert_true(self.es.exists(index=index, doc_type='project', id=project._id))
+
+    def test_swap_alias_moves_alias_to_new_version(self):
+        first = reindex.create_versioned_index(self.alias)
+        assert_equal(reindex.swap_alias(self.alias, first), [])
+        second = reindex.create_versioned_index(self.alias)
+        assert_equal(second, '{}_v2'.format(self.alias))
+        assert_equal(reindex.swap_alias(self.alias, second), [first])
+        assert_equal(self.es.indices.get_alias(name=self.alias).keys(), [second])
@@ -19,6 +19,23 @@ def test_html_mail():
     rendered = mail.html(name='World')
     assert_equal(rendered.strip(), 'Hello <p>World</p>')
 
+
+@mock.patch('website.settings.USE_EMAIL', True)
+@mock.patch('website.settings.USE_CELERY', False)
+@mock.patch('website.settings.MAIL_BATCH_SIZE', 2)
+@mock.patch('framework.email.tasks.send_emails')
+def test_send_mail_batch(mock_send_emails):
+    mail = mails.Mail('test', subject='A test email to ${name}')
+    mails.send_mail_batch(
+        [('user{0}@example.com'.format(index), {'name': 'User {0}'.format(index)}) for index in range(3)],
+        mail,
+    )
+    assert_equal(mock_send_emails.call_count, 2)
+    messages = mock_send_emails.call_args_list[0][1]['messages']
+    assert_equal([each['to_addr'] for each in messages], ['user0@example.com', 'user1@example.com'])
+    assert_equal(messages[1]['subject'], 'A test email to User 1')
+    assert_equal(messages[1]['message'].strip(), 'Hello User 1')
+
 class TestQueuedMail(OsfTestCase):
     def setUp(self):
         OsfTestCase.setUp(self)
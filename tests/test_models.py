@@ -18,6 +18,7 @@ from modularodm.exceptions import ValidationError, ValidationValueError, Validat
 
 from framework.analytics import get_total_activity_count
 from framework.exceptions import PermissionsError
+from framework.mongo import database
 from framework.auth import User, Auth
 from framework.auth import cas
 from framework.sessions.model import Session
@@ -3041,7 +3042,7 @@ class TestProject(OsfTestCase):
         # Expected logs appears
         assert_equal(
             self.project.get_recent_logs(3),
-            list(reversed(self.project.logs)[:3])
+            list(reversed(self.project.logs))[:3]
         )
         assert_equal(
             self.project.get_recent_logs(),
@@ -3282,6 +3283,135 @@ class TestRoot(OsfTestCase):
                 assert_in(project.parent._id, parent_list)
 
 
+class TestAncestorIds(OsfTestCase):
+    def setUp(self):
+        super(TestAncestorIds, self).setUp()
+        self.user = UserFactory()
+        self.auth = Auth(user=self.user)
+        self.project = ProjectFactory(creator=self.user)
+        self.child = NodeFactory(parent=self.project, creator=self.user)
+        self.grandchild = NodeFactory(parent=self.child, creator=self.user)
+
+    def test_top_level_project_has_no_ancestors(self):
+        assert_equal(self.project.ancestor_ids, [])
+
+    def test_ancestor_ids_are_nearest_first(self):
+        assert_equal(self.child.ancestor_ids, [self.project._id])
+        assert_equal(self.grandchild.ancestor_ids, [self.child._id, self.project._id])
+
+    def test_parents_and_depth_use_ancestor_ids(self):
+        assert_equal([each._id for each in self.grandchild.parents], [self.child._id, self.project._id])
+        assert_equal(self.grandchild.depth, 2)
+
+    def test_fork_descendants_have_fork_ancestors(self):
+        fork = self.project.fork_node(auth=self.auth)
+        fork_child = fork.nodes[0]
+        fork_grandchild = fork_child.nodes[0]
+        assert_equal(fork_child.ancestor_ids, [fork._id])
+        assert_equal(fork_grandchild.ancestor_ids, [fork_child._id, fork._id])
+
+    def test_template_descendants_have_template_ancestors(self):
+        template = self.project.use_as_template(auth=self.auth)
+        template_child = template.nodes[0]
+        assert_equal(template_child.ancestor_ids, [template._id])
+        assert_equal(template_child.nodes[0].ancestor_ids, [template_child._id, template._id])
+
+    def test_registration_descendants_have_registration_ancestors(self):
+        registration = RegistrationFactory(project=self.project)
+        registration_child = registration.nodes[0]
+        assert_equal(registration_child.ancestor_ids, [registration._id])
+        assert_equal(registration_child.nodes[0].ancestor_ids, [registration_child._id, registration._id])
+
+    def test_has_permission_on_children_queries_descendants(self):
+        other = UserFactory()
+        assert_false(self.project.has_permission_on_children(other, 'read'))
+        self.grandchild.add_contributor(other, permissions=['read'], auth=self.auth, save=True)
+        assert_true(self.project.has_permission_on_children(other, 'read'))
+
+    def test_has_permission_on_children_skips_deleted_subtrees(self):
+        other = UserFactory()
+        self.grandchild.add_contributor(other, permissions=['read'], auth=self.auth, save=True)
+        self.child.is_deleted = True
+        self.child.save()
+        assert_false(self.project.has_permission_on_children(other, 'read'))
+
+    def test_has_permission_on_children_not_backfilled(self):
+        other = UserFactory()
+        self.grandchild.add_contributor(other, permissions=['read'], auth=self.auth, save=True)
+        # Nodes saved before the field existed have no ancestors stored
+        database['node'].update(
+            {'_id': {'$in': [self.child._id, self.grandchild._id]}},
+            {'$unset': {'ancestor_ids': True}},
+            multi=True,
+        )
+        Node._clear_caches()
+        project = Node.load(self.project._id)
+        assert_true(project.has_permission_on_children(other, 'read'))
+        assert_false(project.has_permission_on_children(UserFactory(), 'read'))
+
+    def test_is_admin_parent_grandparent_admin(self):
+        assert_true(self.grandchild.is_admin_parent(self.user))
+        assert_false(self.grandchild.is_admin_parent(UserFactory()))
+
+
+class TestInheritedAdminIds(OsfTestCase):
+    def setUp(self):
+        super(TestInheritedAdminIds, self).setUp()
+        self.user = UserFactory()
+        self.auth = Auth(user=self.user)
+        self.project = ProjectFactory(creator=self.user)
+        self.child_admin = UserFactory()
+        self.child = NodeFactory(parent=self.project, creator=self.child_admin)
+        self.grandchild = NodeFactory(parent=self.child, creator=UserFactory())
+
+    def test_top_level_project_inherits_no_admins(self):
+        assert_equal(self.project.inherited_admin_ids, [])
+
+    def test_admins_of_all_ancestors_are_inherited(self):
+        assert_equal(self.child.inherited_admin_ids, [self.user._id])
+        assert_equal(
+            self.grandchild.inherited_admin_ids,
+            sorted([self.user._id, self.child_admin._id])
+        )
+
+    def test_new_ancestor_admin_propagates_to_descendants(self):
+        other = UserFactory()
+        self.project.add_contributor(other, permissions=['read', 'write', 'admin'], auth=self.auth, save=True)
+        self.grandchild.reload()
+        assert_in(other._id, self.grandchild.inherited_admin_ids)
+        assert_true(self.grandchild.is_admin_parent(other))
+
+    def test_removed_ancestor_admin_is_revoked_from_descendants(self):
+        other = UserFactory()
+        self.project.add_contributor(other, permissions=['read', 'write', 'admin'], auth=self.auth, save=True)
+        self.project.set_permissions(other, ['read', 'write'], save=True)
+        self.grandchild.reload()
+        assert_not_in(other._id, self.grandchild.inherited_admin_ids)
+        assert_false(self.grandchild.is_admin_parent(other))
+
+    def test_admin_contributor_ids_excludes_contributors(self):
+        self.grandchild.add_contributor(self.user, auth=Auth(self.grandchild.creator), save=True)
+        assert_equal(self.grandchild.admin_contributor_ids, {self.child_admin._id})
+
+    def test_not_backfilled_nodes_walk_parent_chain(self):
+        # Nodes saved before the field existed have no inherited admins stored
+        database['node'].update(
+            {'_id': {'$in': [self.child._id, self.grandchild._id]}},
+            {'$unset': {'inherited_admin_ids': True}},
+            multi=True,
+        )
+        Node._clear_caches()
+        child = Node.load(self.child._id)
+        grandchild = Node.load(self.grandchild._id)
+        assert_true(grandchild.is_admin_parent(self.user))
+        assert_equal(grandchild.admin_contributor_ids, {self.user._id, self.child_admin._id})
+
+        # Saving before the backfill still stores the full set of inherited admins
+        grandchild.save()
+        assert_equal(grandchild.inherited_admin_ids, sorted([self.user._id, self.child_admin._id]))
+        assert_equal(child.get_inherited_admin_ids(), [self.user._id])
+
+
 class TestTemplateNode(OsfTestCase):
 
     def setUp(self):
@@ -3978,6 +4108,122 @@ class TestNodeLog(OsfTestCase):
         assert_false(created_log.can_view(unrelated, Auth(user=project.creator)))
 
 
+class TestNodeLogStream(OsfTestCase):
+
+    def setUp(self):
+        super(TestNodeLogStream, self).setUp()
+        self.user = UserFactory()
+        self.auth = Auth(self.user)
+        self.project = ProjectFactory(creator=self.user)
+        for tag in ('one', 'two', 'three'):
+            self.project.add_log(NodeLog.TAG_ADDED, {'node': self.project._id, 'tag': tag}, auth=self.auth)
+
+    def test_add_log_does_not_store_logs_on_node(self):
+        assert_not_in('logs', self.project.to_storage())
+        assert_equal(self.project.logs[-1].node_id, self.project._id)
+
+    def test_indexing_and_slicing(self):
+        log_ids = self.project.logs._to_primary_keys()
+        assert_equal(len(self.project.logs), 4)
+        assert_equal(self.project.logs[0]._id, log_ids[0])
+        assert_equal(self.project.logs[-1].params['tag'], 'three')
+        assert_equal([log._id for log in self.project.logs[1:3]], log_ids[1:3])
+        assert_equal([log._id for log in self.project.logs[:-1]], log_ids[:-1])
+        with assert_raises(IndexError):
+            self.project.logs[4]
+
+    def test_recent_logs_are_newest_first(self):
+        recent = self.project.get_recent_logs(2)
+        assert_equal([log.params['tag'] for log in recent], ['three', 'two'])
+
+    def test_find_within_stream(self):
+        other = ProjectFactory(creator=self.user)
+        other.add_log(NodeLog.TAG_ADDED, {'node': other._id, 'tag': 'one'}, auth=self.auth)
+        assert_equal(self.project.logs.find(Q('action', 'eq', NodeLog.TAG_ADDED)).count(), 3)
+
+    def test_fork_references_source_logs(self):
+        fork = self.project.fork_node(self.auth)
+        self.project.add_log(NodeLog.TAG_REMOVED, {'node': self.project._id, 'tag': 'one'}, auth=self.auth)
+        source_logs = self.project.logs._to_primary_keys()
+
+        assert_equal(fork.log_lineage[0]['node'], self.project._id)
+        assert_equal(fork.logs._to_primary_keys()[:-1], source_logs[:-1])
+        assert_equal(fork.logs[-1].action, NodeLog.NODE_FORKED)
+        assert_not_in(self.project.logs[-1], fork.logs)
+
+    def test_fork_of_fork_inherits_lineage(self):
+        fork = self.project.fork_node(self.auth)
+        fork_of_fork = fork.fork_node(self.auth)
+        assert_equal([each['node'] for each in fork_of_fork.log_lineage], [fork._id, self.project._id])
+        assert_equal(fork_of_fork.logs._to_primary_keys()[:-1], fork.logs._to_primary_keys())
+
+    def test_logged_nodes(self):
+        log = self.project.logs[-1]
+        fork = self.project.fork_node(self.auth)
+        assert_equal(sorted(node._id for node in log.logged_nodes), sorted([self.project._id, fork._id]))
+        assert_equal(fork.logs[-1].logged_nodes, [fork])
+
+
+class TestAggregateLogs(OsfTestCase):
+
+    def setUp(self):
+        super(TestAggregateLogs, self).setUp()
+        self.user = UserFactory()
+        self.auth = Auth(self.user)
+        self.project = ProjectFactory(creator=self.user, is_public=True)
+        self.component = NodeFactory(parent=self.project, creator=self.user, is_public=False)
+        self.component.add_log(NodeLog.TAG_ADDED, {'node': self.component._id}, auth=self.auth)
+
+    def get_actions(self, auth, node=None, before=None):
+        node = node or self.project
+        return [
+            (log.node_id, log.action)
+            for log in node.get_aggregate_logs_queryset(auth, before=before)
+        ]
+
+    def test_logs_are_indexed_under_ancestors(self):
+        log = self.component.logs[-1]
+        assert_equal(log.tree_ids, [self.component._id, self.project._id])
+        assert_equal(log.visibility, NodeLog.VISIBILITY_PRIVATE)
+
+    def test_private_component_logs_only_shown_to_viewers(self):
+        assert_in((self.component._id, NodeLog.TAG_ADDED), self.get_actions(self.auth))
+        assert_not_in((self.component._id, NodeLog.TAG_ADDED), self.get_actions(Auth(UserFactory())))
+        assert_not_in((self.component._id, NodeLog.TAG_ADDED), self.get_actions(None))
+
+    def test_private_link_shows_component_logs(self):
+        link = PrivateLinkFactory()
+        link.nodes.append(self.component)
+        link.save()
+        auth = Auth(private_key=link.key)
+        assert_in((self.component._id, NodeLog.TAG_ADDED), self.get_actions(auth))
+
+    def test_inherited_admin_sees_component_logs(self):
+        admin = UserFactory()
+        self.project.add_contributor(admin, permissions=['read', 'write', 'admin'], auth=self.auth, save=True)
+        component = NodeFactory(parent=self.project, creator=self.user, is_public=False)
+        component.add_log(NodeLog.TAG_REMOVED, {'node': component._id}, auth=self.auth)
+        assert_in((component._id, NodeLog.TAG_REMOVED), self.get_actions(Auth(admin)))
+
+    def test_making_component_public_retags_its_logs(self):
+        self.component.set_privacy('public', auth=self.auth)
+        assert_in((self.component._id, NodeLog.TAG_ADDED), self.get_actions(Auth(UserFactory())))
+
+    def test_moving_component_reindexes_its_logs(self):
+        other = ProjectFactory(creator=self.user)
+        self.project.nodes.remove(self.component)
+        self.project.save()
+        other.nodes.append(self.component)
+        other.save()
+        assert_not_in((self.component._id, NodeLog.TAG_ADDED), self.get_actions(self.auth))
+        assert_in((self.component._id, NodeLog.TAG_ADDED), self.get_actions(self.auth, node=other))
+
+    def test_seek_past_cursor(self):
+        logs = list(self.project.get_aggregate_logs_queryset(self.auth))
+        after = list(self.project.get_aggregate_logs_queryset(self.auth, before=logs[0]._id))
+        assert_equal(after, logs[1:])
+
+
 class TestPermissions(OsfTestCase):
 
     def setUp(self):
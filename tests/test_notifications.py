@@ -13,7 +13,9 @@ from framework.auth import Auth
 from framework.auth.core import User
 from framework.auth.signals import contributor_removed
 from framework.auth.signals import node_deleted
-from website.notifications.tasks import get_users_emails, send_users_email, group_by_node, remove_notifications
+from website.notifications.tasks import (
+    get_users_emails, iter_users_emails, send_users_email, group_by_node, remove_notifications, notify_users
+)
 from website.notifications import constants
 from website.notifications.model import NotificationDigest
 from website.notifications.model import NotificationSubscription
@@ -1117,6 +1119,47 @@ class TestSendEmails(OsfTestCase):
         node_lineage = emails.get_node_lineage(self.node)
         assert_equal(node_lineage, [self.project._id, self.node._id])
 
+    @mock.patch('website.mails.render_message')
+    def test_store_emails_renders_once_per_timezone(self, mock_render):
+        mock_render.side_effect = lambda tpl, **context: context['localized_timestamp']
+        recipients = [factories.UserFactory() for _ in range(3)]
+        for recipient, timezone in zip(recipients, ['Europe/Moscow', 'Europe/Moscow', 'America/New_York']):
+            recipient.timezone = timezone
+            recipient.locale = 'en_US'
+            recipient.save()
+        time_now = datetime.datetime.utcnow().replace(tzinfo=pytz.utc)
+        emails.store_emails([each._id for each in recipients] + [self.user._id], 'email_digest', 'comments',
+                            self.user, self.node, time_now)
+        assert_equal(mock_render.call_count, 2)
+        digests = list(NotificationDigest.find(Q('event', 'eq', 'comments')))
+        assert_equal(sorted(d.user_id for d in digests), sorted(each._id for each in recipients))
+        for digest in digests:
+            assert_equal(digest.node_lineage, [self.project._id, self.node._id])
+            assert_equal(digest.message, emails.localize_timestamp(time_now, User.load(digest.user_id)))
+
+    @mock.patch('website.notifications.model.NotificationSubscription.load')
+    def test_compile_subscriptions_loads_lineage_at_once(self, mock_load):
+        subs = emails.compile_subscriptions(self.node, 'comments', 'comments')
+        assert_false(mock_load.called)
+        assert_equal(subs, {'email_transactional': [self.project.creator._id], 'email_digest': [], 'none': []})
+
+    @mock.patch('website.notifications.emails.notify')
+    @mock.patch('website.notifications.tasks.notify_users.delay')
+    def test_queue_notify_in_background(self, mock_delay, mock_notify):
+        time_now = datetime.datetime.utcnow()
+        with mock.patch('website.settings.NOTIFY_IN_BACKGROUND', True):
+            with mock.patch('website.settings.USE_CELERY', True):
+                emails.queue_notify('comments', self.user, self.node, time_now, target_user=self.project.creator)
+        assert_false(mock_notify.called)
+        mock_delay.assert_called_with('comments', self.user._id, self.node._id, time_now,
+                                      target_user=self.project.creator._id)
+
+    @mock.patch('website.notifications.emails.notify')
+    def test_notify_users_task(self, mock_notify):
+        time_now = datetime.datetime.utcnow()
+        notify_users('comments', self.user._id, self.node._id, time_now, target_user=self.project.creator._id)
+        mock_notify.assert_called_with('comments', self.user, self.node, time_now, target_user=self.project.creator)
+
     def test_localize_timestamp(self):
         timestamp = datetime.datetime.utcnow().replace(tzinfo=pytz.utc)
         self.user.timezone = 'America/New_York'
@@ -1220,6 +1263,7 @@ class TestSendDigest(OsfTestCase):
             }
         ]
 
+        expected.sort(key=lambda group: group['user_id'])
         assert_equal(len(user_groups), 2)
         assert_equal(user_groups, expected)
         digest_ids = [d._id, d2._id, d3._id]
@@ -1271,6 +1315,7 @@ class TestSendDigest(OsfTestCase):
             }
         ]
 
+        expected.sort(key=lambda group: group['user_id'])
         assert_equal(len(user_groups), 2)
         assert_equal(user_groups, expected)
         digest_ids = [d._id, d2._id, d3._id]
@@ -1304,7 +1349,86 @@ class TestSendDigest(OsfTestCase):
         assert_equal(kwargs['name'], user.fullname)
         message = group_by_node(user_groups[last_user_index]['info'])
         assert_equal(kwargs['message'], message)
-        assert_equal(kwargs['callback'], remove_notifications(email_notification_ids=email_notification_ids))
+        assert_equal(get_users_emails(send_type), [])
+
+    def test_get_users_emails_in_chunks(self):
+        send_type = 'email_transactional'
+        for user in (self.user_1, self.user_2, self.user_2):
+            factories.NotificationDigestFactory(
+                user_id=user._id,
+                send_type=send_type,
+                timestamp=self.timestamp,
+                message='Hello',
+                node_lineage=[self.project._id]
+            ).save()
+        chunks = list(iter_users_emails(send_type, chunk_size=1))
+        assert_equal(len(chunks), 2)
+        assert_equal(
+            sorted((chunk[0]['user_id'], len(chunk[0]['info'])) for chunk in chunks),
+            sorted([(self.user_1._id, 1), (self.user_2._id, 2)])
+        )
+
+    @mock.patch('website.mails.send_mail')
+    def test_send_users_email_in_chunks(self, mock_send_mail):
+        send_type = 'email_digest'
+        digest_ids = []
+        for user in (self.user_1, self.user_2, self.user_2):
+            d = factories.NotificationDigestFactory(
+                user_id=user._id,
+                send_type=send_type,
+                timestamp=self.timestamp,
+                message='Hello',
+                node_lineage=[self.project._id]
+            )
+            d.save()
+            digest_ids.append(d._id)
+        with mock.patch('website.settings.DIGEST_CHUNK_SIZE', 1):
+            send_users_email(send_type)
+        assert_equal(mock_send_mail.call_count, 2)
+        assert_equal(
+            sorted(call[1]['to_addr'] for call in mock_send_mail.call_args_list),
+            sorted([self.user_1.username, self.user_2.username])
+        )
+        assert_equal(NotificationDigest.find(Q('_id', 'in', digest_ids)).count(), 0)
+
+    @mock.patch('website.mails.send_mail_batch')
+    @mock.patch('website.mails.send_mail')
+    def test_send_users_email_in_batches_with_mail_pool(self, mock_send_mail, mock_send_mail_batch):
+        send_type = 'email_digest'
+        for user in (self.user_1, self.user_2):
+            factories.NotificationDigestFactory(
+                user_id=user._id,
+                send_type=send_type,
+                timestamp=self.timestamp,
+                message='Hello',
+                node_lineage=[self.project._id]
+            ).save()
+        with mock.patch('website.settings.USE_MAIL_POOL', True):
+            send_users_email(send_type)
+        assert_false(mock_send_mail.called)
+        assert_equal(mock_send_mail_batch.call_count, 1)
+        args, kwargs = mock_send_mail_batch.call_args
+        assert_equal(kwargs['mail'], mails.DIGEST)
+        assert_equal(
+            sorted(to_addr for to_addr, _ in args[0]),
+            sorted([self.user_1.username, self.user_2.username])
+        )
+
+    def test_remove_sent_digest_notifications_in_bulk(self):
+        digests = [
+            factories.NotificationDigestFactory(
+                user_id=self.user_1._id,
+                timestamp=self.timestamp,
+                message='Hello',
+                node_lineage=[self.project._id]
+            )
+            for _ in range(3)
+        ]
+        remove_notifications(email_notification_ids=[d._id for d in digests[:2]])
+        assert_equal(
+            [d._id for d in NotificationDigest.find(Q('_id', 'in', [d._id for d in digests]))],
+            [digests[2]._id]
+        )
 
     def test_remove_sent_digest_notifications(self):
         d = factories.NotificationDigestFactory(
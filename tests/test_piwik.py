@@ -1,5 +1,13 @@
+import json
+
+import mock
+import requests
 from nose.tools import *
 
+from framework.mongo import database
+from framework.analytics import tasks
+from framework.analytics.coalesce import PENDING_COLLECTION
+
 from tests.base import OsfTestCase
 from tests.factories import ProjectFactory, UserFactory
 from tests.test_features import requires_piwik
@@ -22,3 +30,103 @@ class TestCreateProject(OsfTestCase):
 
     def test_has_piwik_site_id(self):
         assert_true(self.project.piwik_site_id)
+
+
+def piwik_response(results):
+    return mock.Mock(content=json.dumps(results))
+
+
+class TestCoalescedUpdates(OsfTestCase):
+
+    def setUp(self):
+        super(TestCoalescedUpdates, self).setUp()
+        database[PENDING_COLLECTION].remove()
+        self.node = ProjectFactory(piwik_site_id='1')
+        self.other_node = ProjectFactory(piwik_site_id='2')
+        self.enqueue_patcher = mock.patch('framework.analytics.tasks.enqueue_task')
+        self.mock_enqueue = self.enqueue_patcher.start()
+
+    def tearDown(self):
+        super(TestCoalescedUpdates, self).tearDown()
+        self.enqueue_patcher.stop()
+
+    def test_node_updates_are_merged(self):
+        tasks.queue_node_update(self.node._id, ['title'])
+        tasks.queue_node_update(self.node._id, ['contributors'])
+        tasks.queue_node_update(self.node._id, ['is_public', 'title'])
+        assert_equal(self.mock_enqueue.call_count, 1)
+        pending = database[PENDING_COLLECTION].find_one()
+        assert_equal(pending['requests'], 3)
+        assert_equal(sorted(pending['fields']), ['contributors', 'is_public', 'title'])
+
+    @mock.patch('framework.analytics.tasks.update_node')
+    def test_no_window_sends_each_update(self, mock_update_node):
+        with mock.patch('website.settings.PIWIK_UPDATE_WINDOW', 0):
+            tasks.queue_node_update(self.node._id, ['title'])
+        mock_update_node.assert_called_once_with(self.node._id, ['title'])
+        assert_equal(database[PENDING_COLLECTION].count(), 0)
+
+    @mock.patch('framework.analytics.piwik.requests.post')
+    def test_flush_batches_api_calls(self, mock_post):
+        tasks.queue_node_update(self.node._id, ['contributors'])
+        tasks.queue_node_update(self.node._id, ['title'])
+        tasks.queue_node_update(self.other_node._id, None)
+        mock_post.side_effect = [
+            piwik_response([[{'login': 'osf.removed'}, {'login': 'anonymous'}], []]),
+            piwik_response([{'result': 'success'}] * 4),
+        ]
+        metrics = tasks.flush_updates()
+
+        assert_equal(mock_post.call_count, 2)
+        changes = mock_post.call_args[1]['data']
+        assert_equal(len([key for key in changes if key.startswith('urls[')]), 4)
+        assert_equal(metrics['updates'], 3)
+        assert_equal(metrics['merged'], 1)
+        assert_equal(metrics['nodes'], 2)
+        assert_equal(metrics['api_calls'], 2)
+        # 2 reads, 2 changes for the first node, 1 change and 1 visibility change for the other
+        assert_equal(metrics['calls_saved'], 4)
+        assert_equal(database[PENDING_COLLECTION].count(), 0)
+
+    @mock.patch('framework.analytics.piwik.requests.post')
+    def test_flush_creates_users_in_one_request(self, mock_post):
+        users = [UserFactory(), UserFactory()]
+        for user in users:
+            tasks.queue_user_update(user._id)
+        mock_post.return_value = piwik_response([{'result': 'success'}] * 2)
+        metrics = tasks.flush_updates()
+        assert_equal(mock_post.call_count, 1)
+        assert_equal(metrics['users'], 2)
+        for user in users:
+            user.reload()
+            assert_true(user.piwik_token)
+
+    @mock.patch('framework.analytics.piwik.requests.post')
+    def test_failed_flush_restores_updates(self, mock_post):
+        tasks.queue_node_update(self.node._id, ['contributors'])
+        mock_post.side_effect = requests.exceptions.ConnectionError()
+        assert_raises(Exception, tasks.flush_updates)
+        pending = database[PENDING_COLLECTION].find_one()
+        assert_equal(pending['object_id'], self.node._id)
+        assert_equal(pending['fields'], ['contributors'])
+
+    @mock.patch('framework.analytics.piwik.requests.post')
+    def test_failed_node_does_not_undo_others(self, mock_post):
+        new_node = ProjectFactory()
+        tasks.queue_node_update(new_node._id, None)
+        tasks.queue_node_update(self.node._id, ['contributors'])
+        mock_post.side_effect = [
+            # Site created for the new node, and its contributor given access
+            piwik_response({'value': '3'}),
+            piwik_response([{'result': 'success'}]),
+            # Reading the access of the other node fails
+            piwik_response([{'result': 'error', 'message': 'Unknown site'}]),
+        ]
+        assert_raises(Exception, tasks.flush_updates)
+
+        new_node.reload()
+        assert_equal(new_node.piwik_site_id, '3')
+        pending = list(database[PENDING_COLLECTION].find())
+        assert_equal(len(pending), 1)
+        assert_equal(pending[0]['object_id'], self.node._id)
+        assert_equal(pending[0]['fields'], ['contributors'])
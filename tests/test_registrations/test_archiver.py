@@ -1,4 +1,5 @@
 #-*- coding: utf-8 -*-
+import sys
 import datetime
 import functools
 import json
@@ -835,6 +836,52 @@ class TestArchiverUtils(ArchiverTestCase):
         for patch in patches.values():
             patch.stop()
 
+    def test_aggregate_file_tree_metadata_deep_tree(self):
+        # Deeper than the recursion limit
+        file_tree = folder = {'path': '/', 'name': '', 'kind': 'folder', 'children': []}
+        total_size = 0
+        for depth in range(sys.getrecursionlimit() + 10):
+            child = {'path': '/{}/'.format(depth), 'name': str(depth), 'kind': 'folder', 'children': []}
+            folder['children'] = [file_factory(), child]
+            total_size += folder['children'][0]['size']
+            folder = child
+        result = archiver_utils.aggregate_file_tree_metadata('osfstorage', file_tree, self.user)
+        assert_equal(result.num_files, sys.getrecursionlimit() + 10)
+        assert_equal(result.disk_usage, total_size)
+        assert_equal(result.targets[1].num_files, result.num_files - 1)
+
+    def test_iter_file_tree(self):
+        file_tree = file_tree_factory(3, 3, 3)
+        files = list(archiver_utils.iter_file_tree(file_tree))
+        assert_equal(len(files), 9)
+        assert_true(all(f['kind'] == 'file' for f in files))
+        # Breadth first: files at the top of the tree come out first
+        assert_equal(files[:3], file_tree['children'][:3])
+
+    def test_get_file_map_cache_is_bounded(self):
+        archiver_utils.file_map_cache.clear()
+        nodes = [factories.NodeFactory() for _ in range(3)]
+        mocked = mock.Mock(side_effect=lambda **kwargs: file_tree_factory(1, 1, 1))
+        with mock.patch.object(StorageAddonBase, '_get_file_tree', mocked):
+            with mock.patch.object(archiver_utils.file_map_cache, 'size', 2):
+                for node in nodes:
+                    list(archiver_utils.get_file_map(node))
+                assert_equal(len(archiver_utils.file_map_cache.entries), 2)
+                # The least recently used map was evicted and is fetched again
+                list(archiver_utils.get_file_map(nodes[0]))
+        assert_equal(mocked.call_count, 4)
+
+    def test_get_file_map_cache_is_keyed_by_job(self):
+        archiver_utils.file_map_cache.clear()
+        node = factories.NodeFactory()
+        mocked = mock.Mock(side_effect=lambda **kwargs: file_tree_factory(1, 1, 1))
+        with mock.patch.object(StorageAddonBase, '_get_file_tree', mocked):
+            list(archiver_utils.get_file_map(node))
+            job = ArchiveJob(src_node=node, dst_node=node, initiator=self.user)
+            job.save()
+            list(archiver_utils.get_file_map(node))
+        assert_equal(mocked.call_count, 2)
+
 
 class TestArchiverListeners(ArchiverTestCase):
 
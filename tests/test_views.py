@@ -666,9 +666,8 @@ class TestProjectViews(OsfTestCase):
         self.project.reload()
         data = res.json
         assert_equal(len(data['logs']), len(self.project.logs))
-        assert_equal(data['total'], len(self.project.logs))
         assert_equal(data['page'], 0)
-        assert_equal(data['pages'], 1)
+        assert_is_none(data['next'])
         most_recent = data['logs'][0]
         assert_equal(most_recent['action'], 'file_added')
 
@@ -723,10 +722,8 @@ class TestProjectViews(OsfTestCase):
         url = self.project.api_url_for('get_logs')
         res = self.app.get(url, {'count': 3}, auth=self.auth)
         assert_equal(len(res.json['logs']), 3)
-        # 1 project create log, 1 add contributor log, then 5 generated logs
-        assert_equal(res.json['total'], 5 + 2)
         assert_equal(res.json['page'], 0)
-        assert_equal(res.json['pages'], 3)
+        assert_equal(res.json['next'], res.json['logs'][-1]['id'])
 
     def test_get_logs_defaults_to_ten(self):
         # Add some logs
@@ -742,10 +739,8 @@ class TestProjectViews(OsfTestCase):
         url = self.project.api_url_for('get_logs')
         res = self.app.get(url, auth=self.auth)
         assert_equal(len(res.json['logs']), 10)
-        # 1 project create log, 1 add contributor log, then 5 generated logs
-        assert_equal(res.json['total'], 12 + 2)
         assert_equal(res.json['page'], 0)
-        assert_equal(res.json['pages'], 2)
+        assert_is_not_none(res.json['next'])
 
     def test_get_more_logs(self):
         # Add some logs
@@ -762,9 +757,24 @@ class TestProjectViews(OsfTestCase):
         res = self.app.get(url, {"page": 1}, auth=self.auth)
         assert_equal(len(res.json['logs']), 4)
         #1 project create log, 1 add contributor log, then 12 generated logs
-        assert_equal(res.json['total'], 12 + 2)
         assert_equal(res.json['page'], 1)
-        assert_equal(res.json['pages'], 2)
+        assert_is_none(res.json['next'])
+
+    def test_get_more_logs_with_cursor(self):
+        for _ in range(12):
+            self.project.add_log(
+                auth=self.consolidate_auth1,
+                action='file_added',
+                params={'node': self.project._id}
+            )
+        url = self.project.api_url_for('get_logs')
+        first = self.app.get(url, auth=self.auth).json
+        second = self.app.get(url, {'page': 1, 'before': first['next']}, auth=self.auth).json
+        # 1 project create log, 1 add contributor log, then 12 generated logs
+        assert_equal(len(second['logs']), 4)
+        assert_is_none(second['next'])
+        ids = [log['id'] for log in first['logs'] + second['logs']]
+        assert_equal(ids, list(reversed(self.project.logs._to_primary_keys())))
 
     def test_logs_private(self):
         """Add logs to a public project, then to its private component. Get
@@ -792,10 +802,8 @@ class TestProjectViews(OsfTestCase):
         url = self.project.api_url_for('get_logs')
         res = self.app.get(url).maybe_follow()
         assert_equal(len(res.json['logs']), 10)
-        # 1 project create log, 1 add contributor log, then 15 generated logs
-        assert_equal(res.json['total'], 15 + 2)
         assert_equal(res.json['page'], 0)
-        assert_equal(res.json['pages'], 2)
+        assert_is_not_none(res.json['next'])
         assert_equal(
             [self.project._id] * 10,
             [
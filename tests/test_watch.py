@@ -7,11 +7,13 @@ import datetime as dt
 
 from pytz import utc
 from nose.tools import *  # flake8: noqa (PEP8 asserts)
+from modularodm import Q
 from framework.auth import Auth
 from framework.exceptions import HTTPError
 from tests.base import OsfTestCase
 from tests.factories import (UserFactory, ProjectFactory,
                              WatchConfigFactory)
+from website.project.model import NodeLog
 from website.views import paginate
 import math
 
@@ -24,8 +26,7 @@ class TestWatching(OsfTestCase):
         # add some log objects
         self.consolidate_auth = Auth(user=self.user)
         # Clear project logs
-        self.project.logs = []
-        self.project.save()
+        NodeLog.remove(Q('node_id', 'eq', self.project._id))
         # A log added 100 days ago
         self.project.add_log(
             'project_created',
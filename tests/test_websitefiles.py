@@ -560,6 +560,46 @@ class TestFolderObj(FilesTestCase):
         assert_equal(trashed_parent, guid.referent)
         assert_equal(child_guid.referent, models.TrashedFileNode.load(child._id))
 
+    def test_delete_nested_tree_in_batches(self):
+        folder = self.parent.append_folder('folder')
+        files = [folder.append_file('file{}'.format(number)) for number in range(5)]
+        guid = files[0].get_guid(create=True)
+        progress = mock.Mock()
+
+        with mock.patch.object(utils, 'TREE_BATCH_SIZE', 2):
+            trashed_parent = self.parent.delete(user=self.user, progress=progress)
+
+        assert_equal(models.StoredFileNode.find().count(), 0)
+        assert_equal(models.TrashedFileNode.load(folder._id).parent, trashed_parent)
+        trashed_file = models.TrashedFileNode.load(files[0]._id)
+        assert_equal(trashed_file.parent, models.TrashedFileNode.load(folder._id))
+        assert_equal(trashed_file.deleted_by, self.user)
+        guid.reload()
+        assert_equal(guid.referent, trashed_file)
+        assert_equal(progress.call_args[0][0], 6)
+
+    def test_copy_under_copies_nested_tree(self):
+        folder = self.parent.append_folder('folder')
+        folder.append_file('file')
+        destination = models.StoredFileNode(
+            path='adestination',
+            name='destination',
+            is_file=False,
+            node=self.node,
+            provider='test',
+            materialized_path='/destination',
+        ).wrapped()
+        destination.save()
+
+        cloned = self.parent.copy_under(destination)
+
+        (cloned_folder, ) = list(cloned.children)
+        assert_not_equal(cloned_folder._id, folder._id)
+        assert_equal(cloned_folder.name, 'folder')
+        (cloned_file, ) = list(cloned_folder.children)
+        assert_equal(cloned_file.name, 'file')
+        assert_equal(len(list(folder.children)), 1)
+
     def test_append_file(self):
         self.parent.append_file('Name')
         (child, ) = list(self.parent.children)
@@ -570,9 +610,84 @@ class TestFolderObj(FilesTestCase):
     def test_find_child_by_name(self):
         pass
 
+    def test_serialize_children_caches_listing(self):
+        child = self.parent.append_file('Name')
+        assert_equal([entry['id'] for entry in self.parent.serialize_children()], [child._id])
+        assert_equal(utils.get_cached_listing(self.parent._id)[0]['name'], 'Name')
+
+        with mock.patch('website.files.utils.prefetch_versions') as mock_prefetch:
+            self.parent.serialize_children()
+        assert_false(mock_prefetch.called)
+
+    def test_serialize_children_reads_download_counts_fresh(self):
+        child = self.parent.append_file('Name')
+        assert_equal(self.parent.serialize_children()[0]['downloads'], 0)
+        self.db['pagecounters'].insert({'_id': 'download:{}:{}'.format(self.node._id, child._id), 'total': 3})
+        assert_equal(self.parent.serialize_children()[0]['downloads'], 3)
+
+    def test_saving_child_invalidates_listing(self):
+        child = self.parent.append_file('Name')
+        self.parent.serialize_children()
+        child.name = 'Renamed'
+        child.save()
+        assert_is_none(utils.get_cached_listing(self.parent._id))
+        assert_equal(self.parent.serialize_children()[0]['name'], 'Renamed')
+
+    def test_move_under_invalidates_both_listings(self):
+        child = self.parent.append_file('Name')
+        destination = self.parent.append_folder('Destination')
+        self.parent.serialize_children()
+        destination.serialize_children()
+        child.move_under(destination)
+        assert_is_none(utils.get_cached_listing(self.parent._id))
+        assert_is_none(utils.get_cached_listing(destination._id))
+        assert_equal([entry['id'] for entry in destination.serialize_children()], [child._id])
+
+    def test_version_metadata_update_invalidates_listing(self):
+        child = self.parent.append_file('Name')
+        version = models.FileVersion(identifier='1', size=10)
+        version.save()
+        child.versions.append(version)
+        child.save()
+        assert_equal(self.parent.serialize_children()[0]['size'], 10)
+        version.update_metadata({'size': 1234})
+        assert_is_none(utils.get_cached_listing(self.parent._id))
+        assert_equal(self.parent.serialize_children()[0]['size'], 1234)
+
+    def test_delete_child_invalidates_listing(self):
+        child = self.parent.append_file('Name')
+        self.parent.serialize_children()
+        child.delete()
+        assert_equal(self.parent.serialize_children(), [])
+
 
 class TestUtils(FilesTestCase):
 
+    def test_walk_subtree_yields_levels_in_batches(self):
+        root = TestFolder(name='root', node=self.node, path='aroot', materialized_path='/root/')
+        root.save()
+        folder = root.append_folder('folder')
+        for number in range(3):
+            folder.append_file('file{}'.format(number))
+
+        batches = list(utils.walk_subtree(root._id, batch_size=2))
+
+        assert_equal([len(batch) for batch in batches], [1, 2, 1])
+        assert_equal(batches[0][0]['_id'], folder._id)
+
+    def test_prefetch_versions_loads_first_and_latest(self):
+        file_ = TestFile(name='file', node=self.node, path='afile', materialized_path='/afile')
+        versions = [models.FileVersion(identifier=str(number)) for number in range(3)]
+        for version in versions:
+            version.save()
+        file_.versions.extend(versions)
+        file_.save()
+        models.FileVersion._clear_caches()
+
+        with mock.patch.object(models.FileVersion, 'load_many') as mock_load_many:
+            utils.prefetch_versions([file_])
+        mock_load_many.assert_called_once_with([versions[0]._id, versions[-1]._id])
+
     def test_genwrapper_repr(self):
         wrapped = models.FileNode.find()
         assert_true(isinstance(wrapped, utils.GenWrapper))
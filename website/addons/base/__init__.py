@@ -6,9 +6,9 @@ import mimetypes
 from bson import ObjectId
 from modularodm import fields
 from mako.lookup import TemplateLookup
-from time import sleep
 
 import requests
+from flask import request, has_request_context
 from modularodm import Q
 
 from framework.auth.decorators import must_be_logged_in
@@ -21,7 +21,7 @@ from framework.exceptions import (
 from framework.auth import Auth
 
 from website import settings
-from website.addons.base import serializer, logger
+from website.addons.base import serializer, logger, crawler
 from website.project.model import Node
 from website.util import waterbutler_url_for
 
@@ -736,32 +736,39 @@ class StorageAddonBase(object):
             raise HTTPError(res.status_code, data={
                 'error': res.json(),
             })
-        # TODO: better throttling?
-        sleep(1.0 / 5.0)
         return res.json().get('data', [])
 
     def _get_file_tree(self, filenode=None, user=None, cookie=None, version=None):
         """
-        Recursively get file metadata
+        Get file metadata for the whole tree below `filenode`. Folders are listed
+        concurrently, rate limited per provider; see `website.addons.base.crawler`.
+        Only the listing of `filenode` itself is made at `version`.
         """
         filenode = filenode or {
             'path': '/',
             'kind': 'folder',
             'name': self.root_node.name,
         }
-        if filenode.get('kind') == 'file':
+        if not crawler.is_folder_to_crawl(filenode):
             return filenode
-        elif 'size' in filenode:
-            return filenode
-        kwargs = {
-            'version': version,
-            'cookie': cookie,
-        }
-        filenode['children'] = [
-            self._get_file_tree(child, user, cookie=cookie)
-            for child in self._get_fileobj_child_metadata(filenode, user, **kwargs)
-        ]
-        return filenode
+        # Look the cookie up once here; the worker threads have no request context
+        if not cookie and user:
+            cookie = user.get_or_create_cookie()
+        elif not cookie and has_request_context():
+            cookie = request.cookies.get(settings.COOKIE_NAME)
+
+        def fetch_children(folder, first=False):
+            return self._get_fileobj_child_metadata(
+                folder,
+                None if cookie else user,
+                cookie=cookie,
+                version=version if first else None,
+            )
+
+        return crawler.FileTreeCrawler(
+            fetch_children,
+            crawler.get_rate_limiter(self.config.short_name),
+        ).crawl(filenode)
 
 class AddonOAuthNodeSettingsBase(AddonNodeSettingsBase):
     _meta = {
@@ -0,0 +1,148 @@
+"""
+Concurrent crawling of addon file trees through WaterButler.
+
+Folder metadata is fetched by a bounded pool of threads. Requests to each provider
+share a token bucket, so the pool can't exceed the provider's rate limit no matter
+how many crawls run in the process, and transient failures are retried with
+exponential backoff.
+"""
+import sys
+import time
+import Queue
+import random
+import threading
+
+import requests
+
+from framework.exceptions import HTTPError
+
+from website import settings
+
+
+# Responses worth retrying: rate limited or a passing server-side problem
+RETRY_STATUS_CODES = frozenset([429, 500, 502, 503, 504])
+
+
+class TokenBucket(object):
+    """Thread-safe token bucket allowing `rate` acquisitions per second on average,
+    with bursts of up to `capacity`.
+    """
+
+    def __init__(self, rate, capacity=None, clock=time.time, sleep=time.sleep):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self.tokens = self.capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Take a token, blocking until one is available."""
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            self.sleep(wait)
+
+
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider):
+    """Return the process-wide token bucket for `provider`."""
+    with _rate_limiters_lock:
+        if provider not in _rate_limiters:
+            limits = settings.WATERBUTLER_CRAWL_RATE_LIMITS
+            _rate_limiters[provider] = TokenBucket(limits.get(provider, limits['default']))
+        return _rate_limiters[provider]
+
+
+def is_folder_to_crawl(filenode):
+    return filenode.get('kind') != 'file' and 'size' not in filenode
+
+
+class FileTreeCrawler(object):
+    """Fill in the `children` of every folder below a root with a pool of worker threads.
+
+    :param fetch_children: Called with a folder's metadata dict (and `first=True` for the
+        root), returns the metadata dicts of its children
+    :param TokenBucket rate_limiter: Acquired before each fetch
+    """
+
+    def __init__(self, fetch_children, rate_limiter, workers=None, max_retries=None, backoff=None):
+        self.fetch_children = fetch_children
+        self.rate_limiter = rate_limiter
+        self.workers = workers or settings.WATERBUTLER_CRAWL_WORKERS
+        self.max_retries = settings.WATERBUTLER_CRAWL_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff = settings.WATERBUTLER_CRAWL_BACKOFF if backoff is None else backoff
+        self.requests_made = 0
+        self.lock = threading.Lock()
+
+    def fetch(self, folder, first=False):
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire()
+            with self.lock:
+                self.requests_made += 1
+            try:
+                return self.fetch_children(folder, first=first)
+            except (HTTPError, requests.ConnectionError, requests.Timeout) as error:
+                retryable = getattr(error, 'code', None) in RETRY_STATUS_CODES or not isinstance(error, HTTPError)
+                if not retryable or attempt >= self.max_retries:
+                    raise
+            # Exponential backoff with jitter so retries from different workers spread out
+            time.sleep(self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+            attempt += 1
+
+    def crawl(self, root):
+        """Crawl the tree below `root` in place and return `root`. The first error raised
+        by a fetch stops the crawl and is re-raised here.
+        """
+        if not is_folder_to_crawl(root):
+            return root
+
+        pending = Queue.Queue()
+        errors = []
+
+        def work():
+            while True:
+                folder = pending.get()
+                try:
+                    if folder is None:
+                        return
+                    if errors:
+                        continue
+                    folder['children'] = self.fetch(folder, first=folder is root)
+                    for child in folder['children']:
+                        if is_folder_to_crawl(child):
+                            pending.put(child)
+                except Exception:
+                    errors.append(sys.exc_info())
+                finally:
+                    pending.task_done()
+
+        threads = [threading.Thread(target=work) for _ in range(self.workers)]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        pending.put(root)
+        pending.join()
+        for _ in threads:
+            pending.put(None)
+        for thread in threads:
+            thread.join()
+
+        if errors:
+            exc_type, exc_value, exc_traceback = errors[0]
+            raise exc_type, exc_value, exc_traceback
+        return root
@@ -0,0 +1,128 @@
+"""
+A local stand-in for WaterButler's metadata endpoint, for crawling addon file trees
+in tests and benchmarks without a real provider behind it.
+
+    server = FakeWaterButler(make_tree(depth=3, folders=4, files=10), latency=0.05)
+    server.start()
+    with mock.patch('website.settings.WATERBUTLER_URL', server.url):
+        ...
+    server.stop()
+"""
+import json
+import time
+import urlparse
+import threading
+import BaseHTTPServer
+import SocketServer
+
+
+def make_tree(depth, folders, files, path='/'):
+    """Build a folder tree `depth` levels deep where every folder holds `folders`
+    subfolders and `files` files, keyed by WaterButler path.
+    """
+    children = []
+    for number in range(files):
+        children.append({
+            'kind': 'file',
+            'name': 'file{}.txt'.format(number),
+            'path': '{0}file{1}.txt'.format(path, number),
+            'size': 1024,
+            'extra': {'hashes': {'sha256': '{0}file{1}'.format(path, number)}},
+        })
+    if depth > 0:
+        for number in range(folders):
+            subpath = '{0}folder{1}/'.format(path, number)
+            children.append(make_tree(depth - 1, folders, files, path=subpath))
+    return {
+        'kind': 'folder',
+        'name': path.rstrip('/').rsplit('/', 1)[-1],
+        'path': path,
+        'children': children,
+    }
+
+
+def count_folders(tree):
+    return 1 + sum(count_folders(child) for child in tree['children'] if child['kind'] == 'folder')
+
+
+class FakeWaterButlerHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        fake = self.server.fake
+        path = urlparse.parse_qs(urlparse.urlparse(self.path).query).get('path', ['/'])[0]
+        status, body = fake.respond(path)
+        payload = json.dumps(body)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class ThreadedHTTPServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+class FakeWaterButler(object):
+    """Serve folder listings out of `tree`, taking `latency` seconds per request.
+
+    :param dict failures: Path to a list of status codes returned, in order, by the
+        first requests for that path before the listing is served
+    """
+
+    def __init__(self, tree, latency=0, failures=None):
+        self.folders = {}
+        self._index(tree)
+        self.latency = latency
+        self.failures = dict((path, list(codes)) for path, codes in (failures or {}).items())
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self.server = None
+
+    def _index(self, folder):
+        self.folders[folder['path']] = [
+            dict((key, value) for key, value in child.items() if key != 'children')
+            for child in folder['children']
+        ]
+        for child in folder['children']:
+            if child['kind'] == 'folder':
+                self._index(child)
+
+    def respond(self, path):
+        with self.lock:
+            self.requests.append(path)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            failures = self.failures.get(path)
+            status = failures.pop(0) if failures else None
+        try:
+            time.sleep(self.latency)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+        if status:
+            return status, {'message': 'Injected failure'}
+        if path not in self.folders:
+            return 404, {'message': 'Not found'}
+        return 200, {'data': self.folders[path]}
+
+    @property
+    def url(self):
+        return 'http://localhost:{}'.format(self.server.server_port)
+
+    def start(self):
+        self.server = ThreadedHTTPServer(('localhost', 0), FakeWaterButlerHandler)
+        self.server.fake = self
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""Per-account cache of a reference library, so that citation widgets are served
+without paging through the whole library on every request.
+
+CSL records are stored one per document in ``citationrecord``. Each account's
+sync state, folder list and folder membership are stored in ``citationsync``.
+Providers fill the cache through `CachedCitationsMixin`.
+"""
+import abc
+import datetime
+import collections
+
+import pymongo
+
+from framework.mongo import database
+
+#: Bump when the layout of cached data changes; older caches are ignored
+CACHE_VERSION = 1
+
+#: Index of each account's records in library order. The collection is not set up by
+#: set_up_storage, so the index is ensured when it is used
+RECORD_INDEX = [('account', pymongo.ASCENDING), ('position', pymongo.ASCENDING)]
+
+
+class CitationCache(object):
+    """Cached CSL records and folders of one external account."""
+
+    def __init__(self, account_id):
+        self.account_id = account_id
+        self._state = None
+
+    @property
+    def records(self):
+        records = database['citationrecord']
+        # Cached by pymongo, so only sent to the server once in a while
+        records.ensure_index(RECORD_INDEX)
+        return records
+
+    @property
+    def syncs(self):
+        return database['citationsync']
+
+    @property
+    def state(self):
+        if self._state is None:
+            state = self.syncs.find_one({'_id': self.account_id})
+            if state is None or state.get('version') != CACHE_VERSION:
+                state = {'_id': self.account_id, 'version': CACHE_VERSION, 'members': {}}
+            self._state = state
+        return self._state
+
+    def _set_state(self, **values):
+        self.state.update(values)
+        self.syncs.save(self.state)
+
+    def _record_id(self, csl_id):
+        return '{0}:{1}'.format(self.account_id, csl_id)
+
+    def is_fresh(self, key, ttl):
+        synced = self.state.get(key)
+        return synced is not None and datetime.datetime.utcnow() - synced < ttl
+
+    # Records
+
+    def citations(self, csl_ids=None):
+        """Return the cached CSL records, in library order, or of ``csl_ids`` in
+        that order; records not cached yet are left out.
+        """
+        if csl_ids is None:
+            documents = self.records.find({'account': self.account_id}).sort('position', 1)
+            return [document['csl'] for document in documents]
+        csl_ids = list(csl_ids)
+        documents = self.records.find({'_id': {'$in': [self._record_id(csl_id) for csl_id in csl_ids]}})
+        records = dict((document['csl']['id'], document['csl']) for document in documents)
+        return [records[csl_id] for csl_id in csl_ids if csl_id in records]
+
+    def replace(self, records, cursor=None):
+        """Replace the whole library, after a full sync."""
+        self.records.remove({'account': self.account_id})
+        self._save_records(records, position=0, replaced=True)
+        now = datetime.datetime.utcnow()
+        self._set_state(cursor=cursor, synced=now, full_synced=now)
+
+    def update(self, records, deleted_ids=(), cursor=None):
+        """Apply the changes found by an incremental sync."""
+        if deleted_ids:
+            self.records.remove({'_id': {'$in': [self._record_id(csl_id) for csl_id in deleted_ids]}})
+        self.add(records)
+        self._set_state(cursor=cursor, synced=datetime.datetime.utcnow())
+
+    def add(self, records):
+        """Add or update records, without changing when the library was synced."""
+        last = list(self.records.find({'account': self.account_id}).sort('position', -1).limit(1))
+        self._save_records(records, position=last[0]['position'] + 1 if last else 0)
+
+    def _save_records(self, records, position, replaced=False):
+        """Write records with one insert, new ones numbered from ``position``.
+
+        :param bool replaced: The account's records were just removed, so none
+            can be cached already
+        """
+        records = collections.OrderedDict((self._record_id(record['id']), record) for record in records)
+        if not records:
+            return
+        existing = {}
+        if not replaced:
+            # Changed records keep their place in the library
+            existing = dict(
+                (document['_id'], document['position'])
+                for document in self.records.find({'_id': {'$in': list(records)}}, {'position': True})
+            )
+        documents = []
+        for record_id, record in records.iteritems():
+            if record_id not in existing:
+                existing[record_id] = position
+                position += 1
+            documents.append({
+                '_id': record_id,
+                'account': self.account_id,
+                'position': existing[record_id],
+                'csl': record,
+            })
+        if not replaced:
+            self.records.remove({'_id': {'$in': list(records)}})
+        self.records.insert(documents)
+
+    # Folders
+
+    def folders(self, ttl):
+        """Return the cached folder list, or None if it is missing or stale."""
+        if not self.is_fresh('folders_synced', ttl):
+            return None
+        return self.state['folders']
+
+    def set_folders(self, folders):
+        self._set_state(folders=folders, folders_synced=datetime.datetime.utcnow())
+
+    def folder_members(self, folder_id, ttl):
+        """Return the ids of the folder's records, or None if missing or stale."""
+        members = self.state['members'].get(folder_id)
+        if members is None or datetime.datetime.utcnow() - members['synced'] >= ttl:
+            return None
+        return members['ids']
+
+    def set_folder_members(self, folder_id, csl_ids):
+        self.state['members'][folder_id] = {
+            'ids': list(csl_ids),
+            'synced': datetime.datetime.utcnow(),
+        }
+        self._set_state()
+
+    def clear(self):
+        self.records.remove({'account': self.account_id})
+        self.syncs.remove({'_id': self.account_id})
+        self._state = None
+
+
+class CachedCitationsMixin(object):
+    """Serve an `ExternalProvider`'s folders and citations from its account's
+    `CitationCache`, syncing changes at most every ``cache_ttl``. Changes are
+    fetched incrementally from the cursor of the last sync, and the whole
+    library is fetched again every ``full_sync_interval`` to catch anything
+    an incremental sync can miss.
+    """
+
+    __metaclass__ = abc.ABCMeta
+
+    cache_ttl = datetime.timedelta(minutes=5)
+    full_sync_interval = datetime.timedelta(days=1)
+
+    @property
+    def citation_cache(self):
+        return CitationCache(self.account._id)
+
+    @abc.abstractmethod
+    def _fetch_folders(self, extract_folder):
+        """Return the account's folders, serialized by ``extract_folder``."""
+
+    @abc.abstractmethod
+    def _fetch_citations(self, cursor=None):
+        """Fetch the library's CSL records, or only those changed since ``cursor``.
+
+        :return: 3-tuple of (records, ids of deleted records, new cursor)
+        """
+
+    @abc.abstractmethod
+    def _fetch_folder_members(self, folder_id):
+        """Fetch the ids of the records in a folder.
+
+        :return: 2-tuple of (record ids, records fetched along with them, if any)
+        """
+
+    def sync_citations(self, cache=None):
+        cache = cache or self.citation_cache
+        cursor = cache.state.get('cursor')
+        if cursor is None or not cache.is_fresh('full_synced', self.full_sync_interval):
+            records, _, cursor = self._fetch_citations()
+            cache.replace(records, cursor=cursor)
+        else:
+            records, deleted_ids, cursor = self._fetch_citations(cursor)
+            cache.update(records, deleted_ids, cursor=cursor)
+
+    def citation_lists(self, extract_folder):
+        """List of CitationList objects, derived from the account's folders"""
+        cache = self.citation_cache
+        folders = cache.folders(self.cache_ttl)
+        if folders is None:
+            folders = self._fetch_folders(extract_folder)
+            cache.set_folders(folders)
+        return folders
+
+    def get_list(self, list_id=None):
+        """Get a single CitationList
+
+        :param str list_id: ID for a folder. Optional.
+        :return CitationList: CitationList for the folder, or for all documents
+        """
+        cache = self.citation_cache
+        if not cache.is_fresh('synced', self.cache_ttl):
+            self.sync_citations(cache)
+        if list_id in (None, 'ROOT'):
+            return cache.citations()
+
+        csl_ids = cache.folder_members(list_id, self.cache_ttl)
+        if csl_ids is None:
+            csl_ids, records = self._fetch_folder_members(list_id)
+            if records:
+                cache.add(records)
+            cache.set_folder_members(list_id, csl_ids)
+        return cache.citations(csl_ids)
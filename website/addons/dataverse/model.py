@@ -1,5 +1,4 @@
 # -*- coding: utf-8 -*-
-from time import sleep
 import requests
 import httplib as http
 
@@ -115,8 +114,6 @@ class AddonDataverseNodeSettings(StorageAddonBase, AddonOAuthNodeSettingsBase):
             raise HTTPError(res.status_code, data={
                 'error': res.json(),
             })
-        # TODO: better throttling?
-        sleep(1.0 / 5.0)
         return res.json().get('data', [])
 
     def delete(self, save=True):
@@ -4,5 +4,7 @@ from mendeley.session import MendeleySession
 class APISession(MendeleySession):
 
     def request(self, *args, **kwargs):
-        kwargs['params'] = {'view': 'all', 'limit': '500'}
+        params = {'view': 'all', 'limit': '500'}
+        params.update(kwargs.get('params') or {})
+        kwargs['params'] = params
         return super(APISession, self).request(*args, **kwargs)
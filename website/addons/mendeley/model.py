@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import time
+import datetime
 
 import mendeley
 from mendeley.exception import MendeleyApiException
@@ -8,6 +9,7 @@ from modularodm import fields
 
 from website.addons.base import AddonOAuthNodeSettingsBase
 from website.addons.base import AddonOAuthUserSettingsBase
+from website.addons.citations.cache import CachedCitationsMixin
 from website.addons.citations.utils import serialize_folder
 from website.addons.mendeley import serializer
 from website.addons.mendeley import settings
@@ -17,7 +19,10 @@ from website.util import web_url_for
 
 from framework.exceptions import HTTPError
 
-class Mendeley(ExternalProvider):
+SYNC_CLOCK_MARGIN = datetime.timedelta(minutes=1)
+
+
+class Mendeley(CachedCitationsMixin, ExternalProvider):
     name = 'Mendeley'
     short_name = 'mendeley'
 
@@ -28,6 +33,9 @@ class Mendeley(ExternalProvider):
     callback_url = 'https://api.mendeley.com/oauth/token'
     default_scopes = ['all']
 
+    cache_ttl = settings.CITATION_CACHE_TTL
+    full_sync_interval = settings.CITATION_CACHE_FULL_SYNC_INTERVAL
+
     _client = None
 
     def handle_callback(self, response):
@@ -85,9 +93,7 @@ class Mendeley(ExternalProvider):
 
         return self._client
 
-    def citation_lists(self, extract_folder):
-        """List of CitationList objects, derived from Mendeley folders"""
-
+    def _fetch_folders(self, extract_folder):
         folders = self._get_folders()
         # TODO: Verify OAuth access to each folder
         all_documents = serialize_folder(
@@ -101,43 +107,41 @@ class Mendeley(ExternalProvider):
         ]
         return [all_documents] + serialized_folders
 
-    def get_list(self, list_id='ROOT'):
-        """Get a single CitationList
-        :param str list_id: ID for a Mendeley folder. Optional.
-        :return CitationList: CitationList for the folder, or for all documents
+    def _fetch_citations(self, cursor=None):
+        """Fetch the user's documents, or only those changed or deleted since
+        ``cursor``, the time the previous sync started.
         """
-        if list_id == 'ROOT':
-            folder = None
+        # Start a little early to allow for clock skew with Mendeley's servers
+        new_cursor = (
+            datetime.datetime.utcnow() - SYNC_CLOCK_MARGIN
+        ).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+        if cursor is None:
+            documents = self.client.documents.iter(page_size=500)
+            deleted_ids = []
         else:
-            folder = self.client.folders.get(list_id)
-
-        if folder:
-            return self._citations_for_mendeley_folder(folder)
-        return self._citations_for_mendeley_user()
+            documents = self.client.documents.iter(page_size=500, modified_since=cursor)
+            deleted_ids = [
+                document.id
+                for document in self.client.documents.iter(page_size=500, deleted_since=cursor)
+            ]
+        records = [
+            self._citation_for_mendeley_document(document)
+            for document in documents
+        ]
+        return records, deleted_ids, new_cursor
 
-    def _folder_metadata(self, folder_id):
+    def _fetch_folder_members(self, folder_id):
         folder = self.client.folders.get(folder_id)
-        return folder
-
-    def _citations_for_mendeley_folder(self, folder):
-
         document_ids = [
             document.id
             for document in folder.documents.iter(page_size=500)
         ]
-        citations = {
-            citation['id']: citation
-            for citation in self._citations_for_mendeley_user()
-        }
-        return map(lambda id: citations[id], document_ids)
+        return document_ids, []
 
-    def _citations_for_mendeley_user(self):
-
-        documents = self.client.documents.iter(page_size=500)
-        return [
-            self._citation_for_mendeley_document(document)
-            for document in documents
-        ]
+    def _folder_metadata(self, folder_id):
+        folder = self.client.folders.get(folder_id)
+        return folder
 
     def _citation_for_mendeley_document(self, document):
         """Mendeley document to ``website.citations.models.Citation``
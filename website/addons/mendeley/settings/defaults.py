@@ -1,3 +1,10 @@
+import datetime
+
 # OAuth app keys
 MENDELEY_CLIENT_ID = None
 MENDELEY_CLIENT_SECRET = None
+
+# How long a library's cached citations and folders are served before checking
+# for changes, and how often the whole library is fetched again
+CITATION_CACHE_TTL = datetime.timedelta(minutes=5)
+CITATION_CACHE_FULL_SYNC_INTERVAL = datetime.timedelta(days=1)
@@ -12,11 +12,13 @@ from website.addons.mendeley.tests.factories import MendeleyAccountFactory
 from website.addons.mendeley.provider import MendeleyCitationsProvider
 
 import datetime
+import json
 
 from mendeley.exception import MendeleyApiException
 from framework.exceptions import HTTPError
 
 from website.addons.mendeley import model
+from website.addons.mendeley.tests.utils import mock_responses
 
 
 class MockFolder(object):
@@ -72,8 +74,7 @@ class MendeleyProviderTestCase(OsfTestCase):
         mock_list.items = mock_folders
         mock_client.folders.list.return_value = mock_list
         self.provider._client = mock_client
-        mock_account = mock.Mock()
-        self.provider.account = mock_account
+        self.provider.account = MendeleyAccountFactory()
         res = self.provider.citation_lists(MendeleyCitationsProvider()._extract_folder)
         assert_equal(res[1]['name'], mock_folders[0].name)
         assert_equal(res[1]['id'], mock_folders[0].json['id'])
@@ -85,6 +86,76 @@ class MendeleyProviderTestCase(OsfTestCase):
         res = self.provider._client
         assert_raises(HTTPError(403))
 
+class MendeleyCitationCacheTestCase(OsfTestCase):
+
+    def setUp(self):
+        super(MendeleyCitationCacheTestCase, self).setUp()
+        self.documents = [
+            mock.Mock(id=each['id'], json=each)
+            for each in json.loads(mock_responses['documents'])
+        ]
+        self.provider = model.Mendeley()
+        self.provider.account = MendeleyAccountFactory()
+        self.provider._client = mock.Mock()
+        self.provider._client.documents.iter.return_value = self.documents
+
+    def expire(self, key):
+        cache = self.provider.citation_cache
+        cache._set_state(**{key: cache.state[key] - model.settings.CITATION_CACHE_FULL_SYNC_INTERVAL})
+
+    def test_get_list_served_from_cache(self):
+        res = self.provider.get_list('ROOT')
+        assert_equal([each['id'] for each in res], [each.id for each in self.documents])
+        assert_equal(self.provider.get_list('ROOT'), res)
+        assert_equal(self.provider.client.documents.iter.call_count, 1)
+
+    def test_incremental_sync(self):
+        self.provider.get_list('ROOT')
+        cursor = self.provider.citation_cache.state['cursor']
+        self.expire('synced')
+        changed = self.documents[1].json.copy()
+        changed['title'] = 'Changed Title'
+
+        def iter_documents(page_size, modified_since=None, deleted_since=None):
+            if deleted_since:
+                return [mock.Mock(id=self.documents[0].id)]
+            return [mock.Mock(id=changed['id'], json=changed)]
+        self.provider.client.documents.iter.side_effect = iter_documents
+
+        res = self.provider.get_list('ROOT')
+        self.provider.client.documents.iter.assert_any_call(page_size=500, modified_since=cursor)
+        assert_equal([each['id'] for each in res], [each.id for each in self.documents[1:]])
+        assert_equal(res[0]['title'], 'Changed Title')
+
+    def test_full_sync_after_interval(self):
+        self.provider.get_list('ROOT')
+        self.expire('synced')
+        self.expire('full_synced')
+        self.provider.client.documents.iter.return_value = self.documents[:2]
+        res = self.provider.get_list('ROOT')
+        self.provider.client.documents.iter.assert_called_with(page_size=500)
+        assert_equal(len(res), 2)
+
+    def test_folder_served_from_cache(self):
+        folder = self.provider.client.folders.get.return_value
+        folder.documents.iter.return_value = [mock.Mock(id=self.documents[2].id)]
+        res = self.provider.get_list('e843da05-8818-47c2-8c37-41eebfc4fe3f')
+        assert_equal(res, [self.provider._citation_for_mendeley_document(self.documents[2])])
+        self.provider.get_list('e843da05-8818-47c2-8c37-41eebfc4fe3f')
+        assert_equal(folder.documents.iter.call_count, 1)
+
+    def test_records_are_indexed_by_account_and_position(self):
+        cached = self.provider.get_list('ROOT')
+        records = self.provider.citation_cache.records
+        keys = [index['key'] for index in records.index_information().values()]
+        assert_in([('account', 1), ('position', 1)], keys)
+        # New records go after the ones already cached, changed ones keep their place
+        added = dict(cached[0], id='new-document')
+        self.provider.citation_cache.add([added, cached[0]])
+        res = self.provider.get_list('ROOT')
+        assert_equal([each['id'] for each in res], [each.id for each in self.documents] + ['new-document'])
+
+
 class MendeleyNodeSettingsTestCase(OsfTestCase):
 
     def setUp(self):
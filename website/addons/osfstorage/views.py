@@ -129,10 +129,7 @@ def osfstorage_get_metadata(file_node, **kwargs):
 @must_be_signed
 @decorators.autoload_filenode(must_be='folder')
 def osfstorage_get_children(file_node, **kwargs):
-    return [
-        child.serialize()
-        for child in file_node.children
-    ]
+    return file_node.serialize_children()
 
 
 @must_be_signed
@@ -2,6 +2,7 @@
 
 import datetime
 import functools
+import hashlib
 import logging
 
 from bleach import linkify
@@ -14,11 +15,14 @@ from modularodm import fields
 
 from framework.forms.utils import sanitize
 from framework.guid.model import GuidStoredObject
+from framework.mongo import database
 
 from website import settings
 from website.addons.base import AddonNodeSettingsBase
 from website.addons.wiki import utils as wiki_utils
+from website.addons.wiki import settings as wiki_settings
 from website.addons.wiki.settings import WIKI_CHANGE_DATE
+from website.addons.wiki.settings import WIKI_RENDER_CACHE_SIZE
 from website.project.signals import write_permissions_revoked
 
 from website.exceptions import NodeStateError
@@ -32,6 +36,10 @@ from .exceptions import (
 
 logger = logging.getLogger(__name__)
 
+# Bump when the output of `render_content` changes, e.g. a new markdown extension or
+# whitelist, to invalidate every cached render
+RENDER_CACHE_VERSION = 1
+
 
 class AddonWikiNodeSettings(AddonNodeSettingsBase):
 
@@ -161,10 +169,19 @@ class NodeWikiPage(GuidStoredObject):
     date = fields.DateTimeField(auto_now_add=datetime.datetime.utcnow)
     is_current = fields.BooleanField()
     content = fields.StringField(default='')
+    # Set instead of `content` on older versions when WIKI_VERSION_DELTAS is on: a
+    # delta (see `wiki_utils.make_delta`) from the content of the page `delta_base`,
+    # the next version
+    delta = fields.StringField()
+    delta_base = fields.StringField()
 
     user = fields.ForeignField('user')
     node = fields.ForeignField('node')
 
+    # Most recently used renders of `content`, as
+    # [{'key': <render key>, 'html': <html>, 'text': <search text>}, ...]
+    render_cache = fields.DictionaryField(list=True)
+
     @property
     def deep_url(self):
         return '{}wiki/{}/'.format(self.node.deep_url, self.page_name)
@@ -177,9 +194,36 @@ class NodeWikiPage(GuidStoredObject):
     def rendered_before_update(self):
         return self.date < WIKI_CHANGE_DATE
 
-    def html(self, node):
-        """The cleaned HTML of the page"""
-        sanitized_content = render_content(self.content, node=node)
+    def render_key(self, node):
+        """Hash of everything the rendered page depends on: the content and, through
+        wiki links, the node it is rendered for.
+        """
+        return hashlib.sha1(u'{0}:{1}:{2}'.format(
+            RENDER_CACHE_VERSION, node._id, self.get_content() or ''
+        ).encode('utf-8')).hexdigest()
+
+    def render(self, node):
+        """Return the cached render of the page for `node`, rendering and storing
+        it on a miss. The cache is written directly so this never triggers `save`.
+        """
+        key = self.render_key(node)
+        for entry in self.render_cache:
+            if entry['key'] == key:
+                return entry
+        html = self._render_html(node)
+        entry = {'key': key, 'html': html, 'text': sanitize(html, tags=[], strip=True)}
+        self.render_cache = [entry] + [
+            each for each in self.render_cache if each['key'] != key
+        ][:WIKI_RENDER_CACHE_SIZE - 1]
+        if self._id:
+            database['nodewikipage'].update(
+                {'_id': self._id},
+                {'$set': {'render_cache': self.render_cache}},
+            )
+        return entry
+
+    def _render_html(self, node):
+        sanitized_content = render_content(self.get_content(), node=node)
         try:
             return linkify(
                 sanitized_content,
@@ -189,10 +233,49 @@ class NodeWikiPage(GuidStoredObject):
             logger.warning('Returning unlinkified content.')
             return sanitized_content
 
+    def get_content(self):
+        """The text of this version. If only a delta is stored, follow the chain of
+        newer versions to the nearest one that is stored in full, or already rebuilt,
+        and apply the deltas back down.
+        """
+        if self.delta is None:
+            return self.content
+        content = wiki_utils.version_content_cache.get(self._id)
+        if content is not None:
+            return content
+        chain = [self]
+        base = NodeWikiPage.load(self.delta_base)
+        while base.delta is not None and wiki_utils.version_content_cache.get(base._id) is None:
+            chain.append(base)
+            base = NodeWikiPage.load(base.delta_base)
+        content = base.get_content()
+        for page in reversed(chain):
+            content = wiki_utils.apply_delta(content, page.delta)
+            wiki_utils.version_content_cache.set(page._id, content)
+        return content
+
+    def compress(self, newer):
+        """Store this version as a delta from `newer`, the next version, unless it is
+        a snapshot version. Returns whether anything changed; does not save.
+        """
+        if self.delta is not None or not self.version:
+            return False
+        if self.version % wiki_settings.WIKI_VERSION_SNAPSHOT_INTERVAL == 0:
+            return False
+        self.delta = wiki_utils.make_delta(newer.get_content(), self.content)
+        self.delta_base = newer._id
+        self.content = None
+        # Older versions are rarely viewed; don't keep their renders either
+        self.render_cache = []
+        return True
+
+    def html(self, node):
+        """The cleaned HTML of the page"""
+        return self.render(node)['html']
+
     def raw_text(self, node):
         """ The raw text of the page, suitable for using in a test search"""
-
-        return sanitize(self.html(node), tags=[], strip=True)
+        return self.render(node)['text']
 
     def get_draft(self, node):
         """
@@ -213,7 +296,7 @@ class NodeWikiPage(GuidStoredObject):
             if sharejs_version > 1 and sharejs_date > self.date:
                 return doc_item['_data']
 
-        return self.content
+        return self.get_content()
 
     def save(self, *args, **kwargs):
         rv = super(NodeWikiPage, self).save(*args, **kwargs)
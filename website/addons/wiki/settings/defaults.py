@@ -11,3 +11,14 @@ SHAREJS_DB_URL = 'mongodb://{}:{}/{}'.format(settings.DB_HOST, settings.DB_PORT,
 
 # TODO: Change to release date for wiki change
 WIKI_CHANGE_DATE = datetime.datetime.utcfromtimestamp(1423760098)
+
+# Renders of a wiki page kept on it; pages are shared with forks and registrations,
+# which each need their own render
+WIKI_RENDER_CACHE_SIZE = 4
+
+# Store older wiki versions as line deltas against the next version instead of in full
+WIKI_VERSION_DELTAS = False
+# Every this many versions, a version is kept in full to bound how many deltas a read applies
+WIKI_VERSION_SNAPSHOT_INTERVAL = 10
+# Rebuilt version contents kept in memory per process
+WIKI_VERSION_CONTENT_CACHE_SIZE = 128
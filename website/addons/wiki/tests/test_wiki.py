@@ -13,7 +13,7 @@ from modularodm.exceptions import ValidationValueError
 from tests.base import OsfTestCase, fake
 from tests.factories import (
     UserFactory, NodeFactory, ProjectFactory,
-    AuthUserFactory, NodeWikiFactory,
+    AuthUserFactory, NodeWikiFactory, RegistrationFactory,
 )
 
 from website.exceptions import NodeStateError
@@ -24,6 +24,7 @@ from website.addons.wiki.model import NodeWikiPage, render_content
 from website.addons.wiki.utils import (
     get_sharejs_uuid, generate_private_uuid, share_db, delete_share_doc,
     migrate_uuid, format_wiki_version, serialize_wiki_settings,
+    make_delta, apply_delta, version_content_cache,
 )
 from website.addons.wiki.tests.config import EXAMPLE_DOCS, EXAMPLE_OPS
 from framework.auth import Auth
@@ -43,6 +44,121 @@ class TestNodeWikiPageModel(OsfTestCase):
             page.save()
 
 
+class TestWikiRenderCache(OsfTestCase):
+
+    def setUp(self):
+        super(TestWikiRenderCache, self).setUp()
+        self.project = ProjectFactory()
+        self.auth = Auth(self.project.creator)
+        self.project.update_node_wiki('home', 'Hello [[world]]', self.auth)
+        self.page = self.project.get_wiki_page('home')
+
+    def test_cache_hit_does_not_render(self):
+        html = self.page.html(self.project)
+        assert_in('/{0}/wiki/world/'.format(self.project._id), html)
+        NodeWikiPage._clear_caches()
+        page = NodeWikiPage.load(self.page._id)
+        with mock.patch('website.addons.wiki.model.render_content') as mock_render:
+            assert_equal(page.html(self.project), html)
+            assert_equal(page.raw_text(self.project), 'Hello world')
+        assert_false(mock_render.called)
+
+    def test_cache_is_keyed_on_content_and_node(self):
+        self.page.html(self.project)
+        key = self.page.render_key(self.project)
+        fork = self.project.fork_node(self.auth)
+        assert_not_equal(self.page.render_key(fork), key)
+        assert_in('/{0}/wiki/world/'.format(fork._id), self.page.html(fork))
+        assert_equal(len(self.page.render_cache), 2)
+        self.page.content = 'Changed'
+        assert_not_equal(self.page.render_key(self.project), key)
+        assert_equal(self.page.raw_text(self.project), 'Changed')
+
+    def test_cache_is_bounded(self):
+        for _ in range(settings.WIKI_RENDER_CACHE_SIZE + 1):
+            self.page.html(ProjectFactory())
+        assert_equal(len(self.page.render_cache), settings.WIKI_RENDER_CACHE_SIZE)
+
+
+class TestWikiVersionDeltas(OsfTestCase):
+
+    def setUp(self):
+        super(TestWikiVersionDeltas, self).setUp()
+        self.mock_deltas = mock.patch.object(settings, 'WIKI_VERSION_DELTAS', True)
+        self.mock_interval = mock.patch.object(settings, 'WIKI_VERSION_SNAPSHOT_INTERVAL', 3)
+        self.mock_deltas.start()
+        self.mock_interval.start()
+        self.user = AuthUserFactory()
+        self.project = ProjectFactory(creator=self.user)
+        self.auth = Auth(self.user)
+        self.contents = [
+            u'\n'.join(u'line {0} of version {1}'.format(line, version if line == version else 0) for line in range(8))
+            for version in range(1, 6)
+        ]
+        for content in self.contents:
+            self.project.update_node_wiki('home', content, self.auth)
+        version_content_cache.clear()
+        NodeWikiPage._clear_caches()
+
+    def tearDown(self):
+        super(TestWikiVersionDeltas, self).tearDown()
+        self.mock_deltas.stop()
+        self.mock_interval.stop()
+
+    def test_make_and_apply_delta(self):
+        base, target = u'a\nb\nc\n', u'a\nc\nd\n'
+        assert_equal(apply_delta(base, make_delta(base, target)), target)
+        assert_equal(apply_delta(u'', make_delta(u'', target)), target)
+        assert_equal(apply_delta(base, make_delta(base, u'')), u'')
+
+    def test_older_versions_are_stored_as_deltas(self):
+        pages = [self.project.get_wiki_page('home', version) for version in range(1, 6)]
+        # Version 3 is a snapshot and version 5 is current
+        assert_equal([page.delta is None for page in pages], [False, False, True, False, True])
+        assert_equal(pages[0].delta_base, pages[1]._id)
+        for page, content in zip(pages, self.contents):
+            assert_equal(page.get_content(), content)
+
+    def test_rebuilt_versions_are_cached(self):
+        # Rebuilding version 1 goes through version 2
+        self.project.get_wiki_page('home', 1).get_content()
+        page = self.project.get_wiki_page('home', 2)
+        with mock.patch.object(NodeWikiPage, 'load') as mock_load:
+            assert_equal(page.get_content(), self.contents[1])
+        assert_false(mock_load.called)
+
+    def test_compare_content_is_rebuilt(self):
+        url = self.project.api_url_for('wiki_page_content', wname='home', wver=1)
+        res = self.app.get(url, auth=self.user.auth)
+        assert_equal(res.json['wiki_content'], self.contents[0])
+
+    def test_version_current_on_a_fork_is_kept_in_full(self):
+        fork = self.project.fork_node(self.auth)
+        shared = self.project.get_wiki_page('home')
+        self.project.update_node_wiki('home', u'new content', self.auth)
+        NodeWikiPage._clear_caches()
+        shared = NodeWikiPage.load(shared._id)
+        assert_is_none(shared.delta)
+        assert_equal(fork.get_wiki_page('home').get_content(), self.contents[-1])
+
+    def test_version_current_on_the_source_is_kept_in_full(self):
+        fork = self.project.fork_node(self.auth)
+        shared = fork.get_wiki_page('home')
+        fork.update_node_wiki('home', u'new content', self.auth)
+        NodeWikiPage._clear_caches()
+        assert_is_none(NodeWikiPage.load(shared._id).delta)
+        assert_equal(self.project.get_wiki_page('home').get_content(), self.contents[-1])
+
+    def test_version_current_on_a_registration_of_a_fork_is_kept_in_full(self):
+        fork = self.project.fork_node(self.auth)
+        RegistrationFactory(project=fork, creator=self.user)
+        # Only the registration of the fork still shows the shared version
+        fork.update_node_wiki('home', u'fork content', self.auth)
+        shared = self.project.get_wiki_page('home')
+        self.project.update_node_wiki('home', u'new content', self.auth)
+        NodeWikiPage._clear_caches()
+        assert_is_none(NodeWikiPage.load(shared._id).delta)
+
 class TestWikiViews(OsfTestCase):
 
     def setUp(self):
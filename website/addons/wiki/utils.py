@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
 import os
+import json
 import urllib
 import uuid
+import difflib
+import collections
 
 from pymongo import MongoClient
 import requests
@@ -214,3 +217,66 @@ def serialize_wiki_settings(user, node_ids):
         items.append(item)
 
     return items
+
+
+def make_delta(base, target):
+    """Encode `target` as line operations on `base`: ['=', n] keeps the next n lines of
+    `base`, ['-', n] skips them and ['+', lines] inserts new lines.
+    """
+    base_lines = (base or '').splitlines(True)
+    target_lines = (target or '').splitlines(True)
+    ops = []
+    matcher = difflib.SequenceMatcher(None, base_lines, target_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append(['=', i2 - i1])
+            continue
+        if tag in ('delete', 'replace'):
+            ops.append(['-', i2 - i1])
+        if tag in ('insert', 'replace'):
+            ops.append(['+', target_lines[j1:j2]])
+    return json.dumps(ops)
+
+
+def apply_delta(base, delta):
+    """Rebuild the text a delta from `make_delta` was made for."""
+    base_lines = (base or '').splitlines(True)
+    lines = []
+    position = 0
+    for op, value in json.loads(delta):
+        if op == '=':
+            lines.extend(base_lines[position:position + value])
+            position += value
+        elif op == '-':
+            position += value
+        else:
+            lines.extend(value)
+    return u''.join(lines)
+
+
+class VersionContentCache(object):
+    """Least recently used cache of rebuilt wiki version contents, keyed by page id.
+    The content of a version never changes, so entries never go stale.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.entries = collections.OrderedDict()
+
+    def get(self, key):
+        content = self.entries.pop(key, None)
+        if content is not None:
+            self.entries[key] = content
+        return content
+
+    def set(self, key, content):
+        self.entries.pop(key, None)
+        self.entries[key] = content
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+
+version_content_cache = VersionContentCache(wiki_settings.WIKI_VERSION_CONTENT_CACHE_SIZE)
@@ -76,8 +76,8 @@ def _get_wiki_versions(node, name, anonymous=False):
         return []
 
     versions = [
-        NodeWikiPage.load(version_wiki_id)
-        for version_wiki_id in node.wiki_pages_versions[key]
+        version for version in NodeWikiPage.load_many(node.wiki_pages_versions[key])
+        if version
     ]
 
     return [
@@ -174,7 +174,7 @@ def wiki_page_draft(wname, **kwargs):
     wiki_page = node.get_wiki_page(wname)
 
     return {
-        'wiki_content': wiki_page.content if wiki_page else None,
+        'wiki_content': wiki_page.get_content() if wiki_page else None,
         'wiki_draft': (wiki_page.get_draft(node) if wiki_page
                        else wiki_utils.get_sharejs_content(node, wname)),
     }
@@ -189,7 +189,7 @@ def wiki_page_content(wname, wver=None, **kwargs):
     use_python_render = wiki_page.rendered_before_update if wiki_page else False
 
     return {
-        'wiki_content': wiki_page.content if wiki_page else '',
+        'wiki_content': wiki_page.get_content() if wiki_page else '',
         # Only return rendered version if page was saved before wiki change
         'wiki_rendered': wiki_page.html(node) if use_python_render else '',
     }
@@ -339,7 +339,7 @@ def project_wiki_edit_post(auth, wname, **kwargs):
 
     if wiki_page:
         # Only update node wiki if content has changed
-        if form_wiki_content != wiki_page.content:
+        if form_wiki_content != wiki_page.get_content():
             node.update_node_wiki(wiki_page.page_name, form_wiki_content, auth)
             ret = {'status': 'success'}
         else:
@@ -7,6 +7,7 @@ from framework.exceptions import HTTPError
 
 from website.addons.base import AddonOAuthNodeSettingsBase
 from website.addons.base import AddonOAuthUserSettingsBase
+from website.addons.citations.cache import CachedCitationsMixin
 from website.addons.citations.utils import serialize_folder
 from website.addons.zotero import serializer
 from website.addons.zotero import settings
@@ -17,7 +18,7 @@ from website.oauth.models import ExternalProvider
 # For now, we load 200 citations max and show a message to the user.
 MAX_CITATION_LOAD = 200
 
-class Zotero(ExternalProvider):
+class Zotero(CachedCitationsMixin, ExternalProvider):
     name = "Zotero"
     short_name = "zotero"
     _oauth_version = 1
@@ -30,6 +31,9 @@ class Zotero(ExternalProvider):
     request_token_url = 'https://www.zotero.org/oauth/request'
     default_scopes = ['all']
 
+    cache_ttl = settings.CITATION_CACHE_TTL
+    full_sync_interval = settings.CITATION_CACHE_FULL_SYNC_INTERVAL
+
     _client = None
 
     def handle_callback(self, response):
@@ -61,9 +65,7 @@ class Zotero(ExternalProvider):
 
         return self._client
 
-    def citation_lists(self, extract_folder):
-        """List of CitationList objects, derived from Zotero collections"""
-
+    def _fetch_folders(self, extract_folder):
         client = self.client
 
         # Note: Pagination is the only way to ensure all of the collections
@@ -88,45 +90,25 @@ class Zotero(ExternalProvider):
         collection = self.client.collection(folder_id)
         return collection
 
-    def get_list(self, list_id=None):
-        """Get a single CitationList
-
-        :param str list_id: ID for a Zotero collection. Optional.
-        :return CitationList: CitationList for the collection, or for all documents
+    def _fetch_citations(self, cursor=None):
+        """Fetch the user's citations, or only those changed since ``cursor``,
+        the library version of the previous sync. Zotero reports deletions
+        separately, so deleted items are dropped by the next full sync.
         """
-        if list_id == 'ROOT':
-            list_id = None
-
-        if list_id:
-            citations = []
-            more = True
-            offset = 0
-            while more and len(citations) <= MAX_CITATION_LOAD:
-                page = self.client.collection_items(list_id, content='csljson', size=100, start=offset)
-                citations = citations + page
-                if len(page) == 0 or len(page) < 100:
-                    more = False
-                else:
-                    offset = offset + len(page)
-            return self._citations_for_zotero_collection(citations)
-        else:
-            return self._citations_for_zotero_user()
+        kwargs = {'since': cursor} if cursor is not None else {}
+        citations = self._fetch_pages(self.client.items, **kwargs)
+        return citations, [], self._library_version()
 
-    def _citations_for_zotero_collection(self, collection):
-        """Get all the citations in a specified collection
+    def _fetch_folder_members(self, folder_id):
+        citations = self._fetch_pages(self.client.collection_items, folder_id)
+        return [citation['id'] for citation in citations], citations
 
-        :param  csljson collection: list of csljson documents
-        :return list of citation objects representing said dicts of said documents.
-        """
-        return collection
-
-    def _citations_for_zotero_user(self):
-        """Get all the citations from the user """
+    def _fetch_pages(self, method, *args, **kwargs):
         citations = []
         more = True
         offset = 0
         while more and len(citations) <= MAX_CITATION_LOAD:
-            page = self.client.items(content='csljson', limit=100, start=offset)
+            page = method(*args, content='csljson', limit=100, start=offset, **kwargs)
             citations = citations + page
             if len(page) == 0 or len(page) < 100:
                 more = False
@@ -134,6 +116,15 @@ class Zotero(ExternalProvider):
                 offset = offset + len(page)
         return citations
 
+    def _library_version(self):
+        """Version of the library as of the last request, or None if Zotero did
+        not report it, in which case the next sync is a full one.
+        """
+        response = getattr(self.client, 'request', None)
+        if response is None:
+            return None
+        return response.headers.get('Last-Modified-Version')
+
 
 class ZoteroUserSettings(AddonOAuthUserSettingsBase):
     oauth_provider = Zotero
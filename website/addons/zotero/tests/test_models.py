@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
 
+import datetime
+import json
+
 import mock
 from nose.tools import *  # noqa
 
@@ -15,6 +18,7 @@ from pyzotero.zotero_errors import UserNotAuthorised
 from framework.exceptions import HTTPError
 
 from website.addons.zotero import model
+from website.addons.zotero.tests.utils import mock_responses
 
 
 class ZoteroProviderTestCase(OsfTestCase):
@@ -47,8 +51,7 @@ class ZoteroProviderTestCase(OsfTestCase):
 
         mock_client.collections.return_value = mock_folders
         self.provider._client = mock_client
-        mock_account = mock.Mock()
-        self.provider.account = mock_account
+        self.provider.account = ZoteroAccountFactory()
 
         res = self.provider.citation_lists(ZoteroCitationsProvider()._extract_folder)
         assert_equal(
@@ -60,6 +63,63 @@ class ZoteroProviderTestCase(OsfTestCase):
             'Fake Key'
         )
 
+class ZoteroCitationCacheTestCase(OsfTestCase):
+
+    def setUp(self):
+        super(ZoteroCitationCacheTestCase, self).setUp()
+        self.citations = json.loads(mock_responses['documents'])
+        self.provider = model.Zotero()
+        self.provider.account = ZoteroAccountFactory()
+        self.provider._client = mock.Mock()
+        self.provider._client.items.return_value = self.citations
+        self.provider._client.request.headers = {'Last-Modified-Version': '12'}
+
+    def expire(self, *keys):
+        cache = self.provider.citation_cache
+        cache._set_state(**{key: cache.state[key] - datetime.timedelta(days=2) for key in keys})
+
+    def test_get_list_served_from_cache(self):
+        res = self.provider.get_list('ROOT')
+        assert_equal(res, self.citations)
+        assert_equal(self.provider.get_list(), res)
+        assert_equal(self.provider.client.items.call_count, 1)
+
+    def test_incremental_sync_since_library_version(self):
+        self.provider.get_list('ROOT')
+        self.expire('synced')
+        changed = dict(self.citations[1], title='Changed Title')
+        self.provider.client.items.return_value = [changed]
+        self.provider.client.request.headers = {'Last-Modified-Version': '13'}
+
+        res = self.provider.get_list('ROOT')
+        self.provider.client.items.assert_called_with(content='csljson', limit=100, start=0, since='12')
+        assert_equal(len(res), len(self.citations))
+        assert_equal(res[1]['title'], 'Changed Title')
+        assert_equal(self.provider.citation_cache.state['cursor'], '13')
+
+    def test_full_sync_drops_deleted_items(self):
+        self.provider.get_list('ROOT')
+        self.expire('synced', 'full_synced')
+        self.provider.client.items.return_value = self.citations[1:]
+        res = self.provider.get_list('ROOT')
+        self.provider.client.items.assert_called_with(content='csljson', limit=100, start=0)
+        assert_equal(res, self.citations[1:])
+
+    def test_missing_library_version_forces_full_sync(self):
+        self.provider.client.request = None
+        self.provider.get_list('ROOT')
+        self.expire('synced')
+        self.provider.get_list('ROOT')
+        self.provider.client.items.assert_called_with(content='csljson', limit=100, start=0)
+
+    def test_collection_served_from_cache(self):
+        self.provider.client.collection_items.return_value = self.citations[:2]
+        res = self.provider.get_list('Fake Key')
+        assert_equal(res, self.citations[:2])
+        self.provider.get_list('Fake Key')
+        assert_equal(self.provider.client.collection_items.call_count, 1)
+
+
 class ZoteroNodeSettingsTestCase(OsfTestCase):
 
     def setUp(self):
@@ -10,12 +10,14 @@ from werkzeug.contrib.fixers import ProxyFix
 import framework
 from framework.flask import app, add_handlers
 from framework.logging import logger
+from framework.routing import mako_cache
 from framework.mongo import set_up_storage
 from framework.addons.utils import render_addon_capabilities
 from framework.sentry import sentry
 from framework.mongo import handlers as mongo_handlers
 from framework.tasks import handlers as task_handlers
 from framework.transactions import handlers as transaction_handlers
+from website.search import handlers as search_handlers
 
 import website.models
 from website.routes import make_url_map
@@ -25,6 +27,7 @@ from website.project.licenses import ensure_licenses
 # This import is necessary to set up the archiver signal listeners
 from website.archiver import listeners  # noqa
 from website.mails import listeners  # noqa
+from website.conferences import listeners  # noqa
 
 
 def build_js_config_files(settings):
@@ -53,6 +56,9 @@ def attach_handlers(app, settings):
     """Add callback handlers to ``app`` in the correct order."""
     # Add callback handlers to application
     add_handlers(app, mongo_handlers.handlers)
+    # Teardown handlers run in reverse, so search writes made by queued tasks that
+    # run in-process are still buffered
+    add_handlers(app, search_handlers.handlers)
     add_handlers(app, task_handlers.handlers)
     add_handlers(app, transaction_handlers.handlers)
 
@@ -92,6 +98,22 @@ def build_log_templates(settings):
         build_addon_log_templates(build_fp, settings)
 
 
+def precompile_templates(settings):
+    """Compile the core and addon templates, so that the first page a worker
+    serves is rendered at warm latency. Modules compiled by earlier workers are
+    reused from ``MAKO_MODULE_DIRECTORY``.
+    """
+    directories = [settings.TEMPLATES_PATH] + [
+        os.path.join(settings.ADDON_PATH, addon, 'templates')
+        for addon in settings.ADDONS_REQUESTED
+    ]
+    stats = mako_cache.precompile(settings.TEMPLATES_PATH, directories)
+    logger.info(
+        'Precompiled {compiled} templates in {elapsed:.0f} ms ({failed} failed)'.format(**stats)
+    )
+    return stats
+
+
 def do_set_backends(settings):
     logger.debug('Setting storage backends')
     set_up_storage(
@@ -128,6 +150,9 @@ def init_app(settings_module='website.settings', set_backends=True, routes=True,
             make_url_map(app)
         except AssertionError:  # Route map has already been created
             pass
+        # Templates are not cached in debug mode
+        if not app.debug:
+            precompile_templates(settings)
 
     if attach_request_handlers:
         attach_handlers(app, settings)
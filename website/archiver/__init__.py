@@ -52,6 +52,10 @@ class AggregateStatResult(object):
         self.target_id = target_id
         self.target_name = target_name
         self.targets = [target for target in targets if target]
+        # Totals are folded in once here rather than re-summed over the whole subtree
+        # on every access
+        self.num_files = sum(target.num_files for target in self.targets)
+        self.disk_usage = sum(target.disk_usage for target in self.targets)
 
     def __str__(self):
         return str(self._to_dict())
@@ -68,10 +72,3 @@ class AggregateStatResult(object):
             'disk_usage': self.disk_usage,
         }
 
-    @property
-    def num_files(self):
-        return sum([value.num_files for value in self.targets])
-
-    @property
-    def disk_usage(self):
-        return sum([value.disk_usage for value in self.targets])
@@ -1,4 +1,4 @@
-import functools
+import collections
 
 from framework.auth import Auth
 
@@ -130,29 +130,47 @@ def link_archive_provider(node, user):
     addon.on_add()
     node.save()
 
+def _file_stat_result(fileobj_metadata):
+    return StatResult(
+        target_name=fileobj_metadata['name'],
+        target_id=fileobj_metadata['path'].lstrip('/'),
+        disk_usage=fileobj_metadata.get('size') or 0,
+    )
+
 def aggregate_file_tree_metadata(addon_short_name, fileobj_metadata, user):
-    """Recursively traverse the addon's file tree and collect metadata in AggregateStatResult
+    """Traverse the addon's file tree and collect metadata in AggregateStatResult
+
+    The tree is walked depth first with an explicit stack, so deep trees don't hit the
+    recursion limit; each folder's totals are folded in once, when its last child is done.
 
     :param src_addon: AddonNodeSettings instance of addon being examined
     :param fileobj_metadata: file or folder metadata of current point of reference
     in file tree
     :param user: archive initatior
-    :return: top-most recursive call returns AggregateStatResult containing addon file tree metadata
+    :return: AggregateStatResult containing addon file tree metadata
     """
-    disk_usage = fileobj_metadata.get('size')
     if fileobj_metadata['kind'] == 'file':
-        result = StatResult(
-            target_name=fileobj_metadata['name'],
-            target_id=fileobj_metadata['path'].lstrip('/'),
-            disk_usage=disk_usage or 0,
-        )
-        return result
-    else:
-        return AggregateStatResult(
-            target_id=fileobj_metadata['path'].lstrip('/'),
-            target_name=fileobj_metadata['name'],
-            targets=[aggregate_file_tree_metadata(addon_short_name, child, user) for child in fileobj_metadata.get('children', [])],
-        )
+        return _file_stat_result(fileobj_metadata)
+    # Frames of (folder metadata, iterator over its remaining children, results so far)
+    stack = [(fileobj_metadata, iter(fileobj_metadata.get('children', [])), [])]
+    while True:
+        folder, children, targets = stack[-1]
+        for child in children:
+            if child['kind'] == 'file':
+                targets.append(_file_stat_result(child))
+            else:
+                stack.append((child, iter(child.get('children', [])), []))
+                break
+        else:
+            stack.pop()
+            result = AggregateStatResult(
+                target_id=folder['path'].lstrip('/'),
+                target_name=folder['name'],
+                targets=targets,
+            )
+            if not stack:
+                return result
+            stack[-1][2].append(result)
 
 def before_archive(node, user):
     link_archive_provider(node, user)
@@ -163,39 +181,73 @@ def before_archive(node, user):
     )
     job.set_targets()
 
-def _do_get_file_map(file_tree):
-    """Reduces a tree of folders and files into a list of (<sha256>, <file_metadata>) pairs
+def iter_file_tree(file_tree):
+    """Yield the metadata of every file in a tree of folders and files, breadth first,
+    without copying the pending folders on each step.
     """
-    file_map = []
-    stack = [file_tree]
-    while len(stack):
-        tree_node = stack.pop(0)
+    queue = collections.deque([file_tree])
+    while queue:
+        tree_node = queue.popleft()
         if tree_node['kind'] == 'file':
-            file_map.append((tree_node['extra']['hashes']['sha256'], tree_node))
+            yield tree_node
         else:
-            stack = stack + tree_node['children']
-    return file_map
+            queue.extend(tree_node.get('children', []))
 
-def _memoize_get_file_map(func):
-    cache = {}
-    @functools.wraps(func)
-    def wrapper(node):
-        if node._id not in cache:
-            osf_storage = node.get_addon('osfstorage')
-            file_tree = osf_storage._get_file_tree(user=node.creator)
-            cache[node._id] = _do_get_file_map(file_tree)
-        return func(node, cache[node._id])
-    return wrapper
-
-@_memoize_get_file_map
-def get_file_map(node, file_map):
+def _do_get_file_map(file_tree):
+    """Reduces a tree of folders and files into a list of (<sha256>, <file_metadata>) pairs
     """
-    note:: file_map is injected implictly by the decorator; this method is called like:
+    return [
+        (tree_node['extra']['hashes']['sha256'], tree_node)
+        for tree_node in iter_file_tree(file_tree)
+    ]
+
+
+class FileMapCache(object):
+    """Least recently used cache of file maps, keyed by (archive job, node), holding at
+    most `size` of them so a long-lived worker doesn't keep every map it has built.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.entries = collections.OrderedDict()
+
+    def get(self, key):
+        file_map = self.entries.pop(key, None)
+        if file_map is not None:
+            self.entries[key] = file_map
+        return file_map
+
+    def set(self, key, file_map):
+        self.entries.pop(key, None)
+        self.entries[key] = file_map
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+
+file_map_cache = FileMapCache(settings.ARCHIVER_FILE_MAP_CACHE_SIZE)
+
+def _get_node_file_map(node):
+    job = node.archive_job
+    key = (job._id if job else None, node._id)
+    file_map = file_map_cache.get(key)
+    if file_map is None:
+        osf_storage = node.get_addon('osfstorage')
+        file_tree = osf_storage._get_file_tree(user=node.creator)
+        file_map = _do_get_file_map(file_tree)
+        file_map_cache.set(key, file_map)
+    return file_map
 
-    get_file_map(node)
+def get_file_map(node):
+    """Yield (<sha256>, <file_metadata>, <node_id>) for every OSF Storage file of `node`
+    and its primary components. Components are visited from an explicit stack and
+    their file trees are only fetched once the files before them have been consumed.
     """
-    for (key, value) in file_map:
-        yield (key, value, node._id)
-    for child in node.nodes_primary:
-        for key, value, node_id in get_file_map(child):
-            yield (key, value, node_id)
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        for key, value in _get_node_file_map(current):
+            yield (key, value, current._id)
+        stack.extend(reversed(current.nodes_primary))
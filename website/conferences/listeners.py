@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+"""Keep the conference submission index up to date as submissions' files change."""
+
+from website.addons.base import signals as file_signals
+from website.conferences.utils import update_submissions
+
+
+@file_signals.file_updated.connect
+def update_submission_file(self, node=None, user=None, event_type=None, payload=None):
+    if node is not None:
+        update_submissions(node)
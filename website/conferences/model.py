@@ -6,6 +6,8 @@ from modularodm.exceptions import ModularOdmException
 
 from framework.mongo import StoredObject
 
+from website.util import web_url_for
+
 from website.conferences.exceptions import ConferenceError
 
 
@@ -55,6 +57,63 @@ class Conference(StoredObject):
             raise ConferenceError('Endpoint {0} not found'.format(endpoint))
 
 
+class ConferenceSubmission(StoredObject):
+    """A public node submitted to a conference, with everything the meeting
+    pages show about it. Rows are kept up to date by
+    `website.conferences.utils.update_submissions` when nodes and their files
+    change, and rebuilt by `scripts/reconcile_conference_submissions.py`.
+    """
+    _id = fields.StringField(primary=True, default=lambda: str(bson.ObjectId()))
+    #: Endpoint of the conference
+    conference = fields.StringField(required=True)
+    node = fields.StringField(required=True)
+    title = fields.StringField()
+    node_url = fields.StringField()
+    author = fields.StringField()
+    author_url = fields.StringField()
+    category = fields.StringField()
+    #: Download link and count of the node's first file
+    download_url = fields.StringField(default='')
+    download_count = fields.IntegerField(default=0)
+    date_created = fields.DateTimeField()
+    tags = fields.StringField(list=True)
+
+    __indices__ = [
+        {
+            'key_or_list': [
+                ('conference', 1),
+                ('date_created', -1),
+            ]
+        },
+        {
+            'key_or_list': [
+                ('node', 1),
+            ]
+        },
+    ]
+
+    def serialize(self, idx, conference):
+        """Serialize for the meeting pages.
+
+        :param int idx: Position of the submission among its conference's
+        :param Conference conference: The submission's conference
+        """
+        return {
+            'id': idx,
+            'title': self.title,
+            'nodeUrl': self.node_url,
+            'author': self.author,
+            'authorUrl': self.author_url,
+            'category': self.category,
+            'download': self.download_count,
+            'downloadUrl': self.download_url,
+            'dateCreated': str(self.date_created),
+            'confName': conference.name,
+            'confUrl': web_url_for('conference_results', meeting=conference.endpoint),
+            'tags': ' '.join(self.tags),
+        }
+
+
 class MailRecord(StoredObject):
     _id = fields.StringField(primary=True, default=lambda: str(bson.ObjectId()))
     data = fields.DictionaryField()
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import uuid
+import operator
 
 import requests
 from modularodm import Q
@@ -13,7 +14,8 @@ from website import util
 from website import security
 from website import settings
 from website.project import new_node
-from website.models import User, Node, MailRecord
+from website.files.models import StoredFileNode
+from website.models import User, Node, MailRecord, Conference, ConferenceSubmission
 
 
 def record_message(message, created):
@@ -114,3 +116,126 @@ def upload_attachment(user, node, attachment):
 def upload_attachments(user, node, attachments):
     for attachment in attachments:
         upload_attachment(user, node, attachment)
+
+
+def get_node_conferences(node):
+    """Return the conferences the node is a submission to: those whose
+    endpoint matches one of its tags, if the node is public.
+    """
+    if not node.is_public or node.is_deleted:
+        return []
+    tags = node.tags._to_primary_keys()
+    if not tags:
+        return []
+    return list(Conference.find(
+        reduce(operator.or_, [Q('endpoint', 'iexact', tag) for tag in tags])
+    ))
+
+
+def serialize_submission(node, conference):
+    """Return the fields of the node's row in the conference's submission index."""
+    try:
+        record = next(
+            x for x in
+            StoredFileNode.find(
+                Q('node', 'eq', node) &
+                Q('is_file', 'eq', True)
+            ).limit(1)
+        ).wrapped()
+        download_count = record.get_download_count()
+        download_url = node.web_url_for(
+            'addon_view_or_download_file',
+            path=record.path.strip('/'),
+            provider='osfstorage',
+            action='download',
+            _absolute=True,
+        )
+    except StopIteration:
+        download_url = ''
+        download_count = 0
+
+    # Runs on node save, so don't fail for nodes without visible contributors
+    author = next(iter(node.visible_contributors), node.creator)
+    if conference.field_names['submission1'] in node.system_tags:
+        category = conference.field_names['submission1']
+    else:
+        category = conference.field_names['submission2']
+
+    return {
+        'title': node.title,
+        'node_url': node.url,
+        'author': author.family_name if author.family_name else author.fullname,
+        'author_url': node.creator.url,
+        'category': category,
+        'download_url': download_url,
+        'download_count': download_count,
+        'date_created': node.date_created,
+        'tags': node.tags._to_primary_keys(),
+    }
+
+
+def save_submission(row, node, conference):
+    for key, value in serialize_submission(node, conference).iteritems():
+        setattr(row, key, value)
+    row.save()
+
+
+def update_submission_counts(endpoints):
+    """Store the number of indexed submissions on each of the conferences."""
+    for conference in Conference.find(Q('endpoint', 'in', list(endpoints))):
+        conference.num_submissions = ConferenceSubmission.find(
+            Q('conference', 'eq', conference.endpoint)
+        ).count()
+        conference.save()
+
+
+def update_submissions(node):
+    """Bring the node's rows in the conference submission index up to date,
+    after its tags, privacy, contributors or files change.
+    """
+    conferences = get_node_conferences(node)
+    rows = dict(
+        (row.conference, row)
+        for row in ConferenceSubmission.find(Q('node', 'eq', node._id))
+    )
+    if not conferences and not rows:
+        return
+    endpoints = set(rows)
+    for conference in conferences:
+        row = rows.pop(conference.endpoint, None)
+        if row is None:
+            row = ConferenceSubmission(conference=conference.endpoint, node=node._id)
+            endpoints.add(conference.endpoint)
+        save_submission(row, node, conference)
+    for row in rows.values():
+        ConferenceSubmission.remove_one(row)
+    update_submission_counts(endpoints)
+
+
+def reconcile_submissions(conference):
+    """Rebuild the conference's submission index from its tagged nodes, also
+    refreshing download counts, which are not updated as files are downloaded.
+
+    :return: Number of submissions
+    """
+    rows = dict(
+        (row.node, row)
+        for row in ConferenceSubmission.find(Q('conference', 'eq', conference.endpoint))
+    )
+    nodes = Node.find(
+        Q('tags', 'iexact', conference.endpoint) &
+        Q('is_public', 'eq', True) &
+        Q('is_deleted', 'eq', False)
+    )
+    count = 0
+    for node in nodes:
+        row = rows.pop(node._id, None)
+        if row is None:
+            row = ConferenceSubmission(conference=conference.endpoint, node=node._id)
+        save_submission(row, node, conference)
+        count += 1
+    for row in rows.values():
+        ConferenceSubmission.remove_one(row)
+    conference.num_submissions = count
+    conference.save()
+    return count
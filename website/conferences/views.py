@@ -14,15 +14,13 @@ from framework.transactions.context import TokuTransaction
 from framework.transactions.handlers import no_auto_transaction
 
 from website import settings
-from website.models import Node, Tag
 from website.util import web_url_for
 from website.mails import send_mail
-from website.files.models import StoredFileNode
 from website.mails import CONFERENCE_SUBMITTED, CONFERENCE_INACTIVE, CONFERENCE_FAILED
 
 from website.conferences import utils, signals
 from website.conferences.message import ConferenceMessage, ConferenceError
-from website.conferences.model import Conference
+from website.conferences.model import Conference, ConferenceSubmission
 
 
 logger = logging.getLogger(__name__)
@@ -138,62 +136,19 @@ def add_poster_by_email(conference, message):
         signals.osf4m_user_created.send(user, conference=conference, node=node)
 
 
-def _render_conference_node(node, idx, conf):
-    try:
-        record = next(
-            x for x in
-            StoredFileNode.find(
-                Q('node', 'eq', node) &
-                Q('is_file', 'eq', True)
-            ).limit(1)
-        ).wrapped()
-        download_count = record.get_download_count()
-
-        download_url = node.web_url_for(
-            'addon_view_or_download_file',
-            path=record.path.strip('/'),
-            provider='osfstorage',
-            action='download',
-            _absolute=True,
-        )
-    except StopIteration:
-        download_url = ''
-        download_count = 0
-
-    author = node.visible_contributors[0]
-    tags = [tag._id for tag in node.tags]
-
-    return {
-        'id': idx,
-        'title': node.title,
-        'nodeUrl': node.url,
-        'author': author.family_name if author.family_name else author.fullname,
-        'authorUrl': node.creator.url,
-        'category': conf.field_names['submission1'] if conf.field_names['submission1'] in node.system_tags else conf.field_names['submission2'],
-        'download': download_count,
-        'downloadUrl': download_url,
-        'dateCreated': str(node.date_created),
-        'confName': conf.name,
-        'confUrl': web_url_for('conference_results', meeting=conf.endpoint),
-        'tags': ' '.join(tags)
-    }
-
-
 def conference_data(meeting):
     try:
         conf = Conference.find_one(Q('endpoint', 'iexact', meeting))
     except ModularOdmException:
         raise HTTPError(httplib.NOT_FOUND)
 
-    nodes = Node.find(
-        Q('tags', 'iexact', meeting) &
-        Q('is_public', 'eq', True) &
-        Q('is_deleted', 'eq', False)
-    )
+    submissions = ConferenceSubmission.find(
+        Q('conference', 'eq', conf.endpoint)
+    ).sort('-date_created')
 
     ret = [
-        _render_conference_node(each, idx, conf)
-        for idx, each in enumerate(nodes)
+        each.serialize(idx, conf)
+        for idx, each in enumerate(submissions)
     ]
     return ret
 
@@ -223,33 +178,18 @@ def conference_results(meeting):
     }
 
 def conference_submissions(**kwargs):
-    """Return data for all OSF4M submissions.
-
-    The total number of submissions for each meeting is calculated and cached
-    in the Conference.num_submissions field.
+    """Return data for all OSF4M submissions, from the conference submission
+    index maintained by `website.conferences.utils.update_submissions`.
     """
+    conferences = dict((conf.endpoint, conf) for conf in Conference.find())
+    counts = dict.fromkeys(conferences, 0)
     submissions = []
-    for conf in Conference.find():
-        # For efficiency, we filter by tag first, then node
-        # instead of doing a single Node query
-        projects = set()
-        for tag in Tag.find(Q('_id', 'iexact', conf.endpoint)):
-            for node in tag.node__tagged:
-                if not node:
-                    continue
-                if not node.is_public or node.is_deleted:
-                    continue
-                projects.add(node)
-
-        for idx, node in enumerate(projects):
-            submissions.append(_render_conference_node(node, idx, conf))
-        num_submissions = len(projects)
-        # Cache the number of submissions
-        conf.num_submissions = num_submissions
-        conf.save()
-        if num_submissions < settings.CONFERENCE_MIN_COUNT:
+    for submission in ConferenceSubmission.find().sort('-date_created'):
+        conf = conferences.get(submission.conference)
+        if conf is None:
             continue
-    submissions.sort(key=lambda submission: submission['dateCreated'], reverse=True)
+        submissions.append(submission.serialize(counts[conf.endpoint], conf))
+        counts[conf.endpoint] += 1
 
     return {'submissions': submissions}
 
@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+
+from framework.tasks import app as celery_app
+
+from website.discovery.utils import update_snapshot
+
+
+@celery_app.task(name='discovery.update_activity_snapshot')
+def update_activity_snapshot():
+    """Recompute the public activity page's snapshot, fetching popular nodes from Piwik."""
+    update_snapshot()
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""The public activity page is served from a snapshot of its node lists, kept in
+the ``discoverysnapshot`` collection and updated by the
+``discovery.update_activity_snapshot`` task, so that requests do not wait on Piwik.
+"""
+import logging
+import datetime
+
+import requests
+from modularodm import Q
+
+from framework.mongo import database
+from framework.analytics.piwik import PiwikClient
+
+from website import settings
+from website.project import Node
+from website.project.utils import recent_public_registrations
+
+logger = logging.getLogger(__name__)
+
+#: Bump when the snapshot's layout changes; older snapshots are ignored
+SNAPSHOT_VERSION = 1
+SNAPSHOT_ID = 'activity'
+LIST_SIZE = 10
+
+NODE_LISTS = (
+    'recent_public_projects',
+    'recent_public_registrations',
+    'popular_public_projects',
+    'popular_public_registrations',
+)
+
+
+def get_popular_node_hits():
+    """Return ``(node id, hits, visits)`` for the nodes most viewed last week,
+    most viewed first.
+    """
+    # get the date for exactly one week ago
+    target_date = datetime.date.today() - datetime.timedelta(weeks=1)
+    client = PiwikClient(
+        url=settings.PIWIK_HOST,
+        auth_token=settings.PIWIK_ADMIN_TOKEN,
+        site_id=settings.PIWIK_SITE_ID,
+        period='week',
+        date=target_date.strftime('%Y-%m-%d'),
+        timeout=settings.PIWIK_TIMEOUT,
+    )
+    project_ids = [
+        x for x in client.custom_variables if x.label == 'Project ID'
+    ][0].values
+    return [(x.value, x.actions, x.visits) for x in project_ids]
+
+
+def resolve_popular_nodes(node_ids):
+    """Return the ids of the first public projects and registrations among
+    ``node_ids``, in order. Candidates are filtered with one query, and the
+    registrations among them loaded with one more to check for retractions.
+    """
+    flags = dict(
+        (document['_id'], document.get('is_registration'))
+        for document in database['node'].find(
+            {'_id': {'$in': list(node_ids)}, 'is_public': True, 'is_deleted': False},
+            {'is_registration': True},
+        )
+    )
+    projects = [nid for nid in node_ids if flags.get(nid) is False][:LIST_SIZE]
+    registration_ids = [nid for nid in node_ids if flags.get(nid)]
+    registrations = [
+        node._id for node in Node.load_many(registration_ids)
+        if node is not None and not node.is_retracted
+    ][:LIST_SIZE]
+    return projects, registrations
+
+
+def compute_snapshot(popular=True, previous=None):
+    """Compute the node lists of the public activity page.
+
+    :param bool popular: Whether to fetch popular nodes from Piwik
+    :param dict previous: Snapshot whose popular nodes are kept if Piwik
+        cannot be reached
+    """
+    recent_projects = Node.find(
+        Q('category', 'eq', 'project') &
+        Q('is_public', 'eq', True) &
+        Q('is_deleted', 'eq', False) &
+        Q('is_registration', 'eq', False)
+    ).sort(
+        '-date_created'
+    ).limit(LIST_SIZE)
+
+    snapshot = {
+        '_id': SNAPSHOT_ID,
+        'version': SNAPSHOT_VERSION,
+        'date': datetime.datetime.utcnow(),
+        'recent_public_projects': [node._id for node in recent_projects],
+        'recent_public_registrations': [node._id for node in recent_public_registrations(LIST_SIZE)],
+        'popular_public_projects': [],
+        'popular_public_registrations': [],
+        'hits': {},
+    }
+
+    if popular and settings.PIWIK_HOST:
+        try:
+            node_hits = get_popular_node_hits()
+        except (requests.exceptions.RequestException, ValueError, IndexError) as error:
+            logger.error('Could not fetch popular nodes from Piwik: {0!r}'.format(error))
+            if previous:
+                for key in ('popular_public_projects', 'popular_public_registrations', 'hits'):
+                    snapshot[key] = previous[key]
+        else:
+            projects, registrations = resolve_popular_nodes([nid for nid, _, _ in node_hits])
+            shown = set(projects + registrations)
+            snapshot.update({
+                'popular_public_projects': projects,
+                'popular_public_registrations': registrations,
+                'hits': dict(
+                    (nid, {'hits': hits, 'visits': visits})
+                    for nid, hits, visits in node_hits if nid in shown
+                ),
+            })
+
+    return snapshot
+
+
+def get_snapshot():
+    """Return the stored snapshot, or None if there is none of the current version."""
+    snapshot = database['discoverysnapshot'].find_one({'_id': SNAPSHOT_ID})
+    if snapshot is None or snapshot.get('version') != SNAPSHOT_VERSION:
+        return None
+    return snapshot
+
+
+def update_snapshot():
+    snapshot = compute_snapshot(previous=get_snapshot())
+    database['discoverysnapshot'].save(snapshot)
+    return snapshot
+
+
+def load_snapshot_nodes(snapshot):
+    """Load the nodes of the snapshot's lists with a single query, leaving out
+    nodes made private or deleted since it was taken.
+
+    :return: dict mapping each list name to its nodes
+    """
+    node_ids = list(set(nid for key in NODE_LISTS for nid in snapshot[key]))
+    nodes = dict(zip(node_ids, Node.load_many(node_ids)))
+    return dict(
+        (key, [
+            nodes[nid] for nid in snapshot[key]
+            if nodes[nid] is not None and nodes[nid].is_public and not nodes[nid].is_deleted
+        ])
+        for key in NODE_LISTS
+    )
@@ -14,10 +14,12 @@ from dateutil.parser import parse as parse_date
 
 from framework.guid.model import Guid
 from framework.mongo import StoredObject
+from framework.mongo import database
 from framework.mongo.utils import unique_on
-from framework.analytics import get_basic_counters
+from framework.analytics import get_basic_counters, get_basic_counters_many
 
 from website import util
+from website import settings
 from website.files import utils
 from website.files import exceptions
 
@@ -103,6 +105,12 @@ class StoredFileNode(StoredObject):
             ('is_file', pymongo.ASCENDING),
             ('provider', pymongo.ASCENDING)
         ]
+    }, {
+        # Finds the files of a FileVersion, whose listings it invalidates when saved
+        'unique': False,
+        'key_or_list': [
+            ('versions', pymongo.ASCENDING)
+        ]
     }]
 
     _id = fields.StringField(primary=True, default=lambda: str(bson.ObjectId()))
@@ -353,7 +361,15 @@ class FileNode(object):
         Implemented top level so that child class may override it
         and just call super.save rather than self.stored_object.save
         """
-        return self.stored_object.save()
+        saved_fields = self.stored_object.save()
+        if saved_fields:
+            self._invalidate_listings()
+        return saved_fields
+
+    def _invalidate_listings(self, *folder_ids):
+        """Drop the cached listing of this FileNode's parent and of any `folder_ids`."""
+        parent = self.stored_object.parent
+        utils.invalidate_listings(parent._id if parent else None, *folder_ids)
 
     def serialize(self, **kwargs):
         return {
@@ -378,13 +394,16 @@ class FileNode(object):
         """
         trashed = self._create_trashed(user=user, parent=parent)
         self._repoint_guids(trashed)
+        self._invalidate_listings()
         StoredFileNode.remove_one(self.stored_object)
         return trashed
 
-    def copy_under(self, destination_parent, name=None):
-        return utils.copy_files(self, destination_parent.node, destination_parent, name=name)
+    def copy_under(self, destination_parent, name=None, progress=None):
+        return utils.copy_files(self, destination_parent.node, destination_parent, name=name, progress=progress)
 
     def move_under(self, destination_parent, name=None):
+        # Saving only invalidates the listing of the new parent
+        self._invalidate_listings()
         self.name = name or self.name
         self.parent = destination_parent.stored_object
         self._update_node(save=True)
@@ -581,7 +600,25 @@ class File(FileNode):
 
         return count or 0
 
-    def serialize(self):
+    @classmethod
+    def get_download_counts(cls, node_id, file_ids):
+        """Download counts of the files `file_ids` of one node, read with a single query.
+
+        :returns: dict mapping file id to download count
+        """
+        pages = dict((':'.join(['download', node_id, file_id]), file_id) for file_id in file_ids)
+        return dict(
+            (pages[page], total or 0)
+            for page, (_, total) in get_basic_counters_many(pages).iteritems()
+        )
+
+    def serialize(self, downloads=None):
+        """
+        :param int downloads: Download count, if already known; looked up otherwise
+        """
+        if downloads is None:
+            downloads = self.get_download_count()
+
         if not self.versions:
             return dict(
                 super(File, self).serialize(),
@@ -589,7 +626,7 @@ class File(FileNode):
                 version=None,
                 modified=None,
                 contentType=None,
-                downloads=self.get_download_count(),
+                downloads=downloads,
                 checkout=self.checkout._id if self.checkout else None,
             )
 
@@ -597,7 +634,7 @@ class File(FileNode):
         return dict(
             super(File, self).serialize(),
             size=version.size,
-            downloads=self.get_download_count(),
+            downloads=downloads,
             checkout=self.checkout._id if self.checkout else None,
             version=version.identifier if self.versions else None,
             contentType=version.content_type if self.versions else None,
@@ -616,15 +653,100 @@ class Folder(FileNode):
         """
         return FileNode.find(Q('parent', 'eq', self._id))
 
-    def delete(self, recurse=True, user=None, parent=None):
+    def serialize_children(self):
+        """Serialize every child of this folder with a bounded number of queries: one for the
+        children, one for their versions and one for their download counts.
+
+        Unless `settings.CACHE_FILE_LISTINGS` is off, the serialized children are kept in the
+        `filelistings` collection until one of them is saved, moved or deleted. Download
+        counts change on every download, so they are always read fresh.
+        """
+        listing = utils.get_cached_listing(self._id) if settings.CACHE_FILE_LISTINGS else None
+        if listing is None:
+            children = list(self.children)
+            utils.prefetch_versions(children)
+            listing = [
+                child.serialize(downloads=0) if child.is_file else child.serialize()
+                for child in children
+            ]
+            if settings.CACHE_FILE_LISTINGS:
+                utils.cache_listing(self._id, listing)
+
+        counts = File.get_download_counts(
+            self.node._id,
+            [entry['id'] for entry in listing if entry['kind'] == 'file']
+        )
+        for entry in listing:
+            if entry['kind'] == 'file':
+                entry['downloads'] = counts[entry['id']]
+        return listing
+
+    def delete(self, recurse=True, user=None, parent=None, progress=None):
+        """
+        :param progress: Called with the number of descendants trashed so far after each batch
+        """
         trashed = self._create_trashed(user=user, parent=parent)
         if recurse:
-            for child in self.children:
-                child.delete(user=user, parent=trashed)
+            self._trash_descendants(user=user, progress=progress)
         self._repoint_guids(trashed)
+        self._invalidate_listings(self._id)
         StoredFileNode.remove_one(self.stored_object)
         return trashed
 
+    def _trash_descendants(self, user=None, progress=None):
+        """Move everything below this folder into the TrashedFileNode collection without
+        recursing. Each batch of descendants costs one insert into the trash, one update
+        repointing their guids and one remove.
+        """
+        deleted_by = (user._id, user._name) if user else None
+        deleted_on = datetime.datetime.utcnow()
+        trashed_count = 0
+        for batch in utils.walk_subtree(self._id):
+            ids = [document['_id'] for document in batch]
+            database[TrashedFileNode._name].insert([
+                self._trashed_document(document, deleted_by, deleted_on)
+                for document in batch
+            ])
+            database[Guid._name].update(
+                {'referent.0': {'$in': ids}, 'referent.1': StoredFileNode._name},
+                {'$set': {'referent.1': TrashedFileNode._name}},
+                multi=True,
+            )
+            database[StoredFileNode._name].remove({'_id': {'$in': ids}})
+            utils.invalidate_listings(*[document['_id'] for document in batch if not document['is_file']])
+            self._descendants_trashed(batch)
+            trashed_count += len(batch)
+            if progress:
+                progress(trashed_count)
+        if trashed_count:
+            # The raw writes above bypassed the ODM, drop anything it cached
+            StoredFileNode._clear_caches()
+            TrashedFileNode._clear_caches()
+            Guid._clear_caches()
+        return trashed_count
+
+    @staticmethod
+    def _trashed_document(document, deleted_by, deleted_on):
+        """The raw TrashedFileNode equivalent of a raw StoredFileNode document."""
+        trashed = dict(
+            (key, value) for key, value in document.iteritems()
+            if key in TrashedFileNode._fields
+        )
+        trashed['parent'] = (document['parent'], TrashedFileNode._name)
+        trashed['deleted_by'] = deleted_by
+        trashed['deleted_on'] = deleted_on
+        return trashed
+
+    def _descendants_trashed(self, documents):
+        """Called with each batch of raw documents moved to the trash by `delete`."""
+        pass
+
+    def _descendants_copied(self, documents):
+        """Called with each batch of raw documents inserted below this folder when it
+        is made by `copy_under`.
+        """
+        pass
+
     def append_file(self, name, path=None, materialized_path=None, save=True):
         return self._create_child(name, FileNode.FILE, path=path, materialized_path=materialized_path, save=save)
 
@@ -702,6 +824,21 @@ class FileVersion(StoredObject):
     def is_duplicate(self, other):
         return self.location_hash == other.location_hash
 
+    def save(self, *args, **kwargs):
+        saved_fields = super(FileVersion, self).save(*args, **kwargs)
+        if saved_fields:
+            self._invalidate_listings()
+        return saved_fields
+
+    def _invalidate_listings(self):
+        """Drop the cached listings that show this version's size, dates and hashes,
+        i.e. those of the parents of every file it is a version of.
+        """
+        utils.invalidate_listings(*[
+            document['parent']
+            for document in database[StoredFileNode._name].find({'versions': self._id}, {'parent': True})
+        ])
+
     def update_metadata(self, metadata, save=True):
         self.metadata.update(metadata)
         # metadata has no defined structure so only attempt to set attributes
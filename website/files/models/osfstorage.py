@@ -4,8 +4,9 @@ import os
 
 from modularodm import Q
 
+from website.files import utils
 from website.files import exceptions
-from website.files.models.base import File, Folder, FileNode, FileVersion
+from website.files.models.base import File, Folder, FileNode, FileVersion, StoredFileNode
 
 
 __all__ = ('OsfStorageFile', 'OsfStorageFolder', 'OsfStorageFileNode')
@@ -71,10 +72,10 @@ class OsfStorageFileNode(FileNode):
     def is_checked_out(self):
         return self.checkout is not None
 
-    def delete(self, user=None, parent=None):
+    def delete(self, user=None, parent=None, **kwargs):
         if self.is_checked_out:
             raise exceptions.FileNodeCheckedOutError()
-        return super(OsfStorageFileNode, self).delete(user=user, parent=parent)
+        return super(OsfStorageFileNode, self).delete(user=user, parent=parent, **kwargs)
 
     def move_under(self, destination_parent, name=None):
         if self.is_checked_out:
@@ -99,8 +100,8 @@ class OsfStorageFile(OsfStorageFileNode, File):
     def history(self):
         return [v.metadata for v in self.versions]
 
-    def serialize(self, include_full=None, version=None):
-        ret = super(OsfStorageFile, self).serialize()
+    def serialize(self, include_full=None, version=None, downloads=None):
+        ret = super(OsfStorageFile, self).serialize(downloads=downloads)
         if include_full:
             ret['fullPath'] = self.materialized_path
 
@@ -161,11 +162,21 @@ class OsfStorageFolder(OsfStorageFileNode, Folder):
     def is_checked_out(self):
         if self.checkout:
             return True
-        for child in self.children:
-            if child.is_checked_out:
+        for batch in utils.walk_subtree(self._id, fields={'checkout': True}):
+            if any(document.get('checkout') for document in batch):
                 return True
         return False
 
+    def _descendants_trashed(self, documents):
+        from website.search import search
+        search.delete_files([document['_id'] for document in documents if document['is_file']])
+
+    def _descendants_copied(self, documents):
+        from website.search import search
+        file_ids = [document['_id'] for document in documents if document['is_file']]
+        if file_ids:
+            search.update_files(each.wrapped() for each in StoredFileNode.load_many(file_ids) if each)
+
     def serialize(self, include_full=False, version=None):
         # Versions just for compatability
         ret = super(OsfStorageFolder, self).serialize()
@@ -0,0 +1,54 @@
+"""
+Background tasks for deleting and copying file trees too large to handle within a request.
+Progress is reported through the task state as ``{'done': <file nodes handled so far>}``.
+"""
+import logging
+
+from framework.tasks import app as celery_app
+from framework.auth.core import User
+from framework.transactions.context import TokuTransaction
+
+from website.files.models import FileNode
+
+
+logger = logging.getLogger(__name__)
+
+
+def _progress_reporter(task, action, file_node_id):
+    def report(done):
+        logger.info('{0} {1}: {2} descendants done'.format(action, file_node_id, done))
+        if task.request.id:
+            task.update_state(state='PROGRESS', meta={'done': done})
+    return report
+
+
+@celery_app.task(bind=True, name='files.delete_folder', max_retries=0)
+def delete_folder(self, folder_id, user_id=None):
+    """Move the folder `folder_id` and everything below it to the trash.
+
+    :return: The id of the trashed folder
+    """
+    folder = FileNode.load(folder_id)
+    if folder is None or folder.is_file:
+        logger.warn('{} is not a folder, not deleting'.format(folder_id))
+        return None
+    with TokuTransaction():
+        trashed = folder.delete(
+            user=User.load(user_id) if user_id else None,
+            progress=_progress_reporter(self, 'Deleting', folder_id),
+        )
+    return trashed._id
+
+
+@celery_app.task(bind=True, name='files.copy_folder', max_retries=0)
+def copy_folder(self, folder_id, destination_id, name=None):
+    """Copy the folder `folder_id` and everything below it into the folder `destination_id`,
+    which may belong to another node.
+
+    :return: The id of the copy
+    """
+    folder = FileNode.load(folder_id)
+    destination = FileNode.load(destination_id)
+    with TokuTransaction():
+        cloned = folder.copy_under(destination, name=name, progress=_progress_reporter(self, 'Copying', folder_id))
+    return cloned._id
@@ -1,11 +1,51 @@
+import itertools
+
+import bson
+import pymongo
 from modularodm.exceptions import ValidationValueError
 
+from framework.mongo import database
+
+
+# Number of file nodes read, inserted or removed per query when working on a whole subtree
+TREE_BATCH_SIZE = 500
+
 
-def copy_files(src, target_node, parent=None, name=None):
+def walk_subtree(folder_id, fields=None, batch_size=None, collection='storedfilenode'):
+    """Yield the raw documents of every file node below `folder_id` in lists of at most
+    `batch_size`, one level of the tree at a time. Iterative, so depth is not limited by
+    the recursion limit, and each level costs one query per `batch_size` folders.
+
+    Documents of a batch may be removed by the caller before asking for the next one.
+
+    :param dict fields: Projection; `is_file` is always included
+    """
+    batch_size = batch_size or TREE_BATCH_SIZE
+    if fields is not None:
+        fields = dict(fields, is_file=True)
+    parent_ids = [folder_id]
+    while parent_ids:
+        folder_ids = []
+        for start in range(0, len(parent_ids), batch_size):
+            cursor = database[collection].find(
+                {'parent': {'$in': parent_ids[start:start + batch_size]}},
+                fields,
+            )
+            while True:
+                batch = list(itertools.islice(cursor, batch_size))
+                if not batch:
+                    break
+                folder_ids.extend(document['_id'] for document in batch if not document['is_file'])
+                yield batch
+        parent_ids = folder_ids
+
+
+def copy_files(src, target_node, parent=None, name=None, progress=None):
     """Copy the files from src to the target node
     :param Folder src: The source to copy children from
     :param Node target_node: The node settings of the project to copy files to
     :param Folder parent: The parent of to attach the clone of src to, if applicable
+    :param progress: Called with the number of descendants copied so far after each batch
     """
     assert not parent or not parent.is_file, 'Parent must be a folder'
 
@@ -20,12 +60,35 @@ def copy_files(src, target_node, parent=None, name=None):
     cloned.save()
 
     if not src.is_file:
-        for child in src.children:
-            copy_files(child, target_node, parent=cloned)
+        copy_descendants(src._id, cloned._id, target_node._id, progress=progress, copied=cloned._descendants_copied)
 
     return cloned
 
 
+def copy_descendants(src_id, dest_id, target_node_id, progress=None, copied=None):
+    """Copy everything below the folder `src_id` under the folder `dest_id` with one
+    insert per batch of file nodes.
+
+    :param copied: Called with the raw documents of each batch once it is inserted
+    """
+    new_ids = {src_id: dest_id}
+    count = 0
+    for batch in walk_subtree(src_id):
+        copies = []
+        for document in batch:
+            new_ids[document['_id']] = str(bson.ObjectId())
+            copy = dict(document, _id=new_ids[document['_id']], parent=new_ids[document['parent']], node=target_node_id)
+            copy.pop('__backrefs', None)
+            copies.append(copy)
+        database['storedfilenode'].insert(copies)
+        if copied:
+            copied(copies)
+        count += len(copies)
+        if progress:
+            progress(count)
+    return count
+
+
 class GenWrapper(object):
     """A Wrapper for MongoQuerySets
     Overrides __iter__ so for loops will always
@@ -67,6 +130,44 @@ class GenWrapper(object):
     def limit(self, *args, **kwargs):
         return self.__class__(self.mqs.limit(*args, **kwargs))
 
+def prefetch_versions(file_nodes):
+    """Load the first and the latest FileVersion of every file in `file_nodes` with one
+    query, so `versions[0]` and `versions[-1]` are answered from the object cache.
+    """
+    from website.files.models.base import FileVersion
+    keys = []
+    for file_node in file_nodes:
+        if file_node.is_file:
+            version_ids = file_node.versions._to_primary_keys()
+            if version_ids:
+                keys.extend([version_ids[0], version_ids[-1]])
+    if keys:
+        FileVersion.load_many(keys)
+
+
+def get_cached_listing(folder_id):
+    """Return the cached serialized children of a folder, or None."""
+    document = database['filelistings'].find_one({'_id': folder_id})
+    return document['children'] if document else None
+
+
+def cache_listing(folder_id, children):
+    try:
+        database['filelistings'].update(
+            {'_id': folder_id},
+            {'_id': folder_id, 'children': children},
+            upsert=True
+        )
+    except pymongo.errors.DocumentTooLarge:
+        pass  # Huge folders are listed without the cache
+
+
+def invalidate_listings(*folder_ids):
+    folder_ids = [folder_id for folder_id in folder_ids if folder_id]
+    if folder_ids:
+        database['filelistings'].remove({'_id': {'$in': folder_ids}})
+
+
 def validate_location(value):
     if value is None:
         return  # Allow for None locations but not broken dicts
@@ -120,6 +120,41 @@ def send_mail(to_addr, mail, mimetype='plain', from_addr=None, mailer=None,
 
             return ret
 
+
+def send_mail_batch(messages, mail, mimetype='plain'):
+    """Send ``mail`` to many recipients. The messages are rendered here and sent
+    in batches of ``settings.MAIL_BATCH_SIZE``, each by one `tasks.send_emails`
+    task over one pooled connection.
+
+    :param messages: Iterable of ``(to_addr, context)`` pairs
+    :param Mail mail: The mail object
+    :param str mimetype: Either 'plain' or 'html'
+    """
+    if not settings.USE_EMAIL:
+        return
+    # Don't use ttls and login in DEBUG_MODE
+    ttls = login = not settings.DEBUG_MODE
+    rendered = [
+        dict(
+            from_addr=settings.FROM_EMAIL,
+            to_addr=to_addr,
+            subject=mail.subject(**context),
+            message=mail.text(**context) if mimetype in ('plain', 'txt') else mail.html(**context),
+            mimetype=mimetype,
+        )
+        for to_addr, context in messages
+    ]
+    for index in range(0, len(rendered), settings.MAIL_BATCH_SIZE):
+        kwargs = dict(
+            messages=rendered[index:index + settings.MAIL_BATCH_SIZE],
+            ttls=ttls,
+            login=login,
+        )
+        if settings.USE_CELERY:
+            tasks.send_emails.apply_async(kwargs=kwargs)
+        else:
+            tasks.send_emails(**kwargs)
+
 # Predefined Emails
 
 TEST = Mail('test', subject='A test email to ${name}')
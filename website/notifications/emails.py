@@ -1,6 +1,9 @@
 from babel import dates, core, Locale
 
+from framework.mongo import database
+
 from website import mails
+from website import settings
 from website import models as website_models
 from website.notifications import constants
 from website.notifications import utils
@@ -43,10 +46,26 @@ def notify(event, user, node, timestamp, **context):
     return sent_users
 
 
+def queue_notify(event, user, node, timestamp, **context):
+    """Call ``notify``, or hand it to a celery task when
+    ``settings.NOTIFY_IN_BACKGROUND`` is set so subscriptions are resolved and digests
+    stored off the request. Only the synchronous call returns the ids notified.
+    """
+    if not (settings.USE_CELERY and settings.NOTIFY_IN_BACKGROUND):
+        return notify(event, user, node, timestamp, **context)
+    from website.notifications.tasks import notify_users
+    if context.get('target_user'):
+        context['target_user'] = context['target_user']._id
+    notify_users.delay(event, user._id, node._id, timestamp, **context)
+    return None
+
+
 def store_emails(recipient_ids, notification_type, event, user, node, timestamp, **context):
     """Store notification emails
 
-    Emails are sent via celery beat as digests
+    Emails are sent via celery beat as digests. The message only differs between
+    recipients by the localized timestamp, so it is rendered once per timezone and
+    locale, and all digests are inserted with one write.
     :param recipient_ids: List of user ids to send mail to.
     :param notification_type: from constants.Notification_types
     :param event: event that triggered notification
@@ -63,73 +82,113 @@ def store_emails(recipient_ids, notification_type, event, user, node, timestamp,
     context['user'] = user
     node_lineage_ids = get_node_lineage(node) if node else []
 
-    for user_id in recipient_ids:
-        if user_id == user._id:
+    recipient_ids = [user_id for user_id in recipient_ids if user_id != user._id]
+    rendered = {}
+    digests = []
+    for user_id, recipient in zip(recipient_ids, website_models.User.load_many(recipient_ids)):
+        if recipient is None:
             continue
-        recipient = website_models.User.load(user_id)
-        context['localized_timestamp'] = localize_timestamp(timestamp, recipient)
-        message = mails.render_message(template, **context)
+        key = (recipient.timezone, recipient.locale)
+        if key not in rendered:
+            context['localized_timestamp'] = localize_timestamp(timestamp, recipient)
+            rendered[key] = mails.render_message(template, **context)
 
         digest = NotificationDigest(
             timestamp=timestamp,
             send_type=notification_type,
             event=event,
             user_id=user_id,
-            message=message,
+            message=rendered[key],
             node_lineage=node_lineage_ids
         )
-        digest.save()
+        digests.append(digest.to_storage())
+    if digests:
+        database['notificationdigest'].insert(digests)
 
 
-def compile_subscriptions(node, event_type, event=None, level=0):
-    """Recurse through node and parents for subscriptions.
+def compile_subscriptions(node, event_type, event=None):
+    """Collect the subscriptions of a node and its parents.
+
+    The subscriptions of the whole lineage, and the users in them, are loaded with a
+    query each; they are then applied from the top-most project down, so that a closer
+    subscription overrides one further up.
 
     :param node: current node
     :param event_type: Generally node_subscriptions_available
     :param event: Particular event such a file_updated that has specific file subs
-    :param level: How deep the recursion is
     :return: a dict of notification types with lists of users.
     """
-    subscriptions = check_node(node, event_type)
+    levels = [(each, event_type) for each in reversed(node.parents)] + [(node, event_type)]
     if event:
-        subscriptions = check_node(node, event)  # Gets particular event subscriptions
-        parent_subscriptions = compile_subscriptions(node, event_type, level=level + 1)  # get node and parent subs
-    elif node.parent_id:
-        parent_subscriptions = \
-            compile_subscriptions(website_models.Node.load(node.parent_id), event_type, level=level + 1)
-    else:
-        parent_subscriptions = check_node(None, event_type)
+        levels.append((node, event))  # Gets particular event subscriptions
+    subscriptions = NotificationSubscription.load_many(
+        utils.to_subscription_key(each._id, each_event) for each, each_event in levels
+    )
+    users = load_subscribers(subscriptions)
+
+    compiled = check_node(None, event_type)
+    for (each, _), subscription in zip(levels, subscriptions):
+        compiled = merge_subscriptions(compiled, readable_subscribers(each, subscription, users))
+    for notification_type in compiled:
+        compiled[notification_type], removed = utils.separate_users(node, compiled[notification_type])
+    return compiled
+
+
+def merge_subscriptions(parent_subscriptions, subscriptions):
+    """Apply the subscriptions of one node on top of those of its parents."""
+    merged = {}
     for notification_type in parent_subscriptions:
-        p_sub_n = parent_subscriptions[notification_type]
-        p_sub_n.extend(subscriptions[notification_type])
+        p_sub_n = parent_subscriptions[notification_type] + subscriptions[notification_type]
         for nt in subscriptions:
             if notification_type != nt:
                 p_sub_n = list(set(p_sub_n).difference(set(subscriptions[nt])))
-        if level == 0:
-            p_sub_n, removed = utils.separate_users(node, p_sub_n)
-        parent_subscriptions[notification_type] = p_sub_n
-    return parent_subscriptions
+        merged[notification_type] = p_sub_n
+    return merged
+
+
+def load_subscribers(subscriptions):
+    """Map id to User for everyone in ``subscriptions``, loaded with one query."""
+    user_ids = set()
+    for subscription in subscriptions:
+        if subscription:
+            for notification_type in constants.NOTIFICATION_TYPES:
+                user_ids.update(getattr(subscription, notification_type)._to_primary_keys())
+    return {
+        user._id: user
+        for user in website_models.User.load_many(user_ids)
+        if user
+    }
+
+
+def readable_subscribers(node, subscription, users):
+    """Ids of the users in ``subscription`` that can read ``node``, by notification type."""
+    node_subscriptions = {key: [] for key in constants.NOTIFICATION_TYPES}
+    if subscription:
+        for notification_type in node_subscriptions:
+            for user_id in getattr(subscription, notification_type)._to_primary_keys():
+                user = users.get(user_id)
+                if user and node.has_permission(user, 'read'):
+                    node_subscriptions[notification_type].append(user_id)
+    return node_subscriptions
 
 
 def check_node(node, event):
     """Return subscription for a particular node and event."""
-    node_subscriptions = {key: [] for key in constants.NOTIFICATION_TYPES}
+    subscription = None
     if node:
         subscription = NotificationSubscription.load(utils.to_subscription_key(node._id, event))
-        for notification_type in node_subscriptions:
-            users = getattr(subscription, notification_type, [])
-            for user in users:
-                if node.has_permission(user, 'read'):
-                    node_subscriptions[notification_type].append(user._id)
-    return node_subscriptions
+    return readable_subscribers(node, subscription, load_subscribers([subscription]))
 
 
 def get_node_lineage(node):
     """ Get a list of node ids in order from the node to top most project
         e.g. [parent._id, node._id]
     """
-    lineage = [node._id]
+    if node.ancestor_ids or not node.parent_id:
+        return list(reversed(node.ancestor_ids)) + [node._id]
 
+    # Not yet backfilled by scripts/migration/migrate_ancestor_ids.py
+    lineage = [node._id]
     while node.parent_id:
         node = website_models.Node.load(node.parent_id)
         lineage = [node._id] + lineage
@@ -33,7 +33,7 @@ class Event(object):
 
     def perform(self):
         """Call emails.notify to notify users of an action"""
-        emails.notify(
+        emails.queue_notify(
             event=self.event_type,
             user=self.user,
             node=self.node,
@@ -1,8 +1,8 @@
 """
 Tasks for making even transactional emails consolidated.
 """
-from bson.code import Code
-from modularodm import Q
+import time
+import logging
 
 from framework.tasks import app as celery_app
 from framework.mongo import database as db
@@ -14,35 +14,118 @@ from framework.transactions.context import TokuTransaction
 from website.notifications.utils import NotificationsDict
 from website.notifications.model import NotificationDigest
 from website import mails
+from website import settings
+
+
+logger = logging.getLogger(__name__)
 
 
 @celery_app.task(name='notify.send_users_email', max_retries=0)
 def send_users_email(send_type):
     """Find pending Emails and amalgamates them into a single Email.
 
+    Users are handled in chunks of ``settings.DIGEST_CHUNK_SIZE``: each chunk is
+    aggregated in one query, every user in it gets one email, and the digests that
+    were sent are removed with one query. With ``settings.USE_MAIL_POOL``, the
+    chunk's emails are sent together with ``mails.send_mail_batch``.
+
     :param send_type
     :return:
     """
-    grouped_emails = get_users_emails(send_type)
-    if not grouped_emails:
-        return
-    for group in grouped_emails:
-        user = User.load(group['user_id'])
-        if not user:
-            log_exception()
-            continue
-        info = group['info']
-        notification_ids = [message['_id'] for message in info]
-        sorted_messages = group_by_node(info)
-        if sorted_messages:
-            mails.send_mail(
-                to_addr=user.username,
-                mimetype='html',
-                mail=mails.DIGEST,
-                name=user.fullname,
-                message=sorted_messages,
-                callback=remove_notifications(email_notification_ids=notification_ids)
-            )
+    timings = {'aggregate': 0.0, 'send': 0.0, 'remove': 0.0}
+    sent = 0
+    groups = iter_users_emails(send_type)
+    while True:
+        start = time.time()
+        chunk = next(groups, None)
+        timings['aggregate'] += time.time() - start
+        if chunk is None:
+            break
+
+        start = time.time()
+        sent_ids = []
+        messages = []
+        users = User.load_many(group['user_id'] for group in chunk)
+        for group, user in zip(chunk, users):
+            if not user:
+                log_exception()
+                continue
+            info = group['info']
+            sorted_messages = group_by_node(info)
+            if sorted_messages:
+                if settings.USE_MAIL_POOL:
+                    messages.append((user.username, {
+                        'name': user.fullname,
+                        'message': sorted_messages,
+                    }))
+                else:
+                    mails.send_mail(
+                        to_addr=user.username,
+                        mimetype='html',
+                        mail=mails.DIGEST,
+                        name=user.fullname,
+                        message=sorted_messages,
+                    )
+                sent += 1
+            sent_ids.extend(message['_id'] for message in info)
+        if messages:
+            mails.send_mail_batch(messages, mail=mails.DIGEST, mimetype='html')
+        timings['send'] += time.time() - start
+
+        start = time.time()
+        remove_notifications(email_notification_ids=sent_ids)
+        timings['remove'] += time.time() - start
+
+    logger.info('Sent {0} {1} emails (aggregate {aggregate:.2f}s, send {send:.2f}s, remove {remove:.2f}s)'.format(
+        sent, send_type, **timings
+    ))
+
+
+@celery_app.task(name='notify.notify_users', max_retries=0)
+def notify_users(event, user_id, node_id, timestamp, **context):
+    """Run ``emails.notify`` off the request; see ``emails.queue_notify``."""
+    from website.notifications import emails
+    from website.project.model import Node
+
+    if context.get('target_user'):
+        context['target_user'] = User.load(context['target_user'])
+    emails.notify(event, User.load(user_id), Node.load(node_id), timestamp, **context)
+
+
+def iter_users_emails(send_type, chunk_size=None):
+    """Yield the pending emails of ``send_type`` grouped by user, as lists of at most
+    ``chunk_size`` groups. Each chunk of users is grouped by one aggregation pipeline,
+    so no single result holds every pending digest.
+
+    :param send_type: from NOTIFICATION_TYPES
+    :return: generator of lists of groups as returned by ``get_users_emails``
+    """
+    chunk_size = chunk_size or settings.DIGEST_CHUNK_SIZE
+    collection = db['notificationdigest']
+    with TokuTransaction():
+        user_ids = sorted(collection.find({'send_type': send_type}).distinct('user_id'))
+    for index in range(0, len(user_ids), chunk_size):
+        with TokuTransaction():
+            result = collection.aggregate([
+                {'$match': {
+                    'send_type': send_type,
+                    'user_id': {'$in': user_ids[index:index + chunk_size]},
+                }},
+                {'$sort': {'timestamp': 1}},
+                {'$group': {
+                    '_id': '$user_id',
+                    'info': {'$push': {
+                        'message': '$message',
+                        'node_lineage': '$node_lineage',
+                        '_id': '$_id',
+                    }},
+                }},
+                {'$sort': {'_id': 1}},
+            ])
+        yield [
+            {'user_id': group['_id'], 'info': group['info']}
+            for group in result['result']
+        ]
 
 
 def get_users_emails(send_type):
@@ -65,26 +148,7 @@ def get_users_emails(send_type):
                 'user_id': ...
               }]
     """
-    with TokuTransaction():
-        emails = db['notificationdigest'].group(
-            key={'user_id': 1},
-            condition={
-                'send_type': send_type
-            },
-            initial={'info': []},
-            reduce=Code(
-                """
-                function(curr, result) {
-                    result.info.push({
-                        'message': curr.message,
-                        'node_lineage': curr.node_lineage,
-                        '_id': curr._id
-                    });
-                };
-                """
-            )
-        )
-    return emails
+    return [group for chunk in iter_users_emails(send_type) for group in chunk]
 
 
 def group_by_node(notifications):
@@ -105,5 +169,7 @@ def remove_notifications(email_notification_ids=None):
     :param email_notification_ids:
     :return:
     """
-    for email_id in email_notification_ids:
-        NotificationDigest.remove(Q('_id', 'eq', email_id))
+    if not email_notification_ids:
+        return
+    db['notificationdigest'].remove({'_id': {'$in': list(email_notification_ids)}})
+    NotificationDigest._clear_caches()
@@ -28,6 +28,7 @@ from framework import status
 
 from framework.mongo import ObjectId
 from framework.mongo import StoredObject
+from framework.mongo import database
 from framework.mongo import validators
 from framework.addons import AddonModelMixin
 from framework.auth import get_user, User, Auth
@@ -350,12 +351,33 @@ class NodeLog(StoredObject):
     action = fields.StringField(index=True)
     params = fields.DictionaryField()
     should_hide = fields.BooleanField(default=False)
+    # Primary key of the node whose log stream this log was added to; forks and
+    # registrations see it through `Node.log_lineage`
+    node_id = fields.StringField()
+    # Activity index: the node the log was added to and its primary ancestors, and
+    # whether that node is public; kept up to date by `Node._update_activity_index`
+    tree_ids = fields.StringField(list=True)
+    visibility = fields.StringField()
     __indices__ = [
         {
             'key_or_list': [
-                ('__backrefs.logged.node.logs.$', 1)
+                ('node_id', pymongo.ASCENDING),
+                ('_id', pymongo.ASCENDING),
             ],
-        }
+        },
+        {
+            # Seek key for the aggregate log feed of a project tree
+            'key_or_list': [
+                ('tree_ids', pymongo.ASCENDING),
+                ('_id', pymongo.DESCENDING),
+            ],
+        },
+        {
+            'key_or_list': [
+                ('node_id', pymongo.ASCENDING),
+                ('date', pymongo.ASCENDING),
+            ],
+        },
     ]
 
     was_connected_to = fields.ForeignField('node', list=True)
@@ -443,6 +465,9 @@ class NodeLog(StoredObject):
     REGISTRATION_APPROVAL_INITIATED = 'registration_initiated'
     REGISTRATION_APPROVAL_APPROVED = 'registration_approved'
 
+    VISIBILITY_PUBLIC = 'public'
+    VISIBILITY_PRIVATE = 'private'
+
     actions = [CREATED_FROM, PROJECT_CREATED, PROJECT_REGISTERED, PROJECT_DELETED, NODE_CREATED, NODE_FORKED, NODE_REMOVED, POINTER_CREATED, POINTER_FORKED, POINTER_REMOVED, WIKI_UPDATED, WIKI_DELETED, WIKI_RENAMED, MADE_WIKI_PUBLIC, MADE_WIKI_PRIVATE, CONTRIB_ADDED, CONTRIB_REMOVED, CONTRIB_REORDERED, PERMISSIONS_UPDATED, MADE_PRIVATE, MADE_PUBLIC, TAG_ADDED, TAG_REMOVED, EDITED_TITLE, EDITED_DESCRIPTION, UPDATED_FIELDS, FILE_MOVED, FILE_COPIED, FOLDER_CREATED, FILE_ADDED, FILE_UPDATED, FILE_REMOVED, FILE_RESTORED, ADDON_ADDED, ADDON_REMOVED, COMMENT_ADDED, COMMENT_REMOVED, COMMENT_UPDATED, MADE_CONTRIBUTOR_VISIBLE, MADE_CONTRIBUTOR_INVISIBLE, EXTERNAL_IDS_ADDED, EMBARGO_APPROVED, EMBARGO_CANCELLED, EMBARGO_COMPLETED, EMBARGO_INITIATED, RETRACTION_APPROVED, RETRACTION_CANCELLED, RETRACTION_INITIATED, REGISTRATION_APPROVAL_CANCELLED, REGISTRATION_APPROVAL_INITIATED, REGISTRATION_APPROVAL_APPROVED, CITATION_ADDED, CITATION_EDITED, CITATION_REMOVED]
 
     def __repr__(self):
@@ -462,6 +487,22 @@ class NodeLog(StoredObject):
             Node.load(self.params.get('project'))
         )
 
+    @property
+    def logged_nodes(self):
+        """Nodes whose logs include this one: the node it was added to and the forks
+        and registrations made from that node after it was added.
+        """
+        if not self.node_id:
+            return []
+        node_ids = [self.node_id] + [
+            each['_id']
+            for each in database['node'].find(
+                {'log_lineage': {'$elemMatch': {'node': self.node_id, 'until': {'$gte': self._id}}}},
+                {'_id': True},
+            )
+        ]
+        return [node for node in Node.load_many(node_ids) if node]
+
     @property
     def tz_date(self):
         '''Return the timezone-aware date.
@@ -504,6 +545,11 @@ class NodeLog(StoredObject):
             return node_to_check.can_view(auth)
         return False
 
+    def _render_log_contributors(self, contributors, anonymous=False):
+        # Warm the object cache so each contributor below is not a separate query
+        User.load_many(each for each in contributors if isinstance(each, basestring))
+        return [self._render_log_contributor(each, anonymous=anonymous) for each in contributors]
+
     def _render_log_contributor(self, contributor, anonymous=False):
         user = User.load(contributor)
         if not user:
@@ -527,6 +573,109 @@ class NodeLog(StoredObject):
         }
 
 
+class NodeLogStream(object):
+    """The logs of a node, oldest first, read from the `nodelog` collection on demand
+    instead of from a list of ids on the node. Logs are ordered by primary key, which
+    is the order they were added in.
+
+    Supports ``len``, indexing and slicing (one query for ids, one to load the page),
+    iteration in batches and ``append``.
+    """
+
+    BATCH_SIZE = 100
+
+    def __init__(self, node):
+        self.node = node
+
+    def raw_query(self):
+        clauses = [{'node_id': self.node._id}] + [
+            {'node_id': each['node'], '_id': {'$lte': each['until']}}
+            for each in self.node.log_lineage
+        ]
+        return clauses[0] if len(clauses) == 1 else {'$or': clauses}
+
+    def query(self):
+        query = Q('node_id', 'eq', self.node._id)
+        for each in self.node.log_lineage:
+            query = query | (Q('node_id', 'eq', each['node']) & Q('_id', 'lte', each['until']))
+        return query
+
+    def find(self, query=None):
+        """Query this stream like a list of logs could be queried."""
+        if query is not None:
+            return NodeLog.find(self.query() & query)
+        return NodeLog.find(self.query())
+
+    def _to_primary_keys(self, skip=0, limit=0, reverse=False):
+        if self.node._id is None:
+            return []
+        cursor = database['nodelog'].find(self.raw_query(), {'_id': True})
+        cursor = cursor.sort('_id', pymongo.DESCENDING if reverse else pymongo.ASCENDING)
+        return [each['_id'] for each in cursor.skip(skip).limit(limit)]
+
+    def _load(self, log_ids):
+        return [log for log in NodeLog.load_many(log_ids) if log]
+
+    def __len__(self):
+        if self.node._id is None:
+            return 0
+        return database['nodelog'].find(self.raw_query()).count()
+
+    def __nonzero__(self):
+        return bool(self._to_primary_keys(limit=1))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1 or start >= stop:
+                return self._load(self._to_primary_keys())[index]
+            return self._load(self._to_primary_keys(skip=start, limit=stop - start))
+        if index < 0:
+            log_ids = self._to_primary_keys(skip=-index - 1, limit=1, reverse=True)
+        else:
+            log_ids = self._to_primary_keys(skip=index, limit=1)
+        if not log_ids:
+            raise IndexError('log index out of range')
+        return NodeLog.load(log_ids[0])
+
+    def _iter(self, reverse=False):
+        log_ids = self._to_primary_keys(reverse=reverse)
+        for start in range(0, len(log_ids), self.BATCH_SIZE):
+            for log in self._load(log_ids[start:start + self.BATCH_SIZE]):
+                yield log
+
+    def __iter__(self):
+        return self._iter()
+
+    def __reversed__(self):
+        return self._iter(reverse=True)
+
+    def __contains__(self, log):
+        if log is None or self.node._id is None:
+            return False
+        query = {'$and': [self.raw_query(), {'_id': log._id}]}
+        return database['nodelog'].find(query).limit(1).count(with_limit_and_skip=True) > 0
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return '<NodeLogStream({!r})>'.format(self.node._id)
+
+    def append(self, log):
+        """Add ``log`` to the end of the node's own stream."""
+        if self.node._id is None:
+            # The log needs the node's primary key, which is provisioned on first save
+            self.node._ensure_guid()
+        log.node_id = self.node._id
+        log.tree_ids = self.node.activity_tree_ids
+        log.visibility = self.node.log_visibility
+        log.save()
+
+
 class Tag(StoredObject):
 
     _id = fields.StringField(primary=True, validate=MaxLengthValidator(128))
@@ -652,6 +801,30 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
             ('is_public', pymongo.ASCENDING),
             ('is_deleted', pymongo.ASCENDING),
         ]
+    }, {
+        # Seek key for cursor pagination of node lists
+        'unique': False,
+        'key_or_list': [
+            ('date_modified', pymongo.DESCENDING),
+            ('_id', pymongo.DESCENDING),
+        ]
+    }, {
+        # Forks and registrations that reference a node's logs
+        'unique': False,
+        'key_or_list': [
+            ('log_lineage.node', pymongo.ASCENDING),
+        ]
+    }, {
+        # Forks and registrations that share a node's wiki pages
+        'unique': False,
+        'key_or_list': [
+            ('forked_from', pymongo.ASCENDING),
+        ]
+    }, {
+        'unique': False,
+        'key_or_list': [
+            ('registered_from', pymongo.ASCENDING),
+        ]
     }]
 
     # Node fields that trigger an update to Solr on save
@@ -672,6 +845,17 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         'node_license',
     }
 
+    # Node fields shown on conference pages; changes update the node's
+    # conference submissions on save
+    CONFERENCE_SUBMISSION_FIELDS = {
+        'title',
+        'tags',
+        'system_tags',
+        'is_public',
+        'is_deleted',
+        'visible_contributor_ids',
+    }
+
     # Maps category identifier => Human-readable representation for use in
     # titles, menus, etc.
     # Use an OrderedDict so that menu items show in the correct order
@@ -773,7 +957,10 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
     contributors = fields.ForeignField('user', list=True)
     users_watching_node = fields.ForeignField('user', list=True, backref='watched')
 
-    logs = fields.ForeignField('nodelog', list=True, backref='logged')
+    # Logs of the nodes this one was forked or registered from, by reference: each entry
+    # is {'node': <node id>, 'until': <id of the last log of that node to include>}.
+    # The node's own logs are in the `nodelog` collection; see `logs`
+    log_lineage = fields.DictionaryField(list=True)
     tags = fields.ForeignField('tag', list=True, backref='tagged')
 
     # Tags for internal use
@@ -784,6 +971,11 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
     registered_from = fields.ForeignField('node', backref='registrations', index=True)
     root = fields.ForeignField('node', index=True)
     parent_node = fields.ForeignField('node', index=True)
+    # Primary keys of all primary ancestors, nearest first; maintained by `save`
+    ancestor_ids = fields.StringField(list=True, index=True)
+    # Users who are admins on any ancestor and therefore have implicit admin access to
+    # this node; maintained by `save`
+    inherited_admin_ids = fields.StringField(list=True, index=True)
 
     # The node (if any) used as a template for this node's creation
     template_node = fields.ForeignField('node', backref='template_node', index=True)
@@ -1010,9 +1202,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
     def is_admin_parent(self, user):
         if self.has_permission(user, 'admin', check_parent=False):
             return True
-        if self.parent_node:
-            return self.parent_node.is_admin_parent(user)
-        return False
+        return user is not None and user._id in self.get_inherited_admin_ids()
 
     def can_view(self, auth):
         if not auth and not self.is_public:
@@ -1144,14 +1334,30 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         if self.has_permission(user, permission):
             return True
 
-        for node in self.nodes:
-            if not node.primary or node.is_deleted:
-                continue
-
-            if node.has_permission_on_children(user, permission):
-                return True
-
-        return False
+        children = [node for node in self.nodes_primary if not node.is_deleted]
+        if any(not child.ancestor_ids for child in children):
+            # Not yet backfilled by scripts/migration/migrate_ancestor_ids.py
+            return any(child.has_permission_on_children(user, permission) for child in children)
+
+        # Nodes below this one that grant the permission, with their ancestors below this one
+        # (nearest first); a node under a deleted one does not count
+        between = [
+            document['ancestor_ids'][:document['ancestor_ids'].index(self._id)]
+            for document in database['node'].find({
+                'ancestor_ids': self._id,
+                'is_deleted': {'$ne': True},
+                'permissions.{0}'.format(user._id): permission,
+            }, {'ancestor_ids': True})
+        ]
+        if not between:
+            return False
+        deleted_ids = set(
+            document['_id'] for document in database['node'].find({
+                '_id': {'$in': list(set(itertools.chain(*between)))},
+                'is_deleted': True,
+            }, {'_id': True})
+        )
+        return any(deleted_ids.isdisjoint(ancestor_ids) for ancestor_ids in between)
 
     def has_addon_on_children(self, addon):
         """Checks if a given node has a specific addon on child nodes
@@ -1185,33 +1391,71 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
 
     @property
     def visible_contributors(self):
-        return [
-            User.load(_id)
-            for _id in self.visible_contributor_ids
-        ]
+        return User.load_many(self.visible_contributor_ids)
 
     @property
     def parents(self):
-        if self.parent_node:
-            return [self.parent_node] + self.parent_node.parents
-        return []
+        if self.ancestor_ids or not self.parent_node:
+            return [node for node in Node.load_many(self.ancestor_ids) if node]
+        # Not yet backfilled by scripts/migration/migrate_ancestor_ids.py
+        return [self.parent_node] + self.parent_node.parents
+
+    def _get_ancestor_ids(self):
+        parent = self._parent_node
+        if parent is None:
+            return []
+        if not parent.ancestor_ids and parent._parent_node is not None:
+            # Parent not yet backfilled; fall back to walking up the tree
+            return [parent._id] + parent._get_ancestor_ids()
+        return [parent._id] + list(parent.ancestor_ids)
+
+    def get_inherited_admin_ids(self):
+        """Return the admins of the primary ancestors. Every parent has an admin, so an
+        empty `inherited_admin_ids` on a child means it has not been computed yet (not yet
+        backfilled by scripts/consistency/check_inherited_admins.py), and the parent chain
+        is walked instead.
+        """
+        if self.inherited_admin_ids or self._parent_node is None:
+            return list(self.inherited_admin_ids)
+        return self._get_inherited_admin_ids()
+
+    def _get_inherited_admin_ids(self):
+        parent = self._parent_node
+        if parent is None:
+            return []
+        return sorted(set(parent.admin_ids).union(parent.get_inherited_admin_ids()))
+
+    def _update_descendant_tree_fields(self):
+        """Bring `ancestor_ids` and `inherited_admin_ids` of the primary children up to date after
+        this node's position in the tree or its admins changed. Each child's save recurses into its
+        own children only if it changed.
+        """
+        expected_ancestor_ids = [self._id] + list(self.ancestor_ids)
+        expected_admin_ids = sorted(set(self.admin_ids).union(self.inherited_admin_ids))
+        for child in self.nodes_primary:
+            if child.is_deleted:
+                continue
+            if (list(child.ancestor_ids) != expected_ancestor_ids or
+                    list(child.inherited_admin_ids) != expected_admin_ids):
+                child.save(update_piwik=False)
 
     @property
     def admin_contributor_ids(self, contributors=None):
         contributor_ids = self.contributors._to_primary_keys()
-        admin_ids = set()
-        for parent in self.parents:
-            admins = [
-                user for user, perms in parent.permissions.iteritems()
-                if 'admin' in perms
-            ]
-            admin_ids.update(set(admins).difference(contributor_ids))
-        return admin_ids
+        return set(self.get_inherited_admin_ids()).difference(contributor_ids)
+
+    @property
+    def admin_ids(self):
+        """Primary keys of the users with admin permission on this node itself."""
+        return [
+            user_id for user_id, perms in self.permissions.iteritems()
+            if 'admin' in perms
+        ]
 
     @property
     def admin_contributors(self):
         return sorted(
-            [User.load(_id) for _id in self.admin_contributor_ids],
+            User.load_many(self.admin_contributor_ids),
             key=lambda user: user.family_name,
         )
 
@@ -1405,12 +1649,22 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         else:
             suppress_log = False
 
-        self.root = self._root._id
+        self.ancestor_ids = self._get_ancestor_ids()
+        self.inherited_admin_ids = self._get_inherited_admin_ids()
+        self.root = self.ancestor_ids[-1] if self.ancestor_ids else self._id
         self.parent_node = self._parent_node
 
         # If you're saving a property, do it above this super call
         saved_fields = super(Node, self).save(*args, **kwargs)
 
+        tree_fields = {'ancestor_ids', 'inherited_admin_ids', 'permissions', 'nodes'}
+        if self.nodes and tree_fields.intersection(saved_fields):
+            self._update_descendant_tree_fields()
+        if {'ancestor_ids', 'is_public'}.intersection(saved_fields):
+            self._update_activity_index()
+        if self.CONFERENCE_SUBMISSION_FIELDS.intersection(saved_fields):
+            self._update_conference_submissions()
+
         if first_save and is_original and not suppress_log:
             # TODO: This logic also exists in self.use_as_template()
             for addon in settings.ADDONS_AVAILABLE:
@@ -1459,7 +1713,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
 
         # This method checks what has changed.
         if settings.PIWIK_HOST and update_piwik:
-            piwik_tasks.update_node(self._id, saved_fields)
+            piwik_tasks.queue_node_update(self._id, saved_fields)
 
         # Return expected value for StoredObject::save
         return saved_fields
@@ -1497,6 +1751,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         new.wiki_pages_versions = {}
         new.wiki_private_uuids = {}
         new.file_guid_to_share_uuids = {}
+        new.log_lineage = []
 
         # set attributes which may be overridden by `changes`
         new.is_public = False
@@ -1679,6 +1934,8 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
 
     @property
     def depth(self):
+        if self.ancestor_ids or not self.parent_node:
+            return len(self.ancestor_ids)
         return len(self.parents)
 
     def next_descendants(self, auth, condition=lambda auth, node: True):
@@ -1698,23 +1955,88 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         return ret
 
     def get_descendants_recursive(self, include=lambda n: True):
+        # Load the whole primary subtree with one query so the walk below is served from the object cache
+        list(Node.find(Q('ancestor_ids', 'eq', self._id)))
+        return self._get_descendants_recursive(include)
+
+    def _get_descendants_recursive(self, include):
         for node in self.nodes:
             if include(node):
                 yield node
             if node.primary:
-                for descendant in node.get_descendants_recursive(include):
+                for descendant in node._get_descendants_recursive(include):
                     if include(descendant):
                         yield descendant
 
-    def get_aggregate_logs_query(self, auth):
-        ids = [self._id] + [n._id
-                            for n in self.get_descendants_recursive()
-                            if n.can_view(auth)]
-        query = Q('__backrefs.logged.node.logs', 'in', ids) & Q('should_hide', 'ne', True)
-        return query
+    @property
+    def activity_tree_ids(self):
+        """Keys under which this node's logs are found in the activity index."""
+        return [self._id] + list(self.ancestor_ids)
+
+    @property
+    def log_visibility(self):
+        return NodeLog.VISIBILITY_PUBLIC if self.is_public else NodeLog.VISIBILITY_PRIVATE
+
+    def _update_activity_index(self):
+        """Re-tag this node's logs after it moved in the tree or changed privacy."""
+        database['nodelog'].update(
+            {'node_id': self._id},
+            {'$set': {'tree_ids': self.activity_tree_ids, 'visibility': self.log_visibility}},
+            multi=True,
+        )
 
-    def get_aggregate_logs_queryset(self, auth):
+    def _update_conference_submissions(self):
+        # Avoid circular import
+        from website.conferences.utils import update_submissions
+        update_submissions(self)
+
+    def _get_viewable_private_tree_ids(self, auth):
+        """Ids of this node and its private primary descendants that `auth` can view,
+        found with one query instead of checking each descendant.
+        """
+        access = []
+        if auth and auth.user:
+            access.append({'permissions.{0}'.format(auth.user._id): 'read'})
+            access.append({'inherited_admin_ids': auth.user._id})
+        if auth and auth.private_key:
+            links = PrivateLink.find(Q('key', 'eq', auth.private_key) & Q('is_deleted', 'ne', True))
+            for link in links:
+                access.append({'_id': {'$in': link.nodes._to_primary_keys()}})
+        ids = [self._id]
+        if access:
+            ids.extend(
+                each['_id'] for each in database['node'].find({
+                    'ancestor_ids': self._id,
+                    'is_public': {'$ne': True},
+                    '$or': access,
+                }, {'_id': True})
+            )
+        return ids
+
+    def get_aggregate_logs_query(self, auth):
+        """Query the activity index for the logs of this node and of the descendants
+        `auth` can view, including the logs that forks and registrations in the tree
+        inherited from their sources.
+        """
+        private_ids = self._get_viewable_private_tree_ids(auth)
+        query = Q('tree_ids', 'eq', self._id) & (
+            Q('visibility', 'eq', NodeLog.VISIBILITY_PUBLIC) | Q('node_id', 'in', private_ids)
+        )
+        inheriting = database['node'].find({
+            '$or': [{'_id': self._id}, {'ancestor_ids': self._id}],
+            'log_lineage.0': {'$exists': True},
+        }, {'log_lineage': True, 'is_public': True})
+        for document in inheriting:
+            if document.get('is_public') or document['_id'] in private_ids:
+                for each in document['log_lineage']:
+                    query = query | (Q('node_id', 'eq', each['node']) & Q('_id', 'lte', each['until']))
+        return query & Q('should_hide', 'ne', True)
+
+    def get_aggregate_logs_queryset(self, auth, before=None):
+        """Aggregate logs newest first; `before` is a log id to seek past."""
         query = self.get_aggregate_logs_query(auth)
+        if before:
+            query = query & Q('_id', 'lt', before)
         return NodeLog.find(query).sort('-_id')
 
     @property
@@ -1825,13 +2147,32 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         # Return forked content
         return forked
 
+    @property
+    def logs(self):
+        """The logs of this node, including those inherited from the nodes it was forked
+        or registered from, oldest first.
+
+        :rtype: NodeLogStream
+        """
+        return NodeLogStream(self)
+
+    def snapshot_log_lineage(self):
+        """Reference the logs this node has now, for a fork or registration of it."""
+        lineage = [dict(each) for each in self.log_lineage]
+        last = database['nodelog'].find(
+            {'node_id': self._id}, {'_id': True}
+        ).sort('_id', pymongo.DESCENDING).limit(1)
+        for each in last:
+            lineage.insert(0, {'node': self._id, 'until': each['_id']})
+        return lineage
+
     def get_recent_logs(self, n=10):
         """Return a list of the n most recent logs, in reverse chronological
         order.
 
         :param int n: Number of logs to retrieve
         """
-        return list(reversed(self.logs)[:n])
+        return self.logs._load(self.logs._to_primary_keys(limit=n, reverse=True))
 
     def set_title(self, title, auth, save=False):
         """Set the title of this Node and log it.
@@ -2018,7 +2359,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         # correct URLs to that content.
         forked = original.clone()
 
-        forked.logs = self.logs
+        forked.log_lineage = original.snapshot_log_lineage()
         forked.tags = self.tags
 
         # Recursively fork child nodes
@@ -2129,7 +2470,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         registered.contributors = self.contributors
         registered.forked_from = self.forked_from
         registered.creator = self.creator
-        registered.logs = self.logs
+        registered.log_lineage = original.snapshot_log_lineage()
         registered.tags = self.tags
         registered.piwik_site_id = None
         registered.alternative_citations = self.alternative_citations
@@ -2281,7 +2622,6 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
 
         self.date_modified = log.date.replace(tzinfo=None)
 
-        log.save()
         self.logs.append(log)
         if save:
             self.save()
@@ -3022,6 +3362,28 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         return NodeWikiPage.load(id)
 
     # TODO: Move to wiki add-on
+    def _is_wiki_page_current_elsewhere(self, page):
+        """Whether a node other than this one shows ``page`` as a current version.
+        Wiki pages are shared with forks and registrations, so only the node the
+        page was written on and the copies made from it, directly or through
+        other copies, are checked.
+        """
+        node_ids = [page.node._id]
+        seen = set()
+        query = {'_id': {'$in': node_ids}}
+        while node_ids:
+            documents = list(database['node'].find(query, {'wiki_pages_current': True}))
+            for document in documents:
+                if document['_id'] != self._id and page._id in (document.get('wiki_pages_current') or {}).values():
+                    return True
+            node_ids = [document['_id'] for document in documents]
+            seen.update(node_ids)
+            query = {
+                '$or': [{'forked_from': {'$in': node_ids}}, {'registered_from': {'$in': node_ids}}],
+                '_id': {'$nin': list(seen)},
+            }
+        return False
+
     def update_node_wiki(self, name, content, auth):
         """Update the node's wiki page with new content.
 
@@ -3030,10 +3392,12 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         :param auth: All the auth information including user, API key.
         """
         from website.addons.wiki.model import NodeWikiPage
+        from website.addons.wiki import settings as wiki_settings
 
         name = (name or '').strip()
         key = to_mongo_key(name)
 
+        current = None
         if key not in self.wiki_pages_current:
             if key in self.wiki_pages_versions:
                 version = len(self.wiki_pages_versions[key]) + 1
@@ -3043,7 +3407,6 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
             current = NodeWikiPage.load(self.wiki_pages_current[key])
             current.is_current = False
             version = current.version + 1
-            current.save()
 
         new_page = NodeWikiPage(
             page_name=name,
@@ -3055,6 +3418,13 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         )
         new_page.save()
 
+        if current is not None:
+            # Keep the previous version as a delta from the new one, unless a fork
+            # or registration still shows it as its current version
+            if wiki_settings.WIKI_VERSION_DELTAS and not self._is_wiki_page_current_elsewhere(current):
+                current.compress(new_page)
+            current.save()
+
         # check if the wiki page already exists in versions (existed once and is now deleted)
         if key not in self.wiki_pages_versions:
             self.wiki_pages_versions[key] = []
@@ -41,10 +41,10 @@ def get_node_contributors_abbrev(auth, node, **kwargs):
     formatter = 'surname'
     max_count = kwargs.get('max_count', 3)
     if 'user_ids' in kwargs:
-        users = [
-            User.load(user_id) for user_id in kwargs['user_ids']
+        users = User.load_many(
+            user_id for user_id in kwargs['user_ids']
             if user_id in node.visible_contributor_ids
-        ]
+        )
     else:
         users = node.visible_contributors
 
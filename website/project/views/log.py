@@ -1,7 +1,6 @@
 # -*- coding: utf-8 -*-
 import httplib as http
 import logging
-import math
 
 from flask import request
 
@@ -10,7 +9,7 @@ from framework.auth.decorators import collect_auth
 from framework.transactions.handlers import no_auto_transaction
 
 
-from website.views import serialize_log, validate_page_num
+from website.views import serialize_log, serialize_logs, validate_page_num
 from website.project.model import NodeLog
 from website.project.model import has_anonymous_link
 from website.project.decorators import must_be_valid_project
@@ -31,29 +30,33 @@ def get_log(auth, log_id):
     return {'log': serialize_log(log, auth=auth)}
 
 
-def _get_logs(node, count, auth, page=0):
-    """
+def _get_logs(node, count, auth, page=0, before=None):
+    """Get a page of the aggregate logs of a node, newest first. Pages are found by
+    seeking past the last log of the previous page, so the logs are never counted.
 
     :param Node node:
     :param int count:
     :param auth:
+    :param int page: Page to skip to when no `before` cursor is given
+    :param str before: Id of the last log of the previous page
     :return list: List of serialized logs,
-            boolean: if there are more logs
+            str: cursor for the next page, None if there are no more logs
 
     """
-    logs_set = node.get_aggregate_logs_queryset(auth)
-    total = logs_set.count()
-    pages = math.ceil(total / float(count))
-    validate_page_num(page, pages)
+    validate_page_num(page, None)
+    logs_set = node.get_aggregate_logs_queryset(auth, before=before)
+    start = 0 if before else page * count
+    logs = list(logs_set[start:start + count + 1])
+    if page and not logs:
+        # Past the last page
+        raise HTTPError(http.BAD_REQUEST, data=dict(
+            message_long='Invalid value for "page".'
+        ))
 
-    start = page * count
-    stop = start + count
-    logs = [
-        serialize_log(log, auth=auth, anonymous=has_anonymous_link(node, auth))
-        for log in logs_set[start:stop]
-    ]
+    next_cursor = logs[count - 1]._id if len(logs) > count else None
+    logs = serialize_logs(logs[:count], auth=auth, anonymous=has_anonymous_link(node, auth))
 
-    return logs, total, pages
+    return logs, next_cursor
 
 @no_auto_transaction
 @collect_auth
@@ -83,5 +86,5 @@ def get_logs(auth, node, **kwargs):
 
     # Serialize up to `count` logs in reverse chronological order; skip
     # logs that the current user / API key cannot access
-    logs, total, pages = _get_logs(node, count, auth, page)
-    return {'logs': logs, 'total': total, 'pages': pages, 'page': page}
+    logs, next_cursor = _get_logs(node, count, auth, page, before=request.args.get('before'))
+    return {'logs': logs, 'page': page, 'next': next_cursor}
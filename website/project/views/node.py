@@ -910,7 +910,7 @@ def _get_user_activity(node, auth, rescale_ratio):
 
 @must_be_valid_project
 def get_recent_logs(node, **kwargs):
-    logs = list(reversed(node.logs._to_primary_keys()))[:3]
+    logs = node.logs._to_primary_keys(limit=3, reverse=True)
     return {'logs': logs}
 
 
@@ -6,8 +6,12 @@ import re
 import copy
 import math
 import logging
+import itertools
+import threading
 import unicodedata
 import functools
+import contextlib
+import collections
 
 import six
 
@@ -91,6 +95,126 @@ def requires_search(func):
     return wrapped
 
 
+class BulkIndexer(object):
+    """Buffer index and delete actions and send them to elasticsearch with `helpers.bulk`.
+
+    Only the latest action for each document is kept, so saving the same object several
+    times in one request or task costs a single write. The touched indices are refreshed
+    once per flush, and only if the refresh policy asks for it.
+    """
+
+    def __init__(self, chunk_size=None, refresh=None):
+        self.chunk_size = chunk_size or settings.ELASTIC_BULK_CHUNK_SIZE
+        self.refresh = settings.ELASTIC_REFRESH if refresh is None else refresh
+        self.actions = collections.OrderedDict()
+        self.indices = set()
+
+    def __len__(self):
+        return len(self.actions)
+
+    def add(self, action):
+        key = (action['_index'], action['_type'], action['_id'])
+        self.actions.pop(key, None)
+        self.actions[key] = action
+        if len(self.actions) >= self.chunk_size:
+            self._send()
+
+    def _send(self):
+        if not self.actions:
+            return 0
+        actions = self.actions.values()
+        self.actions = collections.OrderedDict()
+        self.indices.update(action['_index'] for action in actions)
+        written, errors = helpers.bulk(es, actions, chunk_size=self.chunk_size, raise_on_error=False)
+        for error in errors:
+            # Deleting a document that was never indexed is not a failure
+            if error.get('delete', {}).get('status') != 404:
+                logger.error('Bulk index action failed: {}'.format(error))
+        return written
+
+    @requires_search
+    def flush(self):
+        """Send all buffered actions and apply the refresh policy. Returns the number of
+        actions elasticsearch accepted.
+        """
+        written = self._send()
+        if self.refresh and self.indices:
+            es.indices.refresh(index=','.join(sorted(self.indices)), ignore=[404])
+        self.indices = set()
+        return written
+
+    def discard(self):
+        self.actions = collections.OrderedDict()
+        self.indices = set()
+
+
+_local = threading.local()
+
+
+def get_bulk_indexer():
+    """Return the indexer buffering writes for the current request or task, if any."""
+    return getattr(_local, 'indexer', None)
+
+
+def begin_bulk_indexing(chunk_size=None, refresh=None):
+    """Start buffering index writes on this thread. Reentrant: a nested call joins the
+    buffer that is already open.
+    """
+    indexer = get_bulk_indexer()
+    if indexer is None:
+        indexer = _local.indexer = BulkIndexer(chunk_size=chunk_size, refresh=refresh)
+        _local.depth = 0
+    _local.depth += 1
+    return indexer
+
+
+def end_bulk_indexing(discard=False):
+    """Stop buffering and flush (or drop) the buffered writes once the outermost caller
+    is done.
+    """
+    indexer = get_bulk_indexer()
+    if indexer is None:
+        return 0
+    _local.depth -= 1
+    if _local.depth > 0:
+        return 0
+    _local.indexer = None
+    if discard or not (indexer.actions or indexer.indices):
+        indexer.discard()
+        return 0
+    return indexer.flush()
+
+
+@contextlib.contextmanager
+def bulk_indexing(chunk_size=None, refresh=None):
+    """Buffer every index write made inside the block and flush them in bulk on exit.
+    Writes are dropped if the block raises.
+    """
+    indexer = begin_bulk_indexing(chunk_size=chunk_size, refresh=refresh)
+    try:
+        yield indexer
+    except Exception:
+        end_bulk_indexing(discard=True)
+        raise
+    end_bulk_indexing()
+
+
+def index_doc(index, doc_type, doc_id, body):
+    indexer = get_bulk_indexer()
+    if indexer is None:
+        es.index(index=index, doc_type=doc_type, id=doc_id, body=body, refresh=settings.ELASTIC_REFRESH)
+    else:
+        indexer.add({'_op_type': 'index', '_index': index, '_type': doc_type, '_id': doc_id, '_source': body})
+
+
+def remove_doc(index, doc_type, doc_id):
+    indexer = get_bulk_indexer()
+    if indexer is None:
+        es.delete(index=index, doc_type=doc_type, id=doc_id, refresh=settings.ELASTIC_REFRESH, ignore=[404])
+    else:
+        indexer.add({'_op_type': 'delete', '_index': index, '_type': doc_type, '_id': doc_id})
+
+
 @requires_search
 def get_aggregations(query, doc_type):
     query['aggregations'] = {
@@ -275,7 +399,10 @@ def update_node_async(self, node_id, index=None, bulk=False):
         self.retry(exc=exc)
 
 @requires_search
-def update_node(node, index=None, bulk=False):
+def update_node(node, index=None, bulk=False, files=True):
+    """Index or remove the document of `node`. Unless `files` is False the documents of
+    the node's osfstorage files are brought up to date as well.
+    """
     index = index or INDEX
     from website.addons.wiki.model import NodeWikiPage
 
@@ -292,12 +419,11 @@ def update_node(node, index=None, bulk=False):
             # Skip orphaned components
             return
 
-    from website.files.models.osfstorage import OsfStorageFile
-    for file_ in paginated(OsfStorageFile, Q('node', 'eq', node)):
-        update_file(file_, index=index)
+    if files:
+        update_node_files(node, index=index)
 
     if node.is_deleted or not node.is_public or node.archiving:
-        delete_doc(elastic_document_id, node)
+        delete_doc(elastic_document_id, node, index=index)
     else:
         try:
             normalized_title = six.u(node.title)
@@ -345,7 +471,7 @@ def update_node(node, index=None, bulk=False):
         if bulk:
             return elastic_document
         else:
-            es.index(index=index, doc_type=category, id=elastic_document_id, body=elastic_document, refresh=True)
+            index_doc(index, category, elastic_document_id, elastic_document)
 
 def bulk_update_nodes(serialize, nodes, index=None):
     """Updates the list of input projects
@@ -392,7 +518,7 @@ def update_user(user, index=None):
     index = index or INDEX
     if not user.is_active:
         try:
-            es.delete(index=index, doc_type='user', id=user._id, refresh=True, ignore=[404])
+            remove_doc(index, 'user', user._id)
         except NotFoundError:
             pass
         return
@@ -431,23 +557,15 @@ def update_user(user, index=None):
         'boost': 2,  # TODO(fabianvf): Probably should make this a constant or something
     }
 
-    es.index(index=index, doc_type='user', body=user_doc, id=user._id, refresh=True)
+    index_doc(index, 'user', user._id, user_doc)
 
-@requires_search
-def update_file(file_, index=None, delete=False):
 
-    index = index or INDEX
+def file_is_searchable(file_):
+    node = file_.node
+    return node.is_public and not node.is_deleted and not node.archiving
 
-    if not file_.node.is_public or delete or file_.node.is_deleted or file_.node.archiving:
-        es.delete(
-            index=index,
-            doc_type='file',
-            id=file_._id,
-            refresh=True,
-            ignore=[404]
-        )
-        return
 
+def serialize_file(file_):
     # We build URLs manually here so that this function can be
     # run outside of a Flask request context (e.g. in a celery task)
     file_deep_url = '/{node_id}/files/{provider}{path}/'.format(
@@ -468,14 +586,63 @@ def update_file(file_, index=None, delete=False):
         'parent_id': file_.node.parent_node._id if file_.node.parent_node else None,
         'is_registration': file_.node.is_registration,
     }
+    return file_doc
 
-    es.index(
-        index=index,
-        doc_type='file',
-        body=file_doc,
-        id=file_._id,
-        refresh=True
-    )
+@requires_search
+def update_file(file_, index=None, delete=False):
+
+    index = index or INDEX
+
+    if delete or not file_is_searchable(file_):
+        remove_doc(index, 'file', file_._id)
+        return
+
+    index_doc(index, 'file', file_._id, serialize_file(file_))
+
+@requires_search
+def update_files(files, index=None):
+    """Bring the documents of many files up to date, in bulk."""
+    index = index or INDEX
+    with bulk_indexing():
+        for file_ in files:
+            update_file(file_, index=index)
+
+@requires_search
+def delete_files(file_ids, index=None):
+    """Remove the documents of many files, in bulk."""
+    index = index or INDEX
+    with bulk_indexing():
+        for file_id in file_ids:
+            remove_doc(index, 'file', file_id)
+
+@requires_search
+def update_node_files(node, index=None):
+    """Bring the documents of a node's osfstorage files up to date, writing only the files
+    whose indexed fields changed. The current documents are fetched with one `mget` per
+    chunk of files and compared against a fresh serialization.
+    """
+    index = index or INDEX
+    from website.files.models.osfstorage import OsfStorageFile
+
+    files = paginated(OsfStorageFile, Q('node', 'eq', node), increment=settings.ELASTIC_BULK_CHUNK_SIZE)
+    while True:
+        chunk = list(itertools.islice(files, settings.ELASTIC_BULK_CHUNK_SIZE))
+        if not chunk:
+            break
+        response = es.mget(index=index, doc_type='file', body={'ids': [file_._id for file_ in chunk]}, ignore=[404])
+        indexed = {
+            doc['_id']: doc['_source']
+            for doc in response.get('docs', [])
+            if doc.get('found')
+        }
+        for file_ in chunk:
+            if not file_is_searchable(file_):
+                if file_._id in indexed:
+                    remove_doc(index, 'file', file_._id)
+                continue
+            file_doc = serialize_file(file_)
+            if indexed.get(file_._id) != file_doc:
+                index_doc(index, 'file', file_._id, file_doc)
 
 @requires_search
 def delete_all():
@@ -541,7 +708,7 @@ def create_index(index=None):
 def delete_doc(elastic_document_id, node, index=None, category=None):
     index = index or INDEX
     category = category or 'registration' if node.is_registration else node.project_or_component
-    es.delete(index=index, doc_type=category, id=elastic_document_id, refresh=True, ignore=[404])
+    remove_doc(index, category, elastic_document_id)
 
 
 @requires_search
@@ -581,6 +748,8 @@ def search_contributor(query, page=0, size=10, exclude=None, current_user=None):
     validate_page_num(page, pages)
 
     users = []
+    # Fetch every user on the page with one query
+    User.load_many(doc['id'] for doc in docs)
     for doc in docs:
         # TODO: use utils.serialize_user
         user = User.load(doc['id'])
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""Buffer the search index writes made while handling a request and send them to
+the search engine in bulk once the request is done.
+"""
+
+import logging
+
+from framework import sentry
+
+from website.search import search
+from website.search import exceptions
+
+
+logger = logging.getLogger(__name__)
+
+
+def search_before_request():
+    search.begin_bulk_indexing()
+
+
+def search_teardown_request(error=None):
+    # Don't index the changes of a request that failed
+    try:
+        search.end_bulk_indexing(discard=error is not None)
+    except exceptions.SearchException as e:
+        logger.exception(e)
+        sentry.log_exception()
+
+
+handlers = {
+    'before_request': search_before_request,
+    'teardown_request': search_teardown_request,
+}
@@ -1,4 +1,5 @@
 import logging
+import contextlib
 
 from framework.tasks.handlers import enqueue_task
 
@@ -20,6 +21,23 @@ def requires_search(func):
     return wrapped
 
 
+@contextlib.contextmanager
+def bulk_indexing(chunk_size=None, refresh=None):
+    """Buffer the index writes made inside the block and send them in bulk on exit."""
+    if search_engine is None:
+        yield None
+    else:
+        with search_engine.bulk_indexing(chunk_size=chunk_size, refresh=refresh) as indexer:
+            yield indexer
+
+@requires_search
+def begin_bulk_indexing(chunk_size=None, refresh=None):
+    return search_engine.begin_bulk_indexing(chunk_size=chunk_size, refresh=refresh)
+
+@requires_search
+def end_bulk_indexing(discard=False):
+    return search_engine.end_bulk_indexing(discard=discard)
+
 @requires_search
 def search(query, index=None, doc_type=None):
     index = index or settings.ELASTIC_INDEX
@@ -68,6 +86,16 @@ def update_file(file_, index=None, delete=False):
     index = index or settings.ELASTIC_INDEX
     search_engine.update_file(file_, index=index, delete=delete)
 
+@requires_search
+def update_files(files, index=None):
+    index = index or settings.ELASTIC_INDEX
+    search_engine.update_files(files, index=index)
+
+@requires_search
+def delete_files(file_ids, index=None):
+    index = index or settings.ELASTIC_INDEX
+    search_engine.delete_files(file_ids, index=index)
+
 @requires_search
 def delete_all():
     search_engine.delete_all()
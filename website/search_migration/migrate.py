@@ -57,8 +57,9 @@ def migrate(delete, index=None, app=None):
 
     new_index = set_up_index(index)
 
-    migrate_nodes(new_index)
-    migrate_users(new_index)
+    with search.bulk_indexing():
+        migrate_nodes(new_index)
+        migrate_users(new_index)
 
     set_up_alias(index, new_index)
 
@@ -0,0 +1,274 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Rebuild the search index without taking search down.
+
+Documents are written to a fresh versioned index (``<alias>_v<n>``) while the
+alias keeps serving the old one. Nodes, users and files are split into chunks
+of consecutive primary keys that a process pool serializes and bulk indexes.
+Each finished chunk is recorded in a checkpoint file, so a run that dies can be
+picked up with ``resume=True`` and only the remaining chunks are indexed. Once
+every chunk is done the alias is swapped to the new index in one request.
+
+Writes made to the live alias while the rebuild runs are not copied into the
+new index; run the rebuild when traffic is low or follow it with a node update.
+
+    invoke reindex_search --workers=4
+    invoke reindex_search --resume
+"""
+from __future__ import absolute_import, division
+
+import os
+import json
+import time
+import logging
+import tempfile
+import multiprocessing
+
+from modularodm import Q
+from elasticsearch import Elasticsearch
+
+from framework.auth import User
+from framework.mongo import StoredObject
+from framework.mongo import database
+from framework.mongo import handlers as mongo_handlers
+
+from website import settings
+from website.app import init_app
+from website.models import Node
+from website.search import elastic_search
+from website.files.models.osfstorage import OsfStorageFile
+
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1000
+
+
+def index_nodes(query, index):
+    count = 0
+    for node in Node.find(query & Q('is_public', 'eq', True) & Q('is_deleted', 'eq', False)):
+        elastic_search.update_node(node, index=index, files=False)
+        count += 1
+    return count
+
+
+def index_users(query, index):
+    count = 0
+    for user in User.find(query):
+        if user.is_active:
+            elastic_search.update_user(user, index=index)
+            count += 1
+    return count
+
+
+def index_files(query, index):
+    count = 0
+    for file_ in OsfStorageFile.find(query):
+        if elastic_search.file_is_searchable(file_):
+            elastic_search.update_file(file_, index=index)
+            count += 1
+    return count
+
+
+# kind: (collection, raw filter used to plan the chunks, indexing function)
+KINDS = {
+    'node': ('node', {'is_public': True, 'is_deleted': False}, index_nodes),
+    'user': ('user', {}, index_users),
+    'file': ('storedfilenode', {'provider': 'osfstorage', 'is_file': True}, index_files),
+}
+
+
+def plan_chunks(kind, chunk_size=CHUNK_SIZE):
+    """Split the primary keys of ``kind`` into inclusive ``[first, last]`` ranges of at most
+    ``chunk_size`` keys. Only the keys are read, in index order.
+    """
+    collection, raw_filter, _ = KINDS[kind]
+    chunks = []
+    first = last = None
+    size = 0
+    cursor = database[collection].find(raw_filter, {'_id': True}).sort('_id', 1)
+    for document in cursor:
+        if first is None:
+            first = document['_id']
+        last = document['_id']
+        size += 1
+        if size == chunk_size:
+            chunks.append([kind, first, last])
+            first, size = None, 0
+    if first is not None:
+        chunks.append([kind, first, last])
+    return chunks
+
+
+def init_worker():
+    """Give each pool process its own database and elasticsearch connections rather
+    than sharing the sockets inherited from the parent.
+    """
+    mongo_handlers._mongo_client = mongo_handlers.get_mongo_client()
+    elastic_search.es = Elasticsearch(settings.ELASTIC_URI, request_timeout=settings.ELASTIC_TIMEOUT)
+
+
+def reindex_chunk(args):
+    kind, first, last, index = args
+    start = time.time()
+    query = Q('_id', 'gte', first) & Q('_id', 'lte', last)
+    with elastic_search.bulk_indexing(refresh=False):
+        count = KINDS[kind][2](query, index)
+    StoredObject._clear_caches()
+    return kind, first, last, count, time.time() - start
+
+
+class Checkpoint(object):
+    """Progress of one rebuild, persisted as JSON after every finished chunk."""
+
+    def __init__(self, path, index=None, chunks=None, done=None, counts=None):
+        self.path = path
+        self.index = index
+        self.chunks = chunks or []
+        self.done = set(done or [])
+        self.counts = counts or {}
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path):
+            return None
+        with open(path) as fp:
+            data = json.load(fp)
+        return cls(path, index=data['index'], chunks=data['chunks'], done=data['done'], counts=data['counts'])
+
+    @staticmethod
+    def key(kind, first):
+        return '{0}:{1}'.format(kind, first)
+
+    @property
+    def pending(self):
+        return [chunk for chunk in self.chunks if self.key(chunk[0], chunk[1]) not in self.done]
+
+    def mark_done(self, kind, first, count):
+        self.done.add(self.key(kind, first))
+        self.counts[kind] = self.counts.get(kind, 0) + count
+        self.save()
+
+    def save(self):
+        # Write then rename so a crash never leaves a truncated checkpoint behind
+        tmp_path = '{}.tmp'.format(self.path)
+        with open(tmp_path, 'w') as fp:
+            json.dump({
+                'index': self.index,
+                'chunks': self.chunks,
+                'done': sorted(self.done),
+                'counts': self.counts,
+            }, fp)
+        os.rename(tmp_path, self.path)
+
+    def delete(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def get_index_versions(alias):
+    """Map version number to name for every ``<alias>_v<n>`` index."""
+    prefix = '{}_v'.format(alias)
+    versions = {}
+    for name in elastic_search.es.indices.get_aliases():
+        if name.startswith(prefix) and name[len(prefix):].isdigit():
+            versions[int(name[len(prefix):])] = name
+    return versions
+
+
+def create_versioned_index(alias):
+    versions = get_index_versions(alias)
+    index = '{0}_v{1}'.format(alias, max(versions) + 1 if versions else 1)
+    elastic_search.create_index(index)
+    # Refreshing while bulk loading only makes segments nobody is searching yet
+    elastic_search.es.indices.put_settings(index=index, body={'index': {'refresh_interval': '-1'}})
+    return index
+
+
+def swap_alias(alias, index):
+    """Point ``alias`` at ``index`` and nothing else, in one atomic request. If ``alias``
+    is still a concrete index from before aliases were used it has to be deleted first.
+    """
+    es = elastic_search.es
+    es.indices.put_settings(index=index, body={'index': {'refresh_interval': '1s'}})
+    es.indices.refresh(index=index)
+    if es.indices.exists(index=alias) and not es.indices.exists_alias(name=alias):
+        logger.warn('{} is an index, not an alias; deleting it before aliasing'.format(alias))
+        es.indices.delete(index=alias)
+    current = es.indices.get_alias(name=alias) if es.indices.exists_alias(name=alias) else {}
+    actions = [{'remove': {'index': name, 'alias': alias}} for name in current if name != index]
+    actions.append({'add': {'index': index, 'alias': alias}})
+    es.indices.update_aliases(body={'actions': actions})
+    return [name for name in current if name != index]
+
+
+def log_stage(timings, stage, start):
+    timings.append((stage, time.time() - start))
+    logger.info('{0} finished in {1:.1f}s'.format(stage, timings[-1][1]))
+
+
+def reindex(alias=None, workers=None, chunk_size=CHUNK_SIZE, resume=False, delete_old=False, checkpoint_path=None):
+    alias = alias or settings.ELASTIC_INDEX
+    workers = workers or multiprocessing.cpu_count()
+    checkpoint_path = checkpoint_path or os.path.join(tempfile.gettempdir(), 'osf-reindex-{}.json'.format(alias))
+    timings = []
+    run_start = time.time()
+
+    start = time.time()
+    checkpoint = Checkpoint.load(checkpoint_path) if resume else None
+    if checkpoint is None:
+        checkpoint = Checkpoint(checkpoint_path, index=create_versioned_index(alias))
+        for kind in sorted(KINDS):
+            checkpoint.chunks.extend(plan_chunks(kind, chunk_size=chunk_size))
+        checkpoint.save()
+        logger.info('Building {0} in {1} chunks'.format(checkpoint.index, len(checkpoint.chunks)))
+    else:
+        logger.info('Resuming {0}: {1} of {2} chunks left'.format(
+            checkpoint.index, len(checkpoint.pending), len(checkpoint.chunks)
+        ))
+    log_stage(timings, 'plan', start)
+
+    start = time.time()
+    pending = [chunk + [checkpoint.index] for chunk in checkpoint.pending]
+    indexed = 0
+    pool = multiprocessing.Pool(workers, initializer=init_worker)
+    try:
+        for kind, first, last, count, elapsed in pool.imap_unordered(reindex_chunk, pending):
+            checkpoint.mark_done(kind, first, count)
+            indexed += count
+            logger.info('Indexed {0} {1}s ({2}..{3}) in {4:.1f}s'.format(count, kind, first, last, elapsed))
+        pool.close()
+    except Exception:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+    log_stage(timings, 'index', start)
+    index_elapsed = timings[-1][1]
+
+    start = time.time()
+    old_indices = swap_alias(alias, checkpoint.index)
+    log_stage(timings, 'swap', start)
+
+    if delete_old:
+        start = time.time()
+        for name in old_indices:
+            elastic_search.es.indices.delete(index=name, ignore=[404])
+        log_stage(timings, 'delete old', start)
+
+    checkpoint.delete()
+    total_elapsed = time.time() - run_start
+    print('Reindexed into {0} (alias {1})'.format(checkpoint.index, alias))
+    for kind, count in sorted(checkpoint.counts.items()):
+        print('  {0:<6} {1:>10} documents'.format(kind, count))
+    for stage, elapsed in timings:
+        print('  {0:<12} {1:>8.1f}s'.format(stage, elapsed))
+    print('  {0:.1f} documents/second this run ({1} in {2:.1f}s), {3:.1f}s total'.format(
+        indexed / index_elapsed if index_elapsed else 0, indexed, index_elapsed, total_elapsed
+    ))
+    return checkpoint.index
+
+
+def main(**kwargs):
+    init_app(set_backends=True, routes=False)
+    return reindex(**kwargs)
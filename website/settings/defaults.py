@@ -45,6 +45,13 @@ PROXY_ADDRS = []
 # May set these to True in local.py for development
 DEV_MODE = False
 DEBUG_MODE = False
+# Log how long each nested template of a rendered page took
+PROFILE_TEMPLATES = False
+
+# Compiled Mako templates are written here and reused by later workers
+MAKO_MODULE_DIRECTORY = '/tmp/mako_modules'
+# Maximum number of compiled templates kept in memory by each worker
+MAKO_CACHE_SIZE = 1000
 
 LOG_PATH = os.path.join(APP_PATH, 'logs')
 TEMPLATES_PATH = os.path.join(BASE_PATH, 'templates')
@@ -67,6 +74,12 @@ SEARCH_ENGINE = 'elastic'  # Can be 'elastic', or None
 ELASTIC_URI = 'localhost:9200'
 ELASTIC_TIMEOUT = 10
 ELASTIC_INDEX = 'website'
+# Whether writes to the search index refresh it right away. Refreshing makes a document
+# searchable immediately but creates a new segment each time; leave off in production and
+# let elasticsearch's refresh interval pick writes up.
+ELASTIC_REFRESH = False
+# Number of actions sent per request when index writes are buffered and flushed in bulk
+ELASTIC_BULK_CHUNK_SIZE = 500
 SHARE_ELASTIC_URI = ELASTIC_URI
 SHARE_ELASTIC_INDEX = 'share'
 # For old indices
@@ -91,6 +104,19 @@ SUPPORT_EMAIL = 'support@osf.io'
 MAIL_SERVER = 'smtp.sendgrid.net'
 MAIL_USERNAME = 'osf-smtp'
 MAIL_PASSWORD = ''  # Set this in local.py
+# Send email over a per-worker pool of authenticated SMTP connections, and send
+# digests in batches, instead of connecting once per email
+USE_MAIL_POOL = False
+# Most idle connections kept per mail server
+MAIL_POOL_SIZE = 2
+# Seconds a pooled connection is reused before it is replaced
+MAIL_POOL_MAX_AGE = 300
+# Number of emails sent by each batch task
+MAIL_BATCH_SIZE = 100
+# Number of users whose notification digests are aggregated, sent and removed together
+DIGEST_CHUNK_SIZE = 500
+# Resolve subscriptions and store digests for file and wiki events in a celery task
+NOTIFY_IN_BACKGROUND = False
 
 # Mandrill
 MANDRILL_USERNAME = None
@@ -121,6 +147,9 @@ UPLOADS_PATH = os.path.join(BASE_PATH, 'uploads')
 MFR_CACHE_PATH = os.path.join(BASE_PATH, 'mfrcache')
 MFR_TEMP_PATH = os.path.join(BASE_PATH, 'mfrtemp')
 
+# Keep a denormalised copy of each osfstorage folder listing until one of its children changes
+CACHE_FILE_LISTINGS = True
+
 # Use Celery for file rendering
 USE_CELERY = True
 
@@ -214,6 +243,15 @@ SYSTEM_ADDED_ADDONS = {
 PIWIK_HOST = None
 PIWIK_ADMIN_TOKEN = None
 PIWIK_SITE_ID = None
+# Seconds to wait for Piwik reports
+PIWIK_TIMEOUT = 10
+# Seconds node and user updates wait to be merged with others and sent to
+# Piwik together; 0 sends each update as its own task
+PIWIK_UPDATE_WINDOW = 60
+
+# The public activity page is served from a snapshot updated by a scheduled
+# task; older snapshots are marked as out of date
+DISCOVERY_SNAPSHOT_MAX_AGE = datetime.timedelta(hours=2)
 
 SENTRY_DSN = None
 SENTRY_DSN_JS = None
@@ -247,6 +285,16 @@ DEFAULT_HMAC_ALGORITHM = hashlib.sha256
 WATERBUTLER_URL = 'http://localhost:7777'
 WATERBUTLER_ADDRS = ['127.0.0.1']
 
+# Concurrency and per-provider requests/second used when crawling addon file trees
+WATERBUTLER_CRAWL_WORKERS = 8
+WATERBUTLER_CRAWL_RATE_LIMITS = {
+    'default': 10,
+    'github': 5,
+}
+WATERBUTLER_CRAWL_MAX_RETRIES = 3
+# Seconds before the first retry, doubled for each one after
+WATERBUTLER_CRAWL_BACKOFF = 0.5
+
 # Test identifier namespaces
 DOI_NAMESPACE = 'doi:10.5072/FK2'
 ARK_NAMESPACE = 'ark:99999/fk4'
@@ -271,6 +319,8 @@ MAX_ARCHIVE_SIZE = 1024 ** 3  # == math.pow(1024, 3) == 1 GB
 MAX_FILE_SIZE = MAX_ARCHIVE_SIZE  # TODO limit file size?
 
 ARCHIVE_TIMEOUT_TIMEDELTA = timedelta(1)  # 24 hours
+# Number of per-node file maps kept in memory while resolving files in registrations
+ARCHIVER_FILE_MAP_CACHE_SIZE = 32
 
 ENABLE_ARCHIVER = True
 
@@ -295,6 +345,8 @@ CELERY_IMPORTS = (
     'website.notifications.tasks',
     'website.archiver.tasks',
     'website.search.search',
+    'website.files.tasks',
+    'website.discovery.tasks',
 )
 
 # celery.schedule will not be installed when running invoke requirements the first time.
@@ -315,6 +367,10 @@ else:
             'schedule': crontab(minute=0, hour=0),
             'args': ('email_digest',),
         },
+        'hourly-discovery-snapshot': {
+            'task': 'discovery.update_activity_snapshot',
+            'schedule': crontab(minute=0),
+        },
     }
 
 WATERBUTLER_JWE_SALT = 'yusaltydough'
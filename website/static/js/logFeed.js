@@ -117,6 +117,8 @@ var LogsViewModel = oop.extend(Paginator, {
         self.logs = ko.observableArray(logs);
         self.url = url;
         self.anonymousUserName = '<em>A user</em>';
+        // Seek cursors of the pages after those already fetched, by page number
+        self.cursors = {};
 
         self.tzname = ko.pureComputed(function() {
             var logs = self.logs();
@@ -132,12 +134,14 @@ var LogsViewModel = oop.extend(Paginator, {
         var self = this;
         self.loading(true); // show loading indicator
 
+        var data = {page: self.pageToGet()};
+        if (self.cursors[self.pageToGet()]) {
+            data.before = self.cursors[self.pageToGet()];
+        }
         return $.ajax({
             type: 'get',
             url: self.url,
-            data:{
-                page: self.pageToGet()
-            },
+            data: data,
             cache: false
         }).done(function(response) {
             // Initialize LogViewModel
@@ -147,7 +151,13 @@ var LogsViewModel = oop.extend(Paginator, {
                 self.logs.push(logModelObjects[i]);
             }
             self.currentPage(response.page);
-            self.numberOfPages(response.pages);
+            if (response.pages === undefined) {
+                // Feeds paged by cursor don't count their logs; only the next page is known
+                self.cursors[response.page + 1] = response.next;
+                self.numberOfPages(Math.max(self.numberOfPages(), response.next ? response.page + 2 : response.page + 1));
+            } else {
+                self.numberOfPages(response.pages);
+            }
             self.addNewPaginators();
         }).fail(
             $osf.handleJSONError
@@ -24,6 +24,12 @@
         </div>
         <div class="col-sm-8 col-md-9" role="main" class="m-t-lg">
             <h1 class="page-header">Public Activity</h1>
+            <p class="text-muted">
+                Updated ${snapshot_date.strftime('%Y-%m-%d %H:%M')} UTC
+                % if snapshot_stale:
+                    &mdash; this page may be out of date
+                % endif
+            </p>
             <section id='newPublicProjects'>
                 <h3 class='anchor'>Newest public projects</h3>
                 <div class='project-list'>
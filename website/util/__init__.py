@@ -158,7 +158,10 @@ def waterbutler_url_for(route, provider, path, node, user=None, **kwargs):
         'provider': provider,
     })
 
-    if user:
+    # An explicit cookie wins; don't look one up only to overwrite it below
+    if 'cookie' in kwargs:
+        pass
+    elif user:
         url.args['cookie'] = user.get_or_create_cookie()
     elif website_settings.COOKIE_NAME in request.cookies:
         url.args['cookie'] = request.cookies[website_settings.COOKIE_NAME]
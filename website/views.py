@@ -292,7 +292,7 @@ def serialize_log(node_log, auth=None, anonymous=False):
         'user': node_log.user.serialize()
         if isinstance(node_log.user, User)
         else {'fullname': node_log.foreign_user},
-        'contributors': [node_log._render_log_contributor(c) for c in node_log.params.get("contributors", [])],
+        'contributors': node_log._render_log_contributors(node_log.params.get("contributors", [])),
         'action': node_log.action,
         'params': sanitize.unescape_entities(node_log.params),
         'date': utils.iso8601format(node_log.date),
@@ -301,6 +301,29 @@ def serialize_log(node_log, auth=None, anonymous=False):
     }
 
 
+def serialize_logs(node_logs, auth=None, anonymous=False):
+    '''Serialize a page of logs. The users and nodes they refer to, and the parents
+    of those nodes, are loaded with a query each rather than one per log.
+    '''
+    node_logs = list(node_logs)
+    stored = [node_log.to_storage() for node_log in node_logs]
+    user_ids = set()
+    node_ids = set()
+    for each in stored:
+        params = each.get('params') or {}
+        user_ids.add(each.get('user'))
+        user_ids.update(
+            contributor for contributor in params.get('contributors') or []
+            if isinstance(contributor, basestring)
+        )
+        node_ids.add(params.get('node'))
+        node_ids.add(params.get('project'))
+    User.load_many(user_id for user_id in user_ids if user_id)
+    nodes = [node for node in Node.load_many(node_id for node_id in node_ids if node_id) if node]
+    Node.load_many(set(itertools.chain.from_iterable(node.ancestor_ids for node in nodes)))
+    return [serialize_log(node_log, auth=auth, anonymous=anonymous) for node_log in node_logs]
+
+
 def reproducibility():
     return redirect('/ezcuj/wiki')
 